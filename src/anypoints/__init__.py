@@ -99,6 +99,12 @@ if bInBlenderContext is True:
         else:
             from .class_pointcloudselection import CPointCloudSelection
         # endif
+
+        if "CImportTask" in locals():
+            importlib.reload(CImportTask)
+        else:
+            from .class_importtask import CImportTask
+        # endif
     except Exception as xEx:
         # pass
         print(">>>> Exception importing libs:\n{}".format(str(xEx)))
@@ -140,16 +146,251 @@ if bInBlenderContext is True:
 
         fVoxelSize: FloatProperty(name="Voxel size", description="Side length of voxel.", default=0.02)
 
-        def execute(self, context):
-            pcimport.ImportPointCloud(
-                context,
-                self.filepath,
+        iLodLevelCount: IntProperty(
+            name="LOD levels",
+            description="Number of voxel levels of detail to build. Each level doubles the voxel size.",
+            default=1,
+            min=1,
+            max=16,
+        )
+
+        sCullCamera: StringProperty(
+            name="Cull with camera",
+            description="Only import points inside the view frustum of this camera object. Empty imports all points.",
+            default="",
+        )
+
+        fCullMargin: FloatProperty(
+            name="Cull margin", description="Distance by which the camera frustum is enlarged.", default=0.0, min=0.0
+        )
+
+        sAdaptiveCamera: StringProperty(
+            name="Adaptive voxel camera",
+            description="Name of camera object. If given, the voxel size grows with the distance from this camera.",
+            default="",
+        )
+
+        fAdaptivePixelFootprint: FloatProperty(
+            name="Voxel pixel footprint",
+            description="Number of pixels a voxel may cover in the adaptive voxel camera.",
+            default=1.0,
+            min=0.01,
+        )
+
+        fOutlierRadius: FloatProperty(
+            name="Outlier radius",
+            description="Points with too few neighbors within this distance are removed. Zero disables the removal.",
+            default=0.0,
+            min=0.0,
+        )
+
+        iOutlierMinNeighbors: IntProperty(
+            name="Outlier min. neighbors",
+            description="Minimal number of neighbors within the outlier radius a point needs to be kept.",
+            default=4,
+            min=1,
+        )
+
+        fPoissonMinDist: FloatProperty(
+            name="Blue noise spacing",
+            description="If larger than zero, subsample with an even spatial distribution of at least this spacing.",
+            default=0.0,
+            min=0.0,
+        )
+
+        sPointOrder: EnumProperty(
+            name="Point order",
+            description="Order of the points in the particle emitter",
+            items=[
+                ("FILE", "File", "Keep the order of the file"),
+                ("MORTON", "Morton", "Sort along a Z-order curve for memory locality"),
+                ("PROGRESSIVE", "Progressive", "Every prefix is a spatially uniform subset"),
+            ],
+            default="FILE",
+        )
+
+        iPointBudget: IntProperty(
+            name="Point budget",
+            description="If larger than zero, limits the total number of imported points after voxel downsampling.",
+            default=0,
+            min=0,
+        )
+
+        fTimeBudget: FloatProperty(
+            name="Time budget",
+            description="If larger than zero, imports fewer points to finish within about this many seconds.",
+            default=0.0,
+            min=0.0,
+        )
+
+        iTargetPointCount: IntProperty(
+            name="Target particle count",
+            description="If larger than zero, the voxel size is chosen to create about this number of particles.",
+            default=0,
+            min=0,
+        )
+
+        iProgressiveSteps: IntProperty(
+            name="Progressive steps",
+            description="If larger than one, first shows a coarse subset and refines it in this many steps.",
+            default=1,
+            min=1,
+            max=16,
+        )
+
+        sBackend: EnumProperty(
+            name="Backend",
+            description="How the points are instanced",
+            items=[
+                ("PARTICLES", "Particles", "Face emitter particle system with a color image"),
+                ("GEONODES", "Geometry Nodes", "Instance on points with a color attribute"),
+            ],
+            default="PARTICLES",
+        )
+
+        sColorStorage: EnumProperty(
+            name="Color storage",
+            description="Where the point colors are stored",
+            items=[
+                ("DEFAULT", "Default", "Image for particles, attribute for Geometry Nodes"),
+                ("IMAGE", "Image", "Packed image looked up with per-point texture coordinates"),
+                ("ATTRIBUTE", "Attribute", "Color attribute of the point mesh. Requires Geometry Nodes"),
+            ],
+            default="DEFAULT",
+        )
+
+        sPrototypeStyle: StringProperty(
+            name="Prototype style",
+            description="Name of the particle prototype and material library shared between point clouds",
+            default="Default",
+        )
+
+        sImageStorage: EnumProperty(
+            name="Image storage",
+            description="How the color images are stored",
+            items=[
+                ("PACKED", "Packed", "Pack the images into the Blender file"),
+                ("FILE", "File", "Write uncompressed image files next to the Blender file"),
+                ("GENERATED", "Generated", "Keep the images in memory only. They are lost when saving"),
+            ],
+            default="PACKED",
+        )
+
+        iViewportBudget: IntProperty(
+            name="Viewport budget",
+            description=(
+                "If larger than zero, limits the number of points shown in the viewport. Renders show all. "
+                "Particles are thinned out in steps of 1%, so point clouds with a share below 1% may be hidden."
+            ),
+            default=1000000,
+            min=0,
+        )
+
+        # Parameters of pcimport.ImportPointCloud() and pcimport.GetImportJobs() set by the operator
+        def _GetImportArgs(self):
+            return dict(
                 sName=self.sName,
                 fImportPercent=self.fImportPrecent,
                 bUseVoxel=self.bUseVoxel,
                 fVoxelSize=self.fVoxelSize,
+                iLodLevelCount=self.iLodLevelCount,
+                xCullCamera=self.sCullCamera if len(self.sCullCamera) > 0 else None,
+                fCullMargin=self.fCullMargin,
+                xAdaptiveCamera=self.sAdaptiveCamera if len(self.sAdaptiveCamera) > 0 else None,
+                fAdaptivePixelFootprint=self.fAdaptivePixelFootprint,
+                fOutlierRadius=self.fOutlierRadius,
+                iOutlierMinNeighbors=self.iOutlierMinNeighbors,
+                fPoissonMinDist=self.fPoissonMinDist,
+                iTargetPointCount=self.iTargetPointCount,
+                sPointOrder=None if self.sPointOrder == "FILE" else self.sPointOrder,
+                iPointBudget=self.iPointBudget if self.iPointBudget > 0 else None,
+                fTimeBudget=self.fTimeBudget if self.fTimeBudget > 0.0 else None,
+                iProgressiveSteps=self.iProgressiveSteps,
+                sBackend=self.sBackend,
+                sColorStorage=None if self.sColorStorage == "DEFAULT" else self.sColorStorage,
+                sPrototypeStyle=self.sPrototypeStyle,
+                sImageStorage=self.sImageStorage,
+                iViewportBudget=self.iViewportBudget if self.iViewportBudget > 0 else None,
             )
 
+        # enddef
+
+        def execute(self, context):
+            pcimport.ImportPointCloud(context, self.filepath, **self._GetImportArgs())
+
+            return {"FINISHED"}
+
+        # enddef
+
+    # endclass
+
+    ###########################################################################################
+    # Import that keeps the user interface responsive. The files are read and processed in a
+    # worker thread, while the Blender data is created in short steps of a modal timer.
+    # Press ESC to cancel the import, which removes all data created by it.
+    class ImportPointCloudModal(ImportPointCloud):
+        """Importing point clouds from PLY files in the background"""
+
+        bl_idname = "import_point_cloud.particles_modal"
+        bl_label = "Import Point Cloud (Background)"
+
+        # Interval of the modal timer, and maximal time of a scene creation step in seconds
+        fStepInterval = 0.05
+
+        def execute(self, context):
+            try:
+                dicJobs = pcimport.GetImportJobs(context, self.filepath, **self._GetImportArgs())
+                self.xTask = CImportTask(**dicJobs)
+                self.xTask.Start()
+            except Exception as xEx:
+                self.report({"ERROR"}, str(xEx))
+                return {"CANCELLED"}
+            # endtry
+
+            xWm = context.window_manager
+            self.xTimer = xWm.event_timer_add(self.fStepInterval, window=context.window)
+            xWm.modal_handler_add(self)
+            xWm.progress_begin(0, 100)
+
+            return {"RUNNING_MODAL"}
+
+        # enddef
+
+        def _Finish(self, context):
+            xWm = context.window_manager
+            xWm.event_timer_remove(self.xTimer)
+            xWm.progress_end()
+
+        # enddef
+
+        def modal(self, context, event):
+            if event.type == "ESC":
+                self.xTask.Cancel()
+                self._Finish(context)
+                self.report({"WARNING"}, "Point cloud import cancelled")
+                return {"CANCELLED"}
+            # endif
+
+            if event.type != "TIMER":
+                return {"PASS_THROUGH"}
+            # endif
+
+            try:
+                bDone = self.xTask.Step(context, fMaxTime=self.fStepInterval)
+            except Exception as xEx:
+                self.xTask.Cancel()
+                self._Finish(context)
+                self.report({"ERROR"}, str(xEx))
+                return {"CANCELLED"}
+            # endtry
+
+            context.window_manager.progress_update(int(100.0 * self.xTask.GetProgress()))
+            if not bDone:
+                return {"RUNNING_MODAL"}
+            # endif
+
+            self._Finish(context)
+            self.report({"INFO"}, "Imported {0} point cloud(s)".format(len(self.xTask.GetPointClouds())))
             return {"FINISHED"}
 
         # enddef
@@ -161,6 +402,7 @@ if bInBlenderContext is True:
 # Only needed if you want to add into a dynamic menu
 def menu_func_import(self, context):
     self.layout.operator(ImportPointCloud.bl_idname, text="Particle Point Cloud (*.ply, *.json)")
+    self.layout.operator(ImportPointCloudModal.bl_idname, text="Particle Point Cloud, Background (*.ply, *.json)")
 
 
 # enddef
@@ -168,6 +410,7 @@ def menu_func_import(self, context):
 
 def register():
     bpy.utils.register_class(ImportPointCloud)
+    bpy.utils.register_class(ImportPointCloudModal)
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
 
 
@@ -175,6 +418,7 @@ def register():
 
 
 def unregister():
+    bpy.utils.unregister_class(ImportPointCloudModal)
     bpy.utils.unregister_class(ImportPointCloud)
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
 
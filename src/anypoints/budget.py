@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \budget.py
+# Created Date: Monday, October 19th 2026, 5:21:09 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Distribution of point budgets over sets of point clouds.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import numpy as np
+
+from .plyio.PlyException import CPlyException
+from .plyio import CPlyReader
+
+
+################################################################################
+# Read the number of vertices of a PLY file from its header only
+def GetPlyPointCount(_sFilePath):
+
+    xPly = CPlyReader()
+    xPly.Read(_sFilePath, bHeaderOnly=True)
+    xVexList = xPly.GetElement("vertex")
+    if xVexList is None:
+        raise CPlyException("PLY file '{0}' has no vertex element".format(_sFilePath))
+    # endif
+
+    return xVexList.GetValueCount()
+
+
+# enddef
+
+
+################################################################################
+# Split a total point budget over point clouds with the given point counts.
+# Each cloud obtains a share proportional to weight * count, but never more than its point count.
+# Budget that small clouds cannot use is redistributed to the others.
+# If the budget allows it, every non-empty cloud obtains at least one point, so that small clouds
+# do not vanish. The shares are rounded with the largest remainder method, so that their sum
+# equals the budget, if the clouds have enough points.
+# lWeights: optional additional weight per cloud, for example its screen coverage.
+# Returns the number of points per cloud.
+def DistributeBudget(*, lCounts, iBudget, lWeights=None):
+
+    aCounts = np.asarray(lCounts, dtype=np.float64)
+    if lWeights is None:
+        aWeights = np.ones(len(aCounts))
+    else:
+        aWeights = np.asarray(lWeights, dtype=np.float64)
+        if len(aWeights) != len(aCounts):
+            raise ValueError("Number of weights does not match number of point clouds")
+        # endif
+    # endif
+
+    aWeights = aWeights * aCounts
+    aOpen = (aCounts > 0) & (aWeights > 0)
+    iBudget = max(0, int(min(iBudget, aCounts[aOpen].sum())))
+
+    # Minimal share of one point per cloud
+    aAlloc = np.zeros(len(aCounts))
+    if iBudget >= np.count_nonzero(aOpen):
+        aAlloc[aOpen] = 1.0
+    # endif
+    aOpen &= aAlloc < aCounts
+    fRemain = float(iBudget - aAlloc.sum())
+
+    # Water filling: clouds whose share exceeds their size are saturated,
+    # and the remaining budget is split among the others again.
+    while fRemain > 0.0 and np.any(aOpen):
+        aShare = np.zeros(len(aCounts))
+        aShare[aOpen] = fRemain * aWeights[aOpen] / aWeights[aOpen].sum()
+        aFull = aOpen & (aAlloc + aShare >= aCounts)
+        if not np.any(aFull):
+            aAlloc += aShare
+            break
+        # endif
+        fRemain -= float((aCounts[aFull] - aAlloc[aFull]).sum())
+        aAlloc[aFull] = aCounts[aFull]
+        aOpen &= ~aFull
+    # endwhile
+
+    # Largest remainder rounding
+    aResult = np.minimum(np.floor(aAlloc), aCounts).astype(np.int64)
+    iMissing = iBudget - int(aResult.sum())
+    if iMissing > 0:
+        aFrac = np.where(aResult < aCounts, aAlloc - aResult, -1.0)
+        aResult[np.argsort(-aFrac, kind="stable")[0:iMissing]] += 1
+    # endif
+
+    return [int(x) for x in aResult]
+
+
+# enddef
+
+
+################################################################################
+# Return the import percentage per cloud for a total point budget.
+# See 'DistributeBudget()' for the parameters.
+def GetImportPercents(*, lCounts, iBudget, lWeights=None):
+
+    lAlloc = DistributeBudget(lCounts=lCounts, iBudget=iBudget, lWeights=lWeights)
+    return [100.0 if iCnt <= 0 else min(100.0, 100.0 * iAlloc / iCnt) for iAlloc, iCnt in zip(lAlloc, lCounts)]
+
+
+# enddef
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \camera.py
+# Created Date: Monday, October 19th 2026, 11:48:20 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Access to Blender camera parameters for point cloud processing
+
+import numpy as np
+
+import bpy
+from anybase.cls_anyexcept import CAnyExcept
+from . import frustum
+
+
+################################################################################
+def _GetCameraObject(_xCamera):
+
+    if isinstance(_xCamera, str):
+        objCam = bpy.data.objects.get(_xCamera)
+        if objCam is None:
+            raise CAnyExcept("Camera object '{0}' not found".format(_xCamera))
+        # endif
+    else:
+        objCam = _xCamera
+    # endif
+
+    if objCam.type != "CAMERA":
+        raise CAnyExcept("Object '{0}' is not a camera".format(objCam.name))
+    # endif
+
+    return objCam
+
+
+# enddef
+
+
+################################################################################
+# Get the frustum planes of a Blender camera for the current frame.
+# xCamera: camera object or name of camera object.
+def GetFrustumPlanes(_xCamera, *, xScene=None):
+
+    objCam = _GetCameraObject(_xCamera)
+    if xScene is None:
+        xScene = bpy.context.scene
+    # endif
+
+    camA = objCam.data
+    if camA.type not in ["PERSP", "ORTHO"]:
+        raise CAnyExcept("Camera type '{0}' not supported for frustum culling".format(camA.type))
+    # endif
+
+    # The view frame accounts for sensor fit, render aspect ratio and lens shift.
+    lFrame = camA.view_frame(scene=xScene)
+    aFrame = np.array([tuple(x) for x in lFrame])
+    if camA.type == "PERSP":
+        aFrame = aFrame[:, 0:2] / -aFrame[:, 2:3]
+    else:
+        aFrame = aFrame[:, 0:2]
+    # endif
+    aMin = aFrame.min(axis=0)
+    aMax = aFrame.max(axis=0)
+
+    return frustum.GetFrustumPlanes(
+        aCamToWorld=np.array(objCam.matrix_world),
+        sType=camA.type,
+        tExtent=(aMin[0], aMax[0], aMin[1], aMax[1]),
+        fClipStart=camA.clip_start,
+        fClipEnd=camA.clip_end,
+    )
+
+
+# enddef
+
+
+################################################################################
+# Get the frustum planes of a Blender camera for all frames in the given range.
+# The scene's current frame is restored afterwards.
+# iFrameStep: only evaluate every n-th frame. The last frame is always included.
+def GetFrustumPlanesForFrames(_xCamera, *, iFrameStart, iFrameEnd, iFrameStep=1, xScene=None):
+
+    if xScene is None:
+        xScene = bpy.context.scene
+    # endif
+
+    lFrames = list(range(iFrameStart, iFrameEnd + 1, max(iFrameStep, 1)))
+    if len(lFrames) == 0 or lFrames[-1] != iFrameEnd:
+        lFrames.append(iFrameEnd)
+    # endif
+
+    iCurFrame = xScene.frame_current
+    lPlanes = []
+    try:
+        for iFrame in lFrames:
+            xScene.frame_set(iFrame)
+            lPlanes.append(GetFrustumPlanes(_xCamera, xScene=xScene))
+        # endfor
+    finally:
+        xScene.frame_set(iCurFrame)
+    # endtry
+
+    return lPlanes
+
+
+# enddef
+
+
+################################################################################
+# Get the angle in radians covered by a single render pixel of a perspective camera,
+# along the larger image dimension.
+def GetPixelAngle(_xCamera, *, xScene=None):
+
+    objCam = _GetCameraObject(_xCamera)
+    if xScene is None:
+        xScene = bpy.context.scene
+    # endif
+
+    xRender = xScene.render
+    fPixCnt = max(xRender.resolution_x, xRender.resolution_y) * xRender.resolution_percentage / 100.0
+    return objCam.data.angle / max(fPixCnt, 1.0)
+
+
+# enddef
+
+
+################################################################################
+# Get the world position of a camera
+def GetPosition(_xCamera):
+
+    objCam = _GetCameraObject(_xCamera)
+    return np.array(objCam.matrix_world.translation)
+
+
+# enddef
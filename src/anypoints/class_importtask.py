@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \class_importtask.py
+# Created Date: Monday, October 19th 2026, 10:08:43 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import time
+import queue
+import threading
+
+import bpy
+
+from anybase.cls_anyexcept import CAnyExcept
+import anyblend
+from . import pcimport
+from . import viewport
+from .class_pointcloud import CPointCloud
+
+# Blender data collections checked for data blocks created by an import task
+lDataCollections = [
+    "objects",
+    "meshes",
+    "materials",
+    "images",
+    "textures",
+    "particles",
+    "node_groups",
+    "collections",
+]
+
+
+# Import of point cloud files that does not block the user interface.
+# The files are read and processed in a worker thread, and the Blender data is created
+# in the main thread by calling 'Step()' repeatedly, for example from a modal operator.
+# The jobs are created with 'pcimport.GetImportJobs()'.
+# With a point budget, all files are processed before the first Blender data is created,
+# as the budget is split over the point counts after processing.
+class CImportTask:
+
+    # Number of processed point clouds that wait for their Blender data at most.
+    # Limits the memory used when the worker thread is faster than the scene creation.
+    iQueueSize = 2
+
+    ####################################################################################
+    def __init__(self, *, lJobs, dicOptions, iPointBudget=None, fTimeBudget=None):
+
+        self.lJobs = lJobs
+        self.dicOptions = dicOptions
+        self.iPointBudget = iPointBudget
+        self.fTimeBudget = fTimeBudget
+
+        self.lPcl = []
+        self.iPreparedCount = 0
+        self.xQueue = queue.Queue(maxsize=self.iQueueSize)
+        self.xCancel = threading.Event()
+        self.xThread = None
+
+        # Blender data blocks created by the task, as pairs of data collection name and pointer
+        self.lCreatedData = []
+
+        # Job and point cloud whose Blender data is being created in stages
+        self.tActiveJob = None
+
+    # enddef
+
+    ####################################################################################
+    def GetJobCount(self):
+        return len(self.lJobs)
+
+    # enddef
+
+    ####################################################################################
+    # Fraction of the work done, counting the processing and the scene creation of each job as one half
+    def GetProgress(self):
+
+        if len(self.lJobs) == 0:
+            return 1.0
+        # endif
+        return (self.iPreparedCount + len(self.lPcl)) / (2.0 * len(self.lJobs))
+
+    # enddef
+
+    ####################################################################################
+    # Return the imported point clouds
+    def GetPointClouds(self):
+        return self.lPcl
+
+    # enddef
+
+    ####################################################################################
+    # Start the worker thread
+    def Start(self):
+
+        if self.xThread is not None:
+            raise CAnyExcept("Import task has already been started")
+        # endif
+
+        self.xThread = threading.Thread(target=self._Run, daemon=True)
+        self.xThread.start()
+
+    # enddef
+
+    ####################################################################################
+    # Pass an element to the main thread. Returns False if the task has been cancelled while waiting.
+    def _Put(self, _xItem):
+
+        while not self.xCancel.is_set():
+            try:
+                self.xQueue.put(_xItem, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+            # endtry
+        # endwhile
+
+        return False
+
+    # enddef
+
+    ####################################################################################
+    # Worker thread: read and process the files of all jobs. Must not access Blender data.
+    def _Run(self):
+
+        fTimeStart = time.perf_counter()
+        lPrepared = []
+        for iJobIdx, dicJob in enumerate(self.lJobs):
+            if self.xCancel.is_set():
+                return
+            # endif
+
+            try:
+                fJobTimeBudget = None
+                if self.fTimeBudget is not None:
+                    fJobTimeBudget = pcimport.GetJobTimeBudget(
+                        lJobs=self.lJobs,
+                        iJobIdx=iJobIdx,
+                        fTimeRemain=self.fTimeBudget - (time.perf_counter() - fTimeStart),
+                    )
+                # endif
+
+                xPcl = CPointCloud(dicJob.get("sName"))
+                dicPrepared = xPcl.PrepareImport(
+                    sFilePath=dicJob.get("sFpData"),
+                    fImportPercent=dicJob.get("fImportPercent"),
+                    fTimeBudget=fJobTimeBudget,
+                    xCancel=self.xCancel,
+                    dicOptions=self.dicOptions,
+                )
+            except Exception as xEx:
+                self._Put((dicJob, None, xEx))
+                return
+            # endtry
+
+            if self.iPointBudget is not None:
+                lPrepared.append((dicJob, xPcl, dicPrepared))
+            elif not self._Put((dicJob, xPcl, dicPrepared)):
+                return
+            # endif
+            self.iPreparedCount += 1
+        # endfor
+
+        if self.iPointBudget is not None:
+            try:
+                pcimport.LimitPreparedBudget(lPrepared=lPrepared, iPointBudget=self.iPointBudget)
+            except Exception as xEx:
+                self._Put(({"sFpData": ", ".join(x[0].get("sFpData") for x in lPrepared)}, None, xEx))
+                return
+            # endtry
+
+            for tPrepared in lPrepared:
+                if not self._Put(tPrepared):
+                    return
+                # endif
+            # endfor
+        # endif
+
+        # Marks the end of the jobs
+        self._Put(None)
+
+    # enddef
+
+    ####################################################################################
+    # Pointers of the data blocks in the Blender data collections checked by the task
+    def _GetDataPointers(self):
+        return {x: set(y.as_pointer() for y in getattr(bpy.data, x)) for x in lDataCollections}
+
+    # enddef
+
+    ####################################################################################
+    # Create the Blender data of the processed point clouds, until fMaxTime seconds have passed
+    # or no processed point cloud is waiting. Must be called from the main thread.
+    # The data of a point cloud is created in stages (images, mesh, prototypes, particle system),
+    # so that a single large point cloud is spread over several calls as well.
+    # A single stage is not interrupted, so a call may take longer than fMaxTime.
+    # Returns True when all jobs are finished.
+    def Step(self, _xContext, fMaxTime=0.05):
+
+        fTimeStart = time.perf_counter()
+        xActLayCol = anyblend.collection.GetActiveLayerCollection(_xContext)
+        try:
+            while time.perf_counter() - fTimeStart < fMaxTime:
+                if self.tActiveJob is None:
+                    try:
+                        xItem = self.xQueue.get_nowait()
+                    except queue.Empty:
+                        return False
+                    # endtry
+
+                    if xItem is None:
+                        # The share of the scene viewport budget is updated once for all imported point clouds
+                        viewport.ApplySceneBudget(_xContext.scene)
+                        return True
+                    # endif
+
+                    dicJob, xPcl, xResult = xItem
+                    if xPcl is None:
+                        raise CAnyExcept(
+                            "Error importing point cloud file '{0}':\n{1}".format(dicJob.get("sFpData"), str(xResult))
+                        )
+                    # endif
+                    xPcl.StartFinishImport(dicPrepared=xResult)
+                    self.tActiveJob = (dicJob, xPcl)
+                # endif
+
+                # Only the data blocks created while the user interface waits for this step
+                # belong to the task. Data the user creates between the steps is never recorded.
+                dicJob, xPcl = self.tActiveJob
+                dicBefore = self._GetDataPointers()
+                try:
+                    pcimport.ActivateJobCollections(_xContext, dicJob)
+                    bPending = xPcl.FinishImportStep(xContext=_xContext)
+                finally:
+                    for sData, setAfter in self._GetDataPointers().items():
+                        self.lCreatedData.extend([(sData, x) for x in setAfter - dicBefore[sData]])
+                    # endfor
+                # endtry
+
+                if not bPending:
+                    self.lPcl.append(xPcl)
+                    self.tActiveJob = None
+                # endif
+            # endwhile
+        finally:
+            anyblend.collection.SetActiveLayerCollection(_xContext, xActLayCol)
+        # endtry
+
+        return False
+
+    # enddef
+
+    ####################################################################################
+    # Stop the worker thread and remove all Blender data created by the task.
+    # The worker thread is not joined, so that the user interface does not wait for a file
+    # that is still being processed. It stops at its next processing stage, and its result is discarded.
+    def Cancel(self):
+
+        self.xCancel.set()
+
+        lPcl = list(self.lPcl)
+        if self.tActiveJob is not None:
+            lPcl.append(self.tActiveJob[1])
+            self.tActiveJob = None
+        # endif
+        for xPcl in lPcl:
+            # Stop pending scene creation stages and progressive refinements
+            xPcl.dicSceneStages = None
+            xPcl.dicProgressive = None
+        # endfor
+        self.lPcl = []
+
+        # Data blocks that have been removed in the meantime are not found anymore
+        dicCreated = {}
+        for sData, iPointer in self.lCreatedData:
+            dicCreated.setdefault(sData, set()).add(iPointer)
+        # endfor
+        lIds = []
+        for sData, setCreated in dicCreated.items():
+            lIds.extend([x for x in getattr(bpy.data, sData) if x.as_pointer() in setCreated])
+        # endfor
+        self.lCreatedData = []
+
+        print("Removing {0} data blocks of cancelled import...".format(len(lIds)))
+        bpy.data.batch_remove(lIds)
+
+    # enddef
+
+
+# endclass
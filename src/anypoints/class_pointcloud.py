@@ -26,24 +26,74 @@
 # </LICENSE>
 ###
 
+import os
 import math
+import time
 import numpy as np
 
 import bpy
-import bmesh
+from mathutils import Vector
 from .plyio import CPlyReader
 from anybase import config
 from anybase.cls_anyexcept import CAnyExcept
 import anyblend
-from . import solids
+from . import voxel
+from . import frustum
+from . import camera
+from . import filters
+from . import geonodes
+from . import prototypes
+from . import imagefile
+from . import viewport
+from . import importoptions
+from .class_pointcloudlod import CPointCloudLod
+from .class_pointcloudindex import CPointCloudIndex
 
 # Representation of point cloud objects in Blender scene graph
 class CPointCloud:
 
+    # Estimated time in seconds to create the Blender scene data per point.
+    # Updated after each import, and used to plan imports with a time budget.
+    fSceneTimePerPoint = 1e-5
+
+    # Maximal width and height of the color images. Larger point clouds are split across several images.
+    iMaxImageSize = 16384
+
     ###################################################################
     def __init__(self, _sName):
 
         self.sName = _sName
+        self.fVoxelSize = None
+        self.sPointOrder = None
+        self.sBackend = "PARTICLES"
+        self.sColorStorage = "IMAGE"
+        self.sPrototypeStyle = "Default"
+        self.sImageStorage = "PACKED"
+        self.sImageCachePath = None
+        self.iViewportBudget = None
+
+        # Level-of-detail hierarchy and the source points it refers to.
+        # Only available if the point cloud was imported with more than one LOD level.
+        self.xLod = None
+        self.iLodLevel = None
+        self.lLodCol = None
+        self.sImgName = None
+        self.lImgNames = []
+        self.dicImportInfo = {}
+
+        # Spatial index over the imported points and their colors.
+        # Only available if the point cloud was imported with 'bSpatialIndex=True'.
+        self.xIndex = None
+        self.lIndexCol = None
+
+        # State of a progressive import that has not been fully refined yet
+        self.dicProgressive = None
+
+        # Event that cancels a running PrepareImport() between its processing stages
+        self.xCancel = None
+
+        # State of a scene creation started with StartFinishImport(), that has not been finished yet
+        self.dicSceneStages = None
 
     # enddef
 
@@ -54,14 +104,753 @@ class CPointCloud:
     # enddef
 
     ###################################################################
-    def Import(self, *, xContext, sFilePath, fImportPercent, fVoxelSize, bUseVoxel):
+    # Voxel size used for the last import
+    def GetVoxelSize(self):
+        return self.fVoxelSize
+
+    # enddef
+
+    ###################################################################
+    # Parameters chosen and times measured during the last import
+    def GetImportInfo(self):
+        return self.dicImportInfo
+
+    # enddef
+
+    ###################################################################
+    # lFrustumPlanes: optional list of frustum plane arrays as created by the 'frustum' or 'camera' modules.
+    #                 Only points inside at least one of the frustums are imported.
+    # fFrustumMargin: distance in world units by which the frustums are enlarged.
+    # aAdaptiveCenter: if given, the voxel size grows with the distance from this point, typically the camera position.
+    #                  See voxel.DownsampleAdaptive() for details.
+    # fAdaptiveSizePerDistance: voxel size growth per unit distance from the adaptive center.
+    # iAdaptiveMaxLevel: maximal voxel size is fVoxelSize * 2^iAdaptiveMaxLevel.
+    # fOutlierRadius: if larger than zero, points with fewer than iOutlierMinNeighbors other points
+    #                 within this distance are removed before voxelization.
+    # fPoissonMinDist: if larger than zero, the points are subsampled with a Poisson disk (blue noise)
+    #                  distribution, in which no two points are closer than this distance.
+    # sPointOrder: order of the points in the emitter mesh and color image.
+    #              None keeps the file order.
+    #              "MORTON" sorts the points along a Morton (Z-order) curve for memory locality.
+    #              "PROGRESSIVE" sorts the points such that every prefix is a spatially uniform subset.
+    #              In this case, fImportPercent selects such a prefix instead of every n-th point.
+    # iTargetPointCount: if given, the voxel size is chosen such that about this number of voxels is created.
+    #                    fVoxelSize is ignored in this case.
+    # fTimeBudget: if given, the import percentage is reduced such that the import is expected
+    #              to finish within this number of seconds. The chosen parameters are available
+    #              via GetImportInfo() after the import.
+    # bSpatialIndex: keep the imported points in a spatial index for QueryBox(), QueryRadius() and QueryNearest().
+    # iProgressiveSteps: if larger than one, the point cloud is first created with a coarse, spatially uniform
+    #                    subset of fProgressiveCoarsePercent percent of the points. The same object is then refined
+    #                    in iProgressiveSteps - 1 steps of geometrically growing point counts, without re-reading
+    #                    the source file. Not available together with distance adaptive voxel sizes.
+    # bProgressiveTimer: run the refinement steps from a Blender timer, so that the viewport is updated
+    #                    in between. Otherwise, or if Blender runs in background mode, all steps are
+    #                    run before this function returns. See also RefineStep().
+    # sBackend: how the points are instanced.
+    #           "PARTICLES" creates one triangle per point with a face emitter particle system,
+    #           and looks up the point colors in an image via the instancer UV coordinates.
+    #           "GEONODES" creates one vertex per point with a color attribute, and instances the prototype
+    #           with a Geometry Nodes modifier.
+    # sColorStorage: where the point colors are stored.
+    #                "IMAGE" writes them to a packed image, which the material looks up with per-point UV coordinates.
+    #                "ATTRIBUTE" writes them as color attribute of the point mesh, which the material reads with an
+    #                'Instancer' attribute node. This avoids creating and packing the image and the UV coordinates.
+    #                Only available with the "GEONODES" backend, as particles cannot read attributes of the emitter.
+    #                Defaults to "IMAGE" for the "PARTICLES" backend and "ATTRIBUTE" for the "GEONODES" backend.
+    # sPrototypeStyle: name of the shared library of particle prototypes and materials.
+    #                  All point clouds of the same style share the prototype meshes and materials,
+    #                  so changing a shared material affects all of them.
+    # sImageStorage: how the color and size images are stored.
+    #                "PACKED" packs the images into the Blender file, which encodes them as PNG.
+    #                "FILE" writes uncompressed files directly from the pixel buffers to sImageCachePath,
+    #                and loads them as external images with paths relative to the Blender file.
+    #                The color images are 8 bit TGA files, the size image is a float EXR file.
+    #                "GENERATED" keeps the generated images in memory only. This is the fastest option,
+    #                but the image contents are lost when the Blender file is saved and loaded again.
+    # sImageCachePath: folder for the "FILE" image storage. Defaults to a folder next to the Blender file.
+    #                  If the Blender file has not been saved yet, the images are packed instead.
+    # iViewportBudget: maximal number of points shown in the viewport. None shows all points.
+    #                  A budget of the scene, see 'pcimport.SetSceneViewportBudget()', is split over all point clouds
+    #                  and applies in addition. Renders always use all points. Particles are thinned out in steps
+    #                  of one percent, so a point cloud whose share is below one percent may be hidden in the viewport.
+    # dicOptions: import options, see the 'importoptions' module. The options can also be given as keyword
+    #             arguments, which replace those in dicOptions. All options listed above are import options,
+    #             except for fImportPercent and fTimeBudget.
+    def Import(self, *, xContext, sFilePath, fImportPercent, fTimeBudget=None, dicOptions=None, **kwargs):
+
+        fTimeStart = time.perf_counter()
+        lPos, lCol = self._ReadPly(sFilePath)
+        fTimeRead = time.perf_counter() - fTimeStart
+
+        self._ImportPoints(
+            xContext=xContext,
+            lPos=lPos,
+            lCol=lCol,
+            fTimeStart=fTimeStart,
+            fTimeRead=fTimeRead,
+            fImportPercent=fImportPercent,
+            fTimeBudget=fTimeBudget,
+            dicOptions=importoptions.GetImportOptions(dicOptions, **kwargs),
+        )
+
+    # enddef
+
+    ###################################################################
+    # Import points from numpy arrays instead of a file, with the same processing as Import().
+    # aPos: positions of shape (N, 3) as float32 or float64. Arrays of these types are used without copy.
+    # aCol: optional colors of shape (N, 3) or (N, 4) as uint8, uint16, or float in the range [0, 1].
+    #       If not given, all points are white.
+    # See Import() for the remaining parameters.
+    def ImportArrays(
+        self, *, xContext, aPos, aCol=None, fImportPercent=100.0, fTimeBudget=None, dicOptions=None, **kwargs
+    ):
+
+        fTimeStart = time.perf_counter()
+        lPos, lCol = self._PrepareArrays(aPos, aCol)
+
+        self._ImportPoints(
+            xContext=xContext,
+            lPos=lPos,
+            lCol=lCol,
+            fTimeStart=fTimeStart,
+            fTimeRead=time.perf_counter() - fTimeStart,
+            fImportPercent=fImportPercent,
+            fTimeBudget=fTimeBudget,
+            dicOptions=importoptions.GetImportOptions(dicOptions, **kwargs),
+        )
+
+    # enddef
+
+    ###################################################################
+    # Check position and color arrays given by the user, and bring them into the form
+    # used by the import pipeline, only copying them if necessary.
+    def _PrepareArrays(self, _aPos, _aCol):
+
+        lPos = np.asarray(_aPos)
+        if lPos.ndim != 2 or lPos.shape[1] != 3:
+            raise CAnyExcept("Point positions must be an array of shape (N, 3), not {0}".format(lPos.shape))
+        # endif
+        if lPos.dtype not in (np.float32, np.float64):
+            lPos = lPos.astype(np.float32)
+        # endif
+
+        if _aCol is None:
+            # Broadcast view of a single color, which does not allocate memory per point
+            return lPos, np.broadcast_to(np.array([255, 255, 255], dtype=np.uint8), (len(lPos), 3))
+        # endif
+
+        lCol = np.asarray(_aCol)
+        if lCol.ndim != 2 or lCol.shape[1] not in (3, 4) or len(lCol) != len(lPos):
+            raise CAnyExcept(
+                "Point colors must be an array of shape ({0}, 3) or ({0}, 4), not {1}".format(len(lPos), lCol.shape)
+            )
+        # endif
+        if not (np.issubdtype(lCol.dtype, np.unsignedinteger) or np.issubdtype(lCol.dtype, np.floating)):
+            raise CAnyExcept("Point colors of type '{0}' not supported".format(lCol.dtype))
+        # endif
+
+        return lPos, lCol
+
+    # enddef
+
+    ###################################################################
+    # Read a point cloud file and process its points, without creating any Blender data.
+    # This does not access Blender data, so that it can run in a worker thread.
+    # Pass the result to FinishImport() in the main thread. See Import() for the parameters.
+    # xCancel: optional threading.Event. If it is set, the processing stops with an exception
+    #          at the next processing stage.
+    def PrepareImport(
+        self, *, sFilePath, fImportPercent, fTimeBudget=None, xCancel=None, dicOptions=None, **kwargs
+    ):
+
+        self.xCancel = xCancel
+        try:
+            fTimeStart = time.perf_counter()
+            lPos, lCol = self._ReadPly(sFilePath)
+            self._CheckCancel()
+
+            return self._PreparePoints(
+                lPos=lPos,
+                lCol=lCol,
+                fTimeStart=fTimeStart,
+                fTimeRead=time.perf_counter() - fTimeStart,
+                fImportPercent=fImportPercent,
+                fTimeBudget=fTimeBudget,
+                **importoptions.GetImportOptions(dicOptions, **kwargs),
+            )
+        finally:
+            self.xCancel = None
+        # endtry
+
+    # enddef
+
+    ###################################################################
+    def _CheckCancel(self):
+        if self.xCancel is not None and self.xCancel.is_set():
+            raise CAnyExcept("Import of point cloud '{0}' cancelled".format(self.sName))
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Number of points processed by PrepareImport(), which FinishImport() would create
+    def GetPreparedPointCount(self, _dicPrepared):
+        return len(_dicPrepared["lPos"])
+
+    # enddef
+
+    ###################################################################
+    # Reduce the points processed by PrepareImport() to iPointCount points, for example to meet a point budget
+    # that is shared with other point clouds. The kept points are a spatially uniform subset, which stays in
+    # the order chosen by sPointOrder. For point clouds with LOD levels, only the imported level is reduced.
+    # Does not access Blender data, so that it can run in a worker thread.
+    def LimitPreparedPoints(self, *, dicPrepared, iPointCount):
+
+        lPos = dicPrepared["lPos"]
+        iPntCnt = len(lPos)
+        iPointCount = max(0, int(iPointCount))
+        if iPointCount >= iPntCnt:
+            return
+        # endif
+
+        print("Limiting point cloud '{0}' to {1} of {2} points...".format(self.sName, iPointCount, iPntCnt))
+        dicProg = self.dicProgressive
+        if dicProg is not None:
+            lOrder = dicProg["lProgOrder"]
+        elif self.sPointOrder == "PROGRESSIVE":
+            lOrder = np.arange(iPntCnt)
+        else:
+            lOrder = voxel.GetProgressiveOrder(lPos)
+        # endif
+
+        lSelIdx = np.sort(lOrder[0:iPointCount])
+        lPos = lPos[lSelIdx]
+        lCol = self._TakeColors(dicPrepared["lCol"], lSelIdx)
+        lSize = dicPrepared["lSize"]
+        dicPrepared.update(
+            {
+                "lPos": lPos,
+                "lCol": lCol,
+                "lSize": None if lSize is None else lSize[lSelIdx],
+                "fImportPercent": dicPrepared["fImportPercent"] * iPointCount / iPntCnt,
+            }
+        )
+
+        if dicProg is not None:
+            # The prefixes of the progressive order of the kept points are the same as before
+            lStepCounts = voxel.GetProgressiveCounts(
+                iPointCount, len(dicProg["lStepCounts"]), dicProg["fCoarsePercent"]
+            )
+            if len(lStepCounts) > 1:
+                dicProg.update(
+                    {
+                        "lPos": lPos,
+                        "lCol": lCol,
+                        "lProgOrder": np.searchsorted(lSelIdx, lOrder[0:iPointCount]),
+                        "lStepCounts": lStepCounts,
+                    }
+                )
+                return
+            # endif
+
+            self.dicProgressive = None
+            if dicProg["bSpatialIndex"]:
+                self._BuildIndex(lPos=lPos, lCol=lCol)
+            # endif
+
+        elif self.xIndex is not None:
+            self._BuildIndex(lPos=lPos, lCol=lCol)
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Create the Blender data of points processed by PrepareImport()
+    def FinishImport(self, *, xContext, dicPrepared):
+
+        self.StartFinishImport(dicPrepared=dicPrepared)
+        while self.FinishImportStep(xContext=xContext):
+            pass
+        # endwhile
+
+    # enddef
+
+    ###################################################################
+    # Start the creation of the Blender data of points processed by PrepareImport().
+    # The data is created in stages, for example the color images, the mesh and the particle system,
+    # by calling FinishImportStep() until it returns False. The user interface can be updated in between.
+    def StartFinishImport(self, *, dicPrepared):
+
+        xStages = self._IterCreatePoints(dicPrepared=dicPrepared)
+        # Run to the first stage, which waits for the context
+        next(xStages)
+        self.dicSceneStages = {
+            "dicPrepared": dicPrepared,
+            "xStages": xStages,
+            "fTimeScene": 0.0,
+        }
+
+    # enddef
+
+    ###################################################################
+    # Create the next stage of the Blender data started with StartFinishImport().
+    # Returns True, if further stages are pending.
+    def FinishImportStep(self, *, xContext):
+
+        dicStages = self.dicSceneStages
+        if dicStages is None:
+            return False
+        # endif
+
+        fTimeStart = time.perf_counter()
+        try:
+            dicStages["xStages"].send(xContext)
+            bPending = True
+        except StopIteration:
+            bPending = False
+        # endtry
+        dicStages["fTimeScene"] += time.perf_counter() - fTimeStart
+
+        if bPending:
+            return True
+        # endif
+
+        self.dicSceneStages = None
+        self._EndCreatePoints(dicPrepared=dicStages["dicPrepared"], fTimeScene=dicStages["fTimeScene"])
+        return False
+
+    # enddef
+
+    ###################################################################
+    # Processing pipeline shared by Import() and ImportArrays()
+    def _ImportPoints(self, *, xContext, dicOptions, **kwargs):
+        self.FinishImport(xContext=xContext, dicPrepared=self._PreparePoints(**kwargs, **dicOptions))
+
+    # enddef
+
+    ###################################################################
+    # Point processing of the import pipeline. Does not access Blender data.
+    # Expects all import options as keyword arguments, as returned by importoptions.GetImportOptions(),
+    # so that the parameters have no defaults here.
+    # Returns the processed points and the import settings used by FinishImport().
+    def _PreparePoints(
+        self,
+        *,
+        lPos,
+        lCol,
+        fTimeStart,
+        fTimeRead,
+        fImportPercent,
+        fTimeBudget,
+        fVoxelSize,
+        bUseVoxel,
+        iLodLevelCount,
+        iLodLevel,
+        lFrustumPlanes,
+        fFrustumMargin,
+        aAdaptiveCenter,
+        fAdaptiveSizePerDistance,
+        iAdaptiveMaxLevel,
+        fOutlierRadius,
+        iOutlierMinNeighbors,
+        fPoissonMinDist,
+        iTargetPointCount,
+        sPointOrder,
+        bSpatialIndex,
+        iProgressiveSteps,
+        fProgressiveCoarsePercent,
+        bProgressiveTimer,
+        sBackend,
+        sColorStorage,
+        sPrototypeStyle,
+        sImageStorage,
+        sImageCachePath,
+        iViewportBudget,
+    ):
+
+        self.dicProgressive = None
+        if sBackend not in ["PARTICLES", "GEONODES"]:
+            raise CAnyExcept("Unknown point cloud backend '{0}'".format(sBackend))
+        # endif
+        self.sBackend = sBackend
+
+        if sColorStorage is None:
+            sColorStorage = "IMAGE" if sBackend == "PARTICLES" else "ATTRIBUTE"
+        # endif
+        if sColorStorage not in ["IMAGE", "ATTRIBUTE"]:
+            raise CAnyExcept("Unknown color storage '{0}'".format(sColorStorage))
+        # endif
+        if sColorStorage == "ATTRIBUTE" and sBackend != "GEONODES":
+            raise CAnyExcept("Color attributes are only available with the 'GEONODES' backend")
+        # endif
+        self.sColorStorage = sColorStorage
+        self.sPrototypeStyle = sPrototypeStyle
+
+        if sImageStorage not in ["PACKED", "FILE", "GENERATED"]:
+            raise CAnyExcept("Unknown image storage '{0}'".format(sImageStorage))
+        # endif
+        self.sImageStorage = sImageStorage
+        self.sImageCachePath = sImageCachePath
+        self.iViewportBudget = iViewportBudget
+
+        if lFrustumPlanes is not None:
+            print("Culling points outside of {0} camera frustum(s)...".format(len(lFrustumPlanes)))
+            aMask = frustum.GetInsideMaskUnion(lPos, lFrustumPlanes, fMargin=fFrustumMargin)
+            lPos = lPos[aMask]
+            lCol = self._TakeColors(lCol, aMask)
+            print("Keeping {0} points inside camera frustum(s)".format(len(lPos)))
+            self._CheckCancel()
+        # endif
+
+        if fTimeBudget is not None:
+            fImportPercent = self._PlanTimeBudget(
+                lPos=lPos,
+                fImportPercent=fImportPercent,
+                fVoxelSize=fVoxelSize,
+                bUseVoxel=bUseVoxel,
+                fTimeRemain=fTimeBudget - (time.perf_counter() - fTimeStart),
+            )
+        # endif
+
+        lPos, lCol = self._SelectPoints(lPos, lCol, fImportPercent, bProgressive=sPointOrder == "PROGRESSIVE")
+        self._CheckCancel()
+
+        if fOutlierRadius > 0.0:
+            print(
+                "Removing points with less than {0} neighbors within {1}...".format(
+                    iOutlierMinNeighbors, fOutlierRadius
+                )
+            )
+            aMask = filters.GetRadiusInlierMask(aPos=lPos, fRadius=fOutlierRadius, iMinNeighbors=iOutlierMinNeighbors)
+            print("Removed {0} outliers".format(len(lPos) - np.count_nonzero(aMask)))
+            lPos = lPos[aMask]
+            lCol = self._TakeColors(lCol, aMask)
+            self._CheckCancel()
+        # endif
+
+        if fPoissonMinDist > 0.0:
+            print("Poisson disk subsampling with minimal distance {0}...".format(fPoissonMinDist))
+            lSelIdx = filters.GetPoissonDiskIndices(aPos=lPos, fMinDist=fPoissonMinDist)
+            lPos = lPos[lSelIdx]
+            lCol = self._TakeColors(lCol, lSelIdx)
+            self._CheckCancel()
+        # endif
+
+        iElCnt = len(lPos)
+        print("Using {0} elements...".format(iElCnt))
+
+        if bUseVoxel and iTargetPointCount is not None and iTargetPointCount > 0:
+            print("Searching voxel size for {0} points...".format(iTargetPointCount))
+            fVoxelSize, iVoxelCnt = voxel.FindVoxelSizeForCount(aPos=lPos, iTargetCount=iTargetPointCount)
+            print("Using voxel size {0} with {1} voxel".format(fVoxelSize, iVoxelCnt))
+            self._CheckCancel()
+        # endif
+        self.fVoxelSize = fVoxelSize
+
+        lSize = None
+        if bUseVoxel and aAdaptiveCenter is not None:
+            print("Mapping vertices to distance adaptive voxel grid...")
+            lPos, lGidx, lSize = voxel.DownsampleAdaptive(
+                aPos=lPos,
+                fVoxelSize=fVoxelSize,
+                aCenter=aAdaptiveCenter,
+                fSizePerDistance=fAdaptiveSizePerDistance,
+                iMaxLevel=iAdaptiveMaxLevel,
+            )
+            print("Using {0} voxel with sizes from {1} to {2}...".format(len(lPos), lSize.min(), lSize.max()))
+            lCol = self._TakeColors(lCol, lGidx)
+
+        elif bUseVoxel and iLodLevelCount > 1:
+            print("Building LOD hierarchy with up to {0} levels...".format(iLodLevelCount))
+            self.xLod = CPointCloudLod()
+            self.xLod.Build(aPos=lPos, fVoxelSize=fVoxelSize, iLevelCount=iLodLevelCount)
+            self.lLodCol = lCol
+            self.iLodLevel = min(max(iLodLevel, 0), self.xLod.GetLevelCount() - 1)
+            for iLevel in range(self.xLod.GetLevelCount()):
+                print("LOD level {0}: {1} voxel".format(iLevel, self.xLod.GetPointCount(iLevel)))
+            # endfor
+
+            lPos = self.xLod.GetPositions(self.iLodLevel)
+            lCol = self._TakeColors(lCol, self.xLod.GetIndices(self.iLodLevel))
+            fVoxelSize = self.xLod.GetVoxelSize(self.iLodLevel)
+
+        elif bUseVoxel:
+            print("Mapping vertices to voxel grid...")
+            lPos, lGidx = voxel.Downsample(aPos=lPos, fVoxelSize=fVoxelSize)
+            print("Using {0} voxel...".format(len(lPos)))
+            lCol = self._TakeColors(lCol, lGidx)
+        # endif
+
+        self._CheckCancel()
+        self.sPointOrder = sPointOrder
+        lPos, lCol, lSize = self._OrderPoints(lPos, lCol, lSize)
+        self._CheckCancel()
+
+        lStepCounts = [len(lPos)]
+        if iProgressiveSteps > 1:
+            if lSize is not None:
+                print("Progressive import is not available with distance adaptive voxel sizes")
+            else:
+                lStepCounts = voxel.GetProgressiveCounts(len(lPos), iProgressiveSteps, fProgressiveCoarsePercent)
+            # endif
+        # endif
 
-        print("Reading data from '{0}'...".format(sFilePath))
+        self.xIndex = None
+        self.lIndexCol = None
+
+        if len(lStepCounts) > 1:
+            # Every prefix of the progressive order is a spatially uniform subset.
+            # The points of each step are kept in the order chosen by sPointOrder.
+            self.dicProgressive = {
+                "lPos": lPos,
+                "lCol": lCol,
+                "lProgOrder": (
+                    np.arange(len(lPos)) if sPointOrder == "PROGRESSIVE" else voxel.GetProgressiveOrder(lPos)
+                ),
+                "fVoxelSize": fVoxelSize,
+                "lStepCounts": lStepCounts,
+                "fCoarsePercent": fProgressiveCoarsePercent,
+                "iStep": 0,
+                "bSpatialIndex": bSpatialIndex,
+            }
+        elif bSpatialIndex:
+            self._BuildIndex(lPos=lPos, lCol=lCol)
+        # endif
+        self._CheckCancel()
+
+        return {
+            "lPos": lPos,
+            "lCol": lCol,
+            "lSize": lSize,
+            "fVoxelSize": fVoxelSize,
+            "bUseVoxel": bUseVoxel,
+            "fImportPercent": fImportPercent,
+            "bProgressiveTimer": bProgressiveTimer,
+            "fTimeBudget": fTimeBudget,
+            "fTimeStart": fTimeStart,
+            "fTimeRead": fTimeRead,
+        }
+
+    # enddef
+
+    ###################################################################
+    # Scene creation of the import pipeline, for the points returned by _PreparePoints().
+    # Generator that creates one stage of the scene for each context sent to it.
+    def _IterCreatePoints(self, *, dicPrepared):
+
+        xContext = yield
+
+        lPos = dicPrepared["lPos"]
+        lCol = dicPrepared["lCol"]
+        fVoxelSize = dicPrepared["fVoxelSize"]
+
+        if self.dicProgressive is not None:
+            lStepCounts = self.dicProgressive["lStepCounts"]
+            print("Creating coarse point cloud with {0} points...".format(lStepCounts[0]))
+            lStepIdx = self._GetProgressiveIndices(lStepCounts[0])
+            yield from self._IterCreateScene(
+                xContext=xContext, lPos=lPos[lStepIdx], lCol=self._TakeColors(lCol, lStepIdx), fVoxelSize=fVoxelSize
+            )
+
+        else:
+            yield from self._IterCreateScene(
+                xContext=xContext, lPos=lPos, lCol=lCol, fVoxelSize=fVoxelSize, lSize=dicPrepared["lSize"]
+            )
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Last step of the scene creation, after all stages of _IterCreatePoints() have run.
+    # fTimeScene: time spent in the stages, without the time the user interface ran in between.
+    def _EndCreatePoints(self, *, dicPrepared, fTimeScene):
+
+        lPos = dicPrepared["lPos"]
+        fVoxelSize = dicPrepared["fVoxelSize"]
+        fImportPercent = dicPrepared["fImportPercent"]
+        fTimeStart = dicPrepared["fTimeStart"]
+
+        fTimeViewport = time.perf_counter()
+        self._ApplyViewportBudget(bScene=False)
+        fTimeEnd = time.perf_counter()
+        fTimeScene += fTimeEnd - fTimeViewport
+
+        if len(lPos) > 0 and self.dicProgressive is None:
+            # Running average of the scene creation time per point
+            fTimePerPoint = fTimeScene / len(lPos)
+            CPointCloud.fSceneTimePerPoint = 0.5 * (CPointCloud.fSceneTimePerPoint + fTimePerPoint)
+        # endif
+
+        self.dicImportInfo = {
+            "fImportPercent": fImportPercent,
+            "fVoxelSize": fVoxelSize if dicPrepared["bUseVoxel"] else None,
+            "iPointCount": len(lPos),
+            "fTimeBudget": dicPrepared["fTimeBudget"],
+            "fTimeRead": dicPrepared["fTimeRead"],
+            "fTimeScene": fTimeScene,
+            "fTimeTotal": fTimeEnd - fTimeStart,
+        }
+        print(
+            "Imported {0} points in {1:.2f}s (import percentage {2:.3g}%)".format(
+                len(lPos), fTimeEnd - fTimeStart, fImportPercent
+            )
+        )
+
+        if self.dicProgressive is not None:
+            if dicPrepared["bProgressiveTimer"] and not bpy.app.background:
+                bpy.app.timers.register(self._OnProgressiveTimer, first_interval=0.1)
+            else:
+                self.RefineAll()
+            # endif
+        # endif
+
+    # enddef
+
+    ###################################################################
+    def _GetProgressiveIndices(self, _iCount):
+        return np.sort(self.dicProgressive.get("lProgOrder")[0:_iCount])
+
+    # enddef
+
+    ###################################################################
+    # True, if a progressive import has not reached the full point density yet
+    def IsRefinementPending(self):
+        return self.dicProgressive is not None
+
+    # enddef
+
+    ###################################################################
+    # Run the next refinement step of a progressive import.
+    # Returns True, if further steps are pending.
+    def RefineStep(self):
+
+        if self.dicProgressive is None:
+            return False
+        # endif
+
+        dicProg = self.dicProgressive
+        dicProg["iStep"] += 1
+        iCount = dicProg.get("lStepCounts")[dicProg.get("iStep")]
+        lPos = dicProg.get("lPos")
+        lCol = dicProg.get("lCol")
+
+        print("Refining point cloud '{0}' to {1} points...".format(self.sName, iCount))
+        if iCount < len(lPos):
+            lStepIdx = self._GetProgressiveIndices(iCount)
+            lPos = lPos[lStepIdx]
+            lCol = self._TakeColors(lCol, lStepIdx)
+        # endif
+        self._UpdateScene(lPos=lPos, lCol=lCol, fVoxelSize=dicProg.get("fVoxelSize"))
+
+        if dicProg.get("iStep") + 1 < len(dicProg.get("lStepCounts")):
+            return True
+        # endif
+
+        self.dicProgressive = None
+        if dicProg.get("bSpatialIndex"):
+            self._BuildIndex(lPos=lPos, lCol=lCol)
+        # endif
+
+        return False
+
+    # enddef
+
+    ###################################################################
+    # Run all pending refinement steps of a progressive import
+    def RefineAll(self):
+
+        while self.RefineStep():
+            pass
+        # endwhile
+
+    # enddef
+
+    ###################################################################
+    # Blender timer callback. Returns the interval to the next call, or None to stop the timer.
+    def _OnProgressiveTimer(self):
+
+        if self.dicProgressive is None:
+            return None
+        # endif
+
+        if bpy.data.objects.get(self.sName) is None:
+            # The point cloud has been removed in the meantime
+            self.dicProgressive = None
+            return None
+        # endif
+
+        return 0.1 if self.RefineStep() else None
+
+    # enddef
+
+    ###################################################################
+    # Choose the import percentage for the remaining time budget.
+    # The processing time per point is measured on a sample of the points of the current file,
+    # and the scene creation time per point is estimated from previous imports.
+    def _PlanTimeBudget(self, *, lPos, fImportPercent, fVoxelSize, bUseVoxel, fTimeRemain):
+
+        iPntCnt = len(lPos)
+        if iPntCnt == 0:
+            return fImportPercent
+        # endif
+
+        iSampleStep = max(1, iPntCnt // 65536)
+        lSample = lPos[::iSampleStep]
+
+        fTimeSample = time.perf_counter()
+        lSampleValid = lSample[np.all(np.isfinite(lSample), axis=1)]
+        fOutRatio = 1.0
+        if bUseVoxel and len(lSampleValid) > 0:
+            lVoxPos, _ = voxel.Downsample(aPos=lSampleValid, fVoxelSize=fVoxelSize)
+            # The ratio on a sparse sample is higher than on all points, which is the safe side.
+            fOutRatio = len(lVoxPos) / len(lSampleValid)
+        # endif
+        fProcTimePerPoint = (time.perf_counter() - fTimeSample) / len(lSample)
+
+        fTimePerPoint = fProcTimePerPoint + fOutRatio * CPointCloud.fSceneTimePerPoint
+        fMaxPercent = 100.0 * max(fTimeRemain, 0.0) / (fTimePerPoint * iPntCnt)
+        fPlanPercent = min(fImportPercent, max(fMaxPercent, 100.0 / iPntCnt))
+
+        print(
+            "Time budget: {0:.2f}s remaining, {1:.3g}s per point, using {2:.3g}% of points".format(
+                fTimeRemain, fTimePerPoint, fPlanPercent
+            )
+        )
+
+        return fPlanPercent
+
+    # enddef
+
+    ###################################################################
+    # Sort the points according to the point order of the point cloud
+    def _OrderPoints(self, _lPos, _lCol, _lSize=None):
+
+        if self.sPointOrder is None:
+            return _lPos, _lCol, _lSize
+        elif self.sPointOrder == "MORTON":
+            print("Sorting points in Morton order...")
+            lOrder = voxel.GetMortonOrder(_lPos)
+        elif self.sPointOrder == "PROGRESSIVE":
+            print("Sorting points in progressive order...")
+            lOrder = voxel.GetProgressiveOrder(_lPos)
+        else:
+            raise CAnyExcept("Unknown point order '{0}'".format(self.sPointOrder))
+        # endif
+
+        return _lPos[lOrder], self._TakeColors(_lCol, lOrder), None if _lSize is None else _lSize[lOrder]
+
+    # enddef
+
+    ###################################################################
+    # Read positions and colors of all vertices from a PLY file
+    def _ReadPly(self, _sFilePath):
+
+        print("Reading data from '{0}'...".format(_sFilePath))
         xPly = CPlyReader()
-        xPly.Read(sFilePath)
+        xPly.Read(_sFilePath)
         xVexList = xPly.GetElement("vertex")
 
-        fPerc = fImportPercent / 100.0
         iTotalElCnt = xVexList.GetValueCount()
         print("Found {0} elements. Reading...".format(iTotalElCnt))
         # return {"FINISHED"}
@@ -72,84 +861,310 @@ class CPointCloud:
             xVexList.GetPropertyValues("z").astype(np.float32),
         ]
 
-        lColFull = (
-            np.c_[
-                xVexList.GetPropertyValues("red").astype(np.float32),
-                xVexList.GetPropertyValues("green").astype(np.float32),
-                xVexList.GetPropertyValues("blue").astype(np.float32),
-            ]
-            / 255.0
-        )
+        # Keep the colors in the data type of the file, for example uint8.
+        # They are only converted to float when they are written to the color image.
+        lColProps = [xVexList.GetPropertyValues(x) for x in ["red", "green", "blue"]]
+        lColFull = np.empty((iTotalElCnt, 3), dtype=np.result_type(*lColProps).newbyteorder("="))
+        for iIdx, lValues in enumerate(lColProps):
+            lColFull[:, iIdx] = lValues
+        # endfor
+
+        return lPosFull, lColFull
+
+    # enddef
+
+    ###################################################################
+    # Remove invalid points and extract the given percentage of points
+    # If bProgressive is True, the points are taken as prefix of the progressive order,
+    # which gives a spatially uniform subset, instead of every n-th point in file order.
+    def _SelectPoints(self, _lPosFull, _lColFull, _fImportPercent, bProgressive=False):
+
+        fPerc = _fImportPercent / 100.0
+        iTotalElCnt = len(_lPosFull)
 
         print("Checking validity...")
-        lPosIdx = np.transpose(np.argwhere(np.all(np.isfinite(lPosFull), axis=1)))[
-            0
-        ].astype(int)
-        lPosValid = lPosFull[lPosIdx]
-        lColValid = lColFull[lPosIdx]
-
-        print("Extracting {0}% of points".format(fImportPercent))
-        if fPerc == 1.0:
-            lPos = lPosValid
-            lCol = lColValid
-        elif fPerc * iTotalElCnt < 1.0:
-            lPos = [lPosValid[0]]
-            lCol = [lColValid[0]]
+        aValid = np.all(np.isfinite(_lPosFull), axis=1)
+        if np.all(aValid):
+            # Keep views of the input arrays
+            lPosValid = _lPosFull
+            lColValid = _lColFull
         else:
-            lDataIdx = np.transpose(
-                np.argwhere(
-                    np.round(np.fmod(fPerc * np.arange(len(lPosValid)), 1.0), 2) < fPerc
-                )
-            )[0]
-            lPos = lPosValid[lDataIdx]
-            lCol = lColValid[lDataIdx]
+            lPosIdx = np.flatnonzero(aValid)
+            lPosValid = _lPosFull[lPosIdx]
+            lColValid = self._TakeColors(_lColFull, lPosIdx)
         # endif
+        iValidCnt = len(lPosValid)
 
-        iElCnt = len(lPos)
-        print("Using {0} elements...".format(iElCnt))
+        print("Extracting {0}% of points".format(_fImportPercent))
+        if fPerc >= 1.0 or iValidCnt == 0:
+            return lPosValid, lColValid
+        # endif
 
-        print("Preparing colors...")
-        lCol = np.c_[lCol, np.ones(iElCnt)]
+        if fPerc * iTotalElCnt < 1.0:
+            return lPosValid[0:1], lColValid[0:1]
+        # endif
 
-        if bUseVoxel:
-            print("Mapping vertices to voxel grid...")
-            lG, lGidx = np.unique(
-                np.round(lPos / fVoxelSize), return_index=True, axis=0
+        if bProgressive:
+            lDataIdx = voxel.GetProgressiveOrder(lPosValid)[0 : int(round(fPerc * iValidCnt))]
+            lDataIdx.sort()
+            return lPosValid[lDataIdx], self._TakeColors(lColValid, lDataIdx)
+        # endif
+
+        # Evenly spaced selection of the requested number of points.
+        # If every n-th point gives the requested count, strided views are used instead of copies.
+        iSelCnt = max(1, int(round(fPerc * iValidCnt)))
+        iStride = max(1, iValidCnt // iSelCnt)
+        if len(range(0, iValidCnt, iStride)) == iSelCnt:
+            return lPosValid[::iStride], lColValid[::iStride]
+        # endif
+
+        lDataIdx = np.linspace(0, iValidCnt - 1, iSelCnt).astype(np.int64)
+        return lPosValid[lDataIdx], self._TakeColors(lColValid, lDataIdx)
+
+    # enddef
+
+    ###################################################################
+    # Select rows of a color array. Broadcast arrays of a single color, as created for
+    # point clouds without colors, stay broadcast views instead of being copied.
+    def _TakeColors(self, _lCol, _xSel):
+
+        if _lCol.ndim == 2 and _lCol.strides[0] == 0:
+            iCnt = np.count_nonzero(_xSel) if np.asarray(_xSel).dtype == bool else len(_xSel)
+            return np.broadcast_to(_lCol[0], (iCnt, _lCol.shape[1]))
+        # endif
+
+        return _lCol[_xSel]
+
+    # enddef
+
+    ###################################################################
+    # Size of the color images with one pixel per point. The images are close to square
+    # and at most iMaxImageSize wide and high. If one image cannot hold all points,
+    # the points are split evenly across several images of this size.
+    def _GetImageSize(self, _iVexCnt):
+        iImgCnt = self._GetImageCount(_iVexCnt)
+        iPixelCnt = max(1, int(math.ceil(_iVexCnt / iImgCnt)))
+        iImgW = int(math.ceil(math.sqrt(iPixelCnt)))
+        iImgH = int(math.ceil(iPixelCnt / iImgW))
+        return iImgW, iImgH
+
+    # enddef
+
+    ###################################################################
+    # Number of color images needed for the given number of points
+    def _GetImageCount(self, _iVexCnt):
+        return max(1, int(math.ceil(_iVexCnt / (self.iMaxImageSize * self.iMaxImageSize))))
+
+    # enddef
+
+    ###################################################################
+    # Scale factor that maps colors of the given type to the range [0, 1]
+    @staticmethod
+    def _GetColorScale(_xDType):
+        if np.issubdtype(_xDType, np.integer):
+            return 1.0 / np.iinfo(_xDType).max
+        # endif
+        return 1.0
+
+    # enddef
+
+    ###################################################################
+    # Convert colors with 3 (RGB) or 4 (RGBA) channels of any integer or float type to float RGBA,
+    # directly in a preallocated buffer of iCount colors. Additional colors are set to zero.
+    def _GetColorsRgba(self, _lCol, _iCount):
+
+        iColorCnt, iChannelCnt = _lCol.shape
+
+        aRgba = np.zeros((_iCount, 4), dtype=np.float32)
+        fScale = self._GetColorScale(_lCol.dtype)
+        if fScale == 1.0:
+            aRgba[0:iColorCnt, 0:iChannelCnt] = _lCol
+        else:
+            np.multiply(_lCol, np.float32(fScale), out=aRgba[0:iColorCnt, 0:iChannelCnt], casting="unsafe")
+        # endif
+        if iChannelCnt < 4:
+            aRgba[0:iColorCnt, 3] = 1.0
+        # endif
+
+        return aRgba
+
+    # enddef
+
+    ###################################################################
+    # Convert colors like _GetColorsRgba(), but to 8 bit RGBA. 8 bit colors are copied without conversion.
+    def _GetColorsRgba8(self, _lCol, _iCount):
+
+        iColorCnt, iChannelCnt = _lCol.shape
+
+        aRgba = np.zeros((_iCount, 4), dtype=np.uint8)
+        if _lCol.dtype == np.uint8:
+            aRgba[0:iColorCnt, 0:iChannelCnt] = _lCol
+        else:
+            fScale = self._GetColorScale(_lCol.dtype)
+            aRgba[0:iColorCnt, 0:iChannelCnt] = imagefile.ToUint8(
+                _lCol if fScale == 1.0 else np.multiply(_lCol, np.float32(fScale))
             )
-            lPos = lG * fVoxelSize
-            print("Using {0} voxel...".format(len(lPos)))
-            lCol = lCol[lGidx]
+        # endif
+        if iChannelCnt < 4:
+            aRgba[0:iColorCnt, 3] = 255
         # endif
 
-        lCol_flat = lCol.flatten()
+        return aRgba
 
-        print("Creating image...")
-        iVexCnt = len(lPos)
-        iImgW = 2048
-        iImgH = int(math.ceil(iVexCnt / iImgW))
-        dHalfX = 1.0 / (2.0 * iImgW)
-        dHalfY = 1.0 / (2.0 * iImgH)
-
-        sImgName = self.sName + ".Color"
-        imgA = bpy.data.images.new(sImgName, iImgW, iImgH)
-        sImgName = imgA.name
-        # bpy.ops.image.new(name=sImgName, width=iImgW, height=iImgH)
-        # imgA = bpy.data.images[sImgName]
+    # enddef
+
+    ###################################################################
+    # Write colors with 3 (RGB) or 4 (RGBA) channels of any integer or float type to an image.
+    # The colors are converted to float RGBA directly in a preallocated pixel buffer. Unused pixels are set to zero.
+    def _SetImagePixels(self, *, imgA, lCol):
+
+        iImgW, iImgH = imgA.size
+        aPixels = self._GetColorsRgba(lCol, iImgW * iImgH)
+
+        # Bulk copy of the contiguous buffer, without creating Python float objects
+        imgA.pixels.foreach_set(aPixels.ravel())
+        imgA.update()
+        if self.sImageStorage == "PACKED":
+            anyblend.ops_image.Pack(imgA)
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Folder of the image files of the "FILE" image storage.
+    # Returns None, if the folder is relative to the Blender file, but the Blender file has not been saved yet.
+    def _GetImageCachePath(self):
+
+        bSaved = len(bpy.data.filepath) > 0
+        if self.sImageCachePath is not None:
+            if self.sImageCachePath.startswith("//") and not bSaved:
+                return None
+            # endif
+            return bpy.path.abspath(self.sImageCachePath)
+        # endif
+
+        if bSaved:
+            return bpy.path.abspath("//{0}.pointcloud".format(bpy.path.display_name_from_filepath(bpy.data.filepath)))
+        # endif
+
+        return None
+
+    # enddef
+
+    ###################################################################
+    # Write the pixels of the "FILE" image storage. The file type is given by the file extension.
+    def _WriteImageFile(self, _sFpImage, *, lCol, iImgW, iImgH):
+
+        if _sFpImage.lower().endswith(".exr"):
+            imagefile.WriteExr(_sFpImage, self._GetColorsRgba(lCol, iImgW * iImgH).reshape(iImgH, iImgW, 4))
+        else:
+            imagefile.WriteTga(_sFpImage, self._GetColorsRgba8(lCol, iImgW * iImgH).reshape(iImgH, iImgW, 4))
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Path of an image file as stored in the image, relative to the Blender file if possible,
+    # so that the Blender file can be moved together with its image cache folder.
+    @staticmethod
+    def _GetImageFilePath(_sFpImage):
+
+        if len(bpy.data.filepath) == 0:
+            return _sFpImage
+        # endif
+
+        try:
+            return bpy.path.relpath(_sFpImage)
+        except ValueError:
+            # For example on Windows, if the image is on another drive than the Blender file
+            return _sFpImage
+        # endtry
+
+    # enddef
+
+    ###################################################################
+    @staticmethod
+    def _SetDataColorSpace(_imgA, _bData):
+        if _bData and _imgA.colorspace_settings.name != "Non-Color":
+            _imgA.colorspace_settings.name = "Non-Color"
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Create an image with one pixel per point, stored as given by the image storage option
+    # bData: the image stores data instead of colors, like the particle sizes. It uses a float buffer
+    #        and the 'Non-Color' color space, so that the values are neither quantized nor color managed.
+    def _CreateImage(self, *, sName, lCol, iImgW, iImgH, bData=False):
+
+        sCachePath = None
+        if self.sImageStorage == "FILE":
+            sCachePath = self._GetImageCachePath()
+            if sCachePath is None:
+                print("Image storage 'FILE' needs a saved Blender file or an image cache path. Packing images instead.")
+                self.sImageStorage = "PACKED"
+            # endif
+        # endif
+
+        if self.sImageStorage == "FILE":
+            # The file is named after the unique image name, so that point clouds
+            # with the same name do not overwrite each other's images.
+            # Data images are written as float EXR files, color images as 8 bit TGA files.
+            imgA = bpy.data.images.new(sName, 1, 1)
+            sFpImage = os.path.join(sCachePath, bpy.path.clean_name(imgA.name) + (".exr" if bData else ".tga"))
+            self._WriteImageFile(sFpImage, lCol=lCol, iImgW=iImgW, iImgH=iImgH)
+            imgA.source = "FILE"
+            imgA.filepath = self._GetImageFilePath(sFpImage)
+            self._SetDataColorSpace(imgA, bData)
+            imgA.reload()
+        else:
+            imgA = bpy.data.images.new(sName, iImgW, iImgH, float_buffer=bData, is_data=bData)
+            # A change of the color space regenerates the pixels, so it is set first
+            self._SetDataColorSpace(imgA, bData)
+            self._SetImagePixels(imgA=imgA, lCol=lCol)
+        # endif
         imgA.use_fake_user = True
 
-        iPixCnt = iImgW * iImgH
-        iColorCnt = len(lCol)
+        return imgA
+
+    # enddef
+
+    ###################################################################
+    # Replace the pixels of an image created with _CreateImage()
+    def _UpdateImage(self, *, imgA, lCol, iImgW, iImgH):
+
+        if self.sImageStorage == "FILE":
+            self._WriteImageFile(bpy.path.abspath(imgA.filepath), lCol=lCol, iImgW=iImgW, iImgH=iImgH)
+            imgA.reload()
+        else:
+            imgA.scale(iImgW, iImgH)
+            self._SetImagePixels(imgA=imgA, lCol=lCol)
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Texture coordinates of the pixel centers of the first iCount pixels of the color images.
+    # The images are stacked along V, so that the integer part of V is the image index.
+    def _GetPixelUvs(self, _iCount, _iImgW, _iImgH):
+
+        aIdx = np.arange(_iCount)
+        aUv = np.empty((_iCount, 2), dtype=np.float32)
+        aUv[:, 0] = (aIdx % _iImgW + 0.5) / _iImgW
+        aUv[:, 1] = (aIdx // _iImgW + 0.5) / _iImgH
+        return aUv
+
+    # enddef
 
-        iAddCnt = iPixCnt - iColorCnt
-        imgA.pixels = list(np.r_[lCol_flat, np.zeros(iAddCnt * 4)])
-        anyblend.ops_image.Pack(imgA)
+    ###################################################################
+    # Create the emitter mesh with one triangle per point and texture
+    # coordinates that map each triangle to its pixel in the color image.
+    # Generator that creates the vertices, the faces and the texture coordinates in separate stages.
+    def _IterCreateEmitterMesh(self, *, meshA, lPos, fVoxelSize, iImgW, iImgH):
+
+        iVexCnt = len(lPos)
+        sMeshName = meshA.name
 
-        # print(imgA.name)
-        texA = bpy.data.textures.new(self.sName + ".Color.Tex", type="IMAGE")
-        # print(texA.name)
-        texA.image = imgA
-        texA.use_fake_user = True
-        # print(texA.image.name)
         print("Creating vertex list...")
 
         #################################
@@ -170,100 +1185,319 @@ class CPointCloud:
         # Triangles
         dH2 = math.sqrt(3) * 0.25 * fVoxelSize
         dS2 = fVoxelSize * 0.5
-        lV1 = lPos + [-dS2, -dH2, 0.0]
-        lV2 = lPos + [0.0, dH2, 0.0]
-        lV3 = lPos + [dS2, -dH2, 0.0]
-        lP = [lV1, lV2, lV3]
-        lP = np.swapaxes(lP, 0, 1)
-        lP = lP.reshape(3 * iVexCnt, 3)
-
-        lF = np.arange(3 * iVexCnt)
-        lF = lF.reshape(iVexCnt, 3)
+        aCorners = np.array([[-dS2, -dH2, 0.0], [0.0, dH2, 0.0], [dS2, -dH2, 0.0]], dtype=np.float32)
+        aVex = np.empty((iVexCnt, 3, 3), dtype=np.float32)
+        np.add(lPos[:, np.newaxis, :], aCorners, out=aVex, casting="unsafe")
         #################################
 
         print("Creating mesh...")
+        iLoopCnt = 3 * iVexCnt
+        meshA.vertices.add(iLoopCnt)
+        meshA.vertices.foreach_set("co", aVex.ravel())
+        del aVex
+        yield
+
+        meshA = self._GetStageData(bpy.data.meshes, sMeshName)
+        meshA.loops.add(iLoopCnt)
+        meshA.loops.foreach_set("vertex_index", np.arange(iLoopCnt, dtype=np.int32))
+        meshA.polygons.add(iVexCnt)
+        meshA.polygons.foreach_set("loop_start", np.arange(0, iLoopCnt, 3, dtype=np.int32))
+        if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:
+            # In newer Blender versions the polygon sizes follow from the loop starts and cannot be set
+            meshA.polygons.foreach_set("loop_total", np.full(iVexCnt, 3, dtype=np.int32))
+        # endif
+        meshA.update(calc_edges=True)
+        yield
 
-        objA = anyblend.object.CreateObject(xContext, self.sName)
-        meshA = objA.data
-        meshA.from_pydata(lP.tolist(), [], lF.tolist())
-
+        meshA = self._GetStageData(bpy.data.meshes, sMeshName)
         print("Setting texture coordinates...")
-        bm = bmesh.new()
-        bm.from_mesh(meshA)
-        bm.faces.ensure_lookup_table()
-
-        uv_layer = bm.loops.layers.uv.verify()
-        # bm.faces.layers.tex.verify()
-
-        uv_layer = bm.loops.layers.uv[0]
-        for iIdx, faceA in enumerate(bm.faces):
-            iY = int(math.floor(iIdx / iImgW))
-            iX = iIdx - iY * iImgW
-            dY = iY / iImgH + dHalfY
-            dX = iX / iImgW + dHalfX
-            faceA.loops[0][uv_layer].uv = (dX, dY)
-            faceA.loops[1][uv_layer].uv = (dX, dY)
-            faceA.loops[2][uv_layer].uv = (dX, dY)
-            # faceA.loops[3][uv_layer].uv = (dX, dY)
+        # All three corners of a triangle map to the center of the pixel of its point
+        aUv = np.empty((iVexCnt, 3, 2), dtype=np.float32)
+        aUv[:] = self._GetPixelUvs(iVexCnt, iImgW, iImgH)[:, np.newaxis, :]
+
+        uvLayer = meshA.uv_layers.new(name="UVMap")
+        uvLayer.data.foreach_set("uv", aUv.ravel())
+
+    # enddef
+
+    ###################################################################
+    # Name of the color image with the given index
+    def _GetColorImageName(self, _iImgIdx):
+        if _iImgIdx == 0:
+            return self.sName + ".Color"
+        # endif
+        return "{0}.Color_{1}".format(self.sName, _iImgIdx)
+
+    # enddef
+
+    ###################################################################
+    # Create the color images with one pixel per point, and an image texture that uses the first image.
+    # Returns the list of images.
+    def _CreateColorImage(self, *, lCol, iImgW, iImgH):
+
+        print("Creating image...")
+        iPixelCnt = iImgW * iImgH
+        lImages = []
+        for iImgIdx in range(self._GetImageCount(len(lCol))):
+            lImages.append(
+                self._CreateImage(
+                    sName=self._GetColorImageName(iImgIdx),
+                    lCol=lCol[iImgIdx * iPixelCnt : (iImgIdx + 1) * iPixelCnt],
+                    iImgW=iImgW,
+                    iImgH=iImgH,
+                )
+            )
         # endfor
-        bm.to_mesh(meshA)
-        bm.free()
+        self.lImgNames = [x.name for x in lImages]
+        self.sImgName = self.lImgNames[0]
+
+        # print(imgA.name)
+        texA = bpy.data.textures.new(self.sName + ".Color.Tex", type="IMAGE")
+        # print(texA.name)
+        texA.image = lImages[0]
+        texA.use_fake_user = True
+        # print(texA.image.name)
+
+        return lImages
+
+    # enddef
+
+    ###################################################################
+    # Update the color images for a new set of points.
+    # Images are added or removed as needed, and the particle material is updated to match.
+    def _UpdateColorImage(self, *, lCol):
+
+        print("Updating image...")
+        iImgW, iImgH = self._GetImageSize(len(lCol))
+        iPixelCnt = iImgW * iImgH
+        iImgCnt = self._GetImageCount(len(lCol))
+
+        lImages = []
+        for iImgIdx in range(max(iImgCnt, len(self.lImgNames))):
+            imgA = None
+            if iImgIdx < len(self.lImgNames):
+                imgA = bpy.data.images.get(self.lImgNames[iImgIdx])
+                if imgA is None:
+                    raise CAnyExcept(
+                        "Color image '{0}' of point cloud '{1}' not found".format(self.lImgNames[iImgIdx], self.sName)
+                    )
+                # endif
+            # endif
+
+            lColImg = lCol[iImgIdx * iPixelCnt : (iImgIdx + 1) * iPixelCnt]
+            if iImgIdx >= iImgCnt:
+                bpy.data.images.remove(imgA)
+            elif imgA is None:
+                lImages.append(
+                    self._CreateImage(sName=self._GetColorImageName(iImgIdx), lCol=lColImg, iImgW=iImgW, iImgH=iImgH)
+                )
+            else:
+                self._UpdateImage(imgA=imgA, lCol=lColImg, iImgW=iImgW, iImgH=iImgH)
+                lImages.append(imgA)
+            # endif
+        # endfor
+
+        if iImgCnt != len(self.lImgNames):
+            self.lImgNames = [x.name for x in lImages]
+            prototypes.SetMaterialImages(self.GetParticleMaterial("Tex"), lImages)
+        # endif
+
+        return iImgW, iImgH
+
+    # enddef
+
+    ###################################################################
+    # Create a mesh with one vertex per point, and the colors and sizes as point attributes.
+    # If the size of a color image is given, the texture coordinates of the points in this image
+    # are stored in the attribute 'UVMap' instead of the colors.
+    def _CreatePointMesh(self, *, meshA, lPos, lCol, lSize=None, iImgW=None, iImgH=None):
+
+        iVexCnt = len(lPos)
+
+        print("Creating point mesh...")
+        meshA.vertices.add(iVexCnt)
+        meshA.vertices.foreach_set("co", np.ascontiguousarray(lPos, dtype=np.float32).ravel())
+
+        if iImgW is not None:
+            attUv = meshA.attributes.new(name="UVMap", type="FLOAT2", domain="POINT")
+            attUv.data.foreach_set("vector", self._GetPixelUvs(iVexCnt, iImgW, iImgH).ravel())
+        else:
+            # Byte colors hold the same 8 bit sRGB values as the color images
+            attCol = meshA.attributes.new(name="Col", type="BYTE_COLOR", domain="POINT")
+            dicProps = bpy.types.ByteColorAttributeValue.bl_rna.properties
+            sColorProp = "color_srgb" if "color_srgb" in dicProps else "color"
+            attCol.data.foreach_set(sColorProp, self._GetColorsRgba(lCol, iVexCnt).ravel())
+        # endif
+
+        if lSize is not None:
+            attSize = meshA.attributes.new(name="size", type="FLOAT", domain="POINT")
+            attSize.data.foreach_set("value", np.ascontiguousarray(lSize, dtype=np.float32))
+        # endif
+
+        meshA.update()
+
+    # enddef
+
+    ###################################################################
+    # Geometry Nodes backend: one vertex per point, instanced by a Geometry Nodes modifier.
+    # Generator with the same stages as _IterCreateScene().
+    def _IterCreateSceneGeoNodes(self, *, xContext, lPos, lCol, fVoxelSize, lSize=None):
+
+        bImages = self.sColorStorage == "IMAGE"
+        iImgW, iImgH = None, None
+        if bImages:
+            iImgW, iImgH = self._GetImageSize(len(lPos))
+            self._CreateColorImage(lCol=lCol, iImgW=iImgW, iImgH=iImgH)
+            xContext = yield
+        # endif
+
+        objA = anyblend.object.CreateObject(xContext, self.sName)
+        sObjName = objA.name
+        self._CreatePointMesh(meshA=objA.data, lPos=lPos, lCol=lCol, lSize=lSize, iImgW=iImgW, iImgH=iImgH)
+        xContext = yield
+
+        lImages = None
+        if bImages:
+            lImages = [self._GetStageData(bpy.data.images, x) for x in self.lImgNames]
+        # endif
+        sPartName = self._CreatePrototypes(xContext=xContext, lImages=lImages).name
+        yield
+
+        print("Creating instancing modifier...")
+        ngA = geonodes.CreateInstanceOnPointsGroup(
+            sName=self.sName + ".Instancer",
+            objInstance=self._GetStageData(bpy.data.objects, sPartName),
+            fScale=fVoxelSize,
+            sSizeAttribute=None if lSize is None else "size",
+        )
+        modA = self._GetStageData(bpy.data.objects, sObjName).modifiers.new(self.sName, type="NODES")
+        modA.node_group = ngA
+
+    # enddef
+
+    ###################################################################
+    # Get the particle prototype objects from the library of the point cloud style.
+    # lImages: color images looked up via the texture coordinates of the instancer.
+    #          The point cloud then gets its own material that samples these images, and its own prototype objects
+    #          that use the library meshes with this material.
+    #          If None, the library objects are used directly, which read the color from the instancer attribute 'Col'.
+    # Sharing the material and prototype objects of the image color storage between point clouds is out of scope:
+    # shader node groups have no image inputs, and the particles carry no attribute that could select the image
+    # of their point cloud. So each point cloud needs a material with its own image nodes, and prototype objects
+    # that override the library material with it. Only the "GEONODES" backend with the "ATTRIBUTE" color storage
+    # shares all prototype data of a style.
+    # Returns the default prototype object.
+    def _CreatePrototypes(self, *, xContext, lImages):
+
+        dicLib = prototypes.GetLibrary(xContext, self.sPrototypeStyle)
+        if lImages is None:
+            return dicLib["dicObjects"]["Cube"]
+        # endif
 
-        #############################################################
         print("Creating particle prototype...")
         sNameP = self.sName + ".Particle"
 
         # Create the material with texture color
-        sNameMat = sNameP + ".Mat.Tex"
-        matTex = bpy.data.materials.new(name=sNameMat)
-        matTex.use_nodes = True
-        matTex.use_fake_user = True
-        nodesP = matTex.node_tree.nodes
-        linksP = matTex.node_tree.links
+        matTex = prototypes.CreateImageMaterial(
+            sName=sNameP + ".Mat.Tex",
+            sStyle=self.sPrototypeStyle,
+            sColorSource="IMAGE_ATTRIBUTE" if self.sBackend == "GEONODES" else "IMAGE_UV",
+            lImages=lImages,
+        )
 
-        nodeBSDF = nodesP.get("Principled BSDF")
-        inBC = nodeBSDF.inputs["Base Color"]
-        inBC.default_value = (0, 0, 0, 1)
+        dicObjects = {}
+        for sType, objLib in dicLib["dicObjects"].items():
+            dicObjects[sType] = prototypes.CreateInstanceOfPrototype(
+                clnTarget=xContext.collection, sName="{0}.{1}".format(sNameP, sType), objLibrary=objLib, matA=matTex
+            )
+        # endfor
 
-        nodeTex = nodesP.new("ShaderNodeTexImage")
-        nodeTex.location = (-300, 300)
-        nodeTex.image = imgA
+        return dicObjects["Cube"]
 
-        nodeTC = nodesP.new("ShaderNodeTexCoord")
-        nodeTC.location = (-500, 300)
-        nodeTC.from_instancer = True
+    # enddef
 
-        linksP.new(nodeTex.inputs["Vector"], nodeTC.outputs["UV"])
-        linksP.new(nodeBSDF.inputs["Emission"], nodeTex.outputs["Color"])
+    ###################################################################
+    # Data block created in an earlier stage of the scene creation, looked up by its name.
+    # Blender data must not be referenced across stages, as the user may change the data in between.
+    def _GetStageData(self, _xData, _sName):
 
-        # Create the material with single color
-        sNameMat = sNameP + ".Mat.Color"
-        matCol = bpy.data.materials.new(name=sNameMat)
-        matCol.use_nodes = True
-        matCol.use_fake_user = True
-        nodesP = matCol.node_tree.nodes
-        linksP = matCol.node_tree.links
+        xId = _xData.get(_sName)
+        if xId is None:
+            raise CAnyExcept("Data '{0}' of point cloud '{1}' removed during import".format(_sName, self.sName))
+        # endif
+        return xId
 
-        nodeBSDF = nodesP.get("Principled BSDF")
-        inBC = nodeBSDF.inputs["Base Color"]
-        inBC.default_value = (0.85, 0.01, 0.015, 1)
-        nodeBSDF.inputs["Roughness"].default_value = 0.1
+    # enddef
 
-        # Create the Cube particle object
-        objPartCube = solids.CreateCube(xContext, sNameP + ".Cube", 1.0)
-        objPartCube.active_material = matTex
-        objPartCube.hide_set(True)
+    ###################################################################
+    # Create the scene of the point cloud. Generator that creates one stage of the scene
+    # for each context sent to it: the color images, the size image, the emitter mesh in three stages,
+    # the particle prototypes with their material, and the particle system.
+    # lSize: optional particle size per point. If given, the particle size is controlled by a size texture.
+    def _IterCreateScene(self, *, xContext, lPos, lCol, fVoxelSize, lSize=None):
+
+        if self.sBackend == "GEONODES":
+            yield from self._IterCreateSceneGeoNodes(
+                xContext=xContext, lPos=lPos, lCol=lCol, fVoxelSize=fVoxelSize, lSize=lSize
+            )
+            return
+        # endif
+
+        iVexCnt = len(lPos)
+        iImgW, iImgH = self._GetImageSize(iVexCnt)
+        self._CreateColorImage(lCol=lCol, iImgW=iImgW, iImgH=iImgH)
+        xContext = yield
+
+        # The emitter triangles must all have the same size, so that the particle distribution
+        # places exactly one particle per triangle. Varying particle sizes are realized with a size texture.
+        fParticleSize = fVoxelSize
+        sTexSizeName = None
+        if lSize is not None and len(lSize) > 0:
+            if len(self.lImgNames) > 1:
+                raise CAnyExcept(
+                    "Adaptive particle sizes need all {0} points in a single image of at most {1}x{1} pixels".format(
+                        iVexCnt, self.iMaxImageSize
+                    )
+                )
+            # endif
+            fParticleSize = float(lSize.max())
+            print("Creating size image...")
+            lSizeRel = (lSize / fParticleSize)[:, np.newaxis]
+            imgSize = self._CreateImage(
+                sName=self.sName + ".Size",
+                lCol=np.repeat(lSizeRel.astype(np.float32), 3, axis=1),
+                iImgW=iImgW,
+                iImgH=iImgH,
+                bData=True,
+            )
+
+            texSize = bpy.data.textures.new(self.sName + ".Size.Tex", type="IMAGE")
+            texSize.image = imgSize
+            texSize.use_interpolation = False
+            texSize.extension = "EXTEND"
+            texSize.use_fake_user = True
+            sTexSizeName = texSize.name
+            xContext = yield
+        # endif
 
-        # Create the Tetrahedron particle object
-        objPartTetra = solids.CreateTetraeder(xContext, sNameP + ".Tetra", 1.0)
-        objPartTetra.active_material = matTex
-        objPartTetra.hide_set(True)
+        objA = anyblend.object.CreateObject(xContext, self.sName)
+        sObjName = objA.name
+        yield from self._IterCreateEmitterMesh(
+            meshA=objA.data, lPos=lPos, fVoxelSize=fVoxelSize, iImgW=iImgW, iImgH=iImgH
+        )
+        xContext = yield
 
         #############################################################
-        print("Creating particle system...")
-        iMaxPartShown = 10000
-        # dViewRatio = max(1.0, min(100.0 * iMaxPartShown / iVexCnt, 100.0))
+        lImages = [self._GetStageData(bpy.data.images, x) for x in self.lImgNames]
+        sPartName = self._CreatePrototypes(xContext=xContext, lImages=lImages).name
+        yield
 
+        objA = self._GetStageData(bpy.data.objects, sObjName)
+        objPartCube = self._GetStageData(bpy.data.objects, sPartName)
+        texSize = None if sTexSizeName is None else self._GetStageData(bpy.data.textures, sTexSizeName)
+
+        #############################################################
+        print("Creating particle system...")
         pmA = objA.modifiers.new(self.sName, type="PARTICLE_SYSTEM")
         psA = objA.particle_systems[pmA.name]
         psetA = psA.settings
@@ -280,7 +1514,6 @@ class CPointCloud:
         # psetA.render_type = "OBJECT"
         # psetA.particle_size = fVoxelSize
         # psetA.instance_object = objPartCube
-        # psetA.display_percentage = dViewRatio
 
         psetA.count = iVexCnt
         psetA.type = "EMITTER"
@@ -298,21 +1531,285 @@ class CPointCloud:
         psetA.normal_factor = 0.0
         psetA.physics_type = "NO"
         psetA.render_type = "OBJECT"
-        psetA.particle_size = fVoxelSize
+        psetA.particle_size = fParticleSize
         psetA.instance_object = objPartCube
 
-        psetA.display_method = "DOT"
-        psetA.display_percentage = 100
-        psetA.display_size = fVoxelSize
+        if texSize is not None:
+            xSlot = psetA.texture_slots.add()
+            xSlot.texture = texSize
+            xSlot.texture_coords = "UV"
+            xSlot.blend_type = "MULTIPLY"
+            xSlot.use_map_time = False
+            xSlot.use_map_size = True
+            xSlot.size_factor = 1.0
+        # endif
+
+        # The display percentage and method are set by the viewport budget
+        psetA.display_size = fParticleSize
 
         objA.show_instancer_for_render = False
         objA.show_instancer_for_viewport = False
 
     # enddef
 
+    ###################################################################
+    # Replace the points of the imported point cloud, keeping the object,
+    # the particle prototypes and materials.
+    def _UpdateScene(self, *, lPos, lCol, fVoxelSize):
+
+        objA = self.GetObject()
+        if self.sBackend == "GEONODES":
+            iImgW, iImgH = None, None
+            if self.sColorStorage == "IMAGE":
+                iImgW, iImgH = self._UpdateColorImage(lCol=lCol)
+            # endif
+
+            meshOld = objA.data
+            sMeshName = meshOld.name
+            meshA = bpy.data.meshes.new(sMeshName)
+            self._CreatePointMesh(meshA=meshA, lPos=lPos, lCol=lCol, iImgW=iImgW, iImgH=iImgH)
+            objA.data = meshA
+            bpy.data.meshes.remove(meshOld)
+            meshA.name = sMeshName
+
+            geonodes.SetInstanceScale(self._GetInstancerNodeGroup(), fVoxelSize)
+            self._ApplyViewportBudget()
+            return
+        # endif
+
+        psetA = self.GetParticleSystem().settings
+        iImgW, iImgH = self._UpdateColorImage(lCol=lCol)
+
+        meshOld = objA.data
+        sMeshName = meshOld.name
+        meshA = bpy.data.meshes.new(sMeshName)
+        for _ in self._IterCreateEmitterMesh(meshA=meshA, lPos=lPos, fVoxelSize=fVoxelSize, iImgW=iImgW, iImgH=iImgH):
+            pass
+        # endfor
+        objA.data = meshA
+        bpy.data.meshes.remove(meshOld)
+        meshA.name = sMeshName
+
+        psetA.count = len(lPos)
+        psetA.particle_size = fVoxelSize
+        psetA.display_size = fVoxelSize
+        self._ApplyViewportBudget()
+
+    # enddef
+
+    ###################################################################
+    # Store the viewport budget at the point cloud object, and update the viewport display
+    # of all point clouds in the scenes of the object, as their share of a scene budget may change.
+    # bScene: if False, only the budget of this point cloud is applied. Imports use this, and the
+    #         functions in pcimport apply the scene budget once after all point clouds are imported.
+    def _ApplyViewportBudget(self, bScene=True):
+
+        objA = self.GetObject()
+        viewport.SetBudget(objA, self.iViewportBudget)
+
+        lScenes = list(objA.users_scene) if bScene else []
+        if len(lScenes) == 0:
+            iCount = viewport.GetPointCount(objA)
+            viewport.SetDisplayCount(objA, iCount if self.iViewportBudget is None else self.iViewportBudget)
+        # endif
+        for xScene in lScenes:
+            viewport.ApplySceneBudget(xScene)
+        # endfor
+
+    # enddef
+
+    ###################################################################
+    # Set the maximal number of points shown in the viewport. None shows all points.
+    def SetViewportBudget(self, _iBudget):
+
+        self.iViewportBudget = _iBudget
+        self._ApplyViewportBudget()
+
+    # enddef
+
+    ###################################################################
+    def HasLod(self):
+        return self.xLod is not None
+
+    # enddef
+
+    ###################################################################
+    def GetLodLevelCount(self):
+        if self.xLod is None:
+            return 1
+        # endif
+        return self.xLod.GetLevelCount()
+
+    # enddef
+
+    ###################################################################
+    def GetLodLevel(self):
+        if self.xLod is None:
+            return 0
+        # endif
+        return self.iLodLevel
+
+    # enddef
+
+    ###################################################################
+    # Switch the point cloud to the given LOD level without re-reading the source file.
+    # Level 0 is the finest level.
+    def SetLodLevel(self, _iLevel):
+
+        if self.xLod is None:
+            raise CAnyExcept("Point cloud '{0}' was not imported with an LOD hierarchy".format(self.sName))
+        # endif
+
+        if _iLevel == self.iLodLevel:
+            return
+        # endif
+
+        # Pending refinement steps of a progressive import refer to the previous level
+        self.dicProgressive = None
+
+        lPos = self.xLod.GetPositions(_iLevel)
+        lCol = self._TakeColors(self.lLodCol, self.xLod.GetIndices(_iLevel))
+        fVoxelSize = self.xLod.GetVoxelSize(_iLevel)
+
+        print("Switching point cloud '{0}' to LOD level {1} with {2} voxel...".format(self.sName, _iLevel, len(lPos)))
+        lPos, lCol, _ = self._OrderPoints(lPos, lCol)
+        self._UpdateScene(lPos=lPos, lCol=lCol, fVoxelSize=fVoxelSize)
+        self.iLodLevel = _iLevel
+
+        if self.xIndex is not None:
+            self._BuildIndex(lPos=lPos, lCol=lCol)
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Select the LOD level whose voxel size matches the pixel footprint of the given camera
+    # at the point of the point cloud's bounding box that is closest to the camera.
+    # fPixelScale: number of pixels a voxel may cover.
+    def SetLodLevelForCamera(self, *, objCamera, xScene=None, fPixelScale=1.0):
+
+        if self.xLod is None:
+            raise CAnyExcept("Point cloud '{0}' was not imported with an LOD hierarchy".format(self.sName))
+        # endif
+
+        if xScene is None:
+            xScene = bpy.context.scene
+        # endif
+
+        objA = self.GetObject()
+        aCorners = np.array([objA.matrix_world @ Vector(x) for x in objA.bound_box])
+        aCamPos = camera.GetPosition(objCamera)
+        aNearest = np.clip(aCamPos, aCorners.min(axis=0), aCorners.max(axis=0))
+        fDistance = float(np.linalg.norm(aNearest - aCamPos))
+        fPixelAngle = camera.GetPixelAngle(objCamera, xScene=xScene)
+
+        iLevel = self.xLod.SelectLevelForDistance(fDistance=fDistance, fPixelAngle=fPixelAngle, fPixelScale=fPixelScale)
+        self.SetLodLevel(iLevel)
+
+        return iLevel
+
+    # enddef
+
+    ###################################################################
+    # The spatial index refers to the points in the order in which they are created in the scene,
+    # so that a point index is the face and particle index of the "PARTICLES" backend,
+    # and the vertex index of the "GEONODES" backend.
+    def _BuildIndex(self, *, lPos, lCol):
+
+        print("Building spatial index...")
+        self.xIndex = CPointCloudIndex()
+        self.xIndex.Build(aPos=lPos)
+        self.lIndexCol = lCol
+
+    # enddef
+
+    ###################################################################
+    def HasIndex(self):
+        return self.xIndex is not None
+
+    # enddef
+
+    ###################################################################
+    def _AssertHasIndex(self):
+        if self.xIndex is None:
+            raise CAnyExcept("Point cloud '{0}' was not imported with a spatial index".format(self.sName))
+        # endif
+
+    # enddef
+
+    ###################################################################
+    def _GetQueryResult(self, _lIdx, lDist=None):
+
+        dicResult = {
+            "lIdx": _lIdx,
+            "lPos": self.xIndex.aPos[_lIdx],
+            "lCol": self._TakeColors(self.lIndexCol, _lIdx),
+        }
+        if lDist is not None:
+            dicResult["lDist"] = lDist
+        # endif
+
+        return dicResult
+
+    # enddef
+
+    ###################################################################
+    # Spatial queries over the imported points. All coordinates are given in the local
+    # coordinate system of the point cloud object.
+    # Each query returns a dictionary with the point indices "lIdx", positions "lPos" and colors "lCol".
+    # The colors are RGB(A) values in the data type of the source data, for example uint8.
+    # The indices are point indices. With the "PARTICLES" backend, point i is the particle emitted from face i
+    # of the emitter mesh, whose triangle has the vertices 3i to 3i+2. With the "GEONODES" backend, point i is vertex i.
+
+    ###################################################################
+    # Return all points inside the axis aligned box [lMin, lMax]
+    def QueryBox(self, _lMin, _lMax):
+
+        self._AssertHasIndex()
+        return self._GetQueryResult(self.xIndex.QueryBox(_lMin, _lMax))
+
+    # enddef
+
+    ###################################################################
+    # Return all points within distance fRadius of lCenter, sorted by distance.
+    # The result additionally contains the distances "lDist".
+    def QueryRadius(self, _lCenter, _fRadius):
+
+        self._AssertHasIndex()
+        lIdx, lDist = self.xIndex.QueryRadius(_lCenter, _fRadius)
+        return self._GetQueryResult(lIdx, lDist=lDist)
+
+    # enddef
+
+    ###################################################################
+    # Return the iCount points nearest to lPoint, sorted by distance.
+    # The result additionally contains the distances "lDist".
+    def QueryNearest(self, _lPoint, _iCount=1):
+
+        self._AssertHasIndex()
+        lIdx, lDist = self.xIndex.QueryNearest(_lPoint, _iCount)
+        return self._GetQueryResult(lIdx, lDist=lDist)
+
+    # enddef
+
+    ###################################################################
+    # Transform world coordinates into the local coordinate system of the point cloud object,
+    # for use with the query functions.
+    def WorldToLocal(self, _lPos):
+
+        aWorldToLocal = np.array(self.GetObject().matrix_world.inverted())
+        aPos = np.atleast_2d(np.asarray(_lPos, dtype=np.float64))
+        aLocal = aPos @ aWorldToLocal[0:3, 0:3].T + aWorldToLocal[0:3, 3]
+        return aLocal.reshape(np.shape(_lPos))
+
+    # enddef
+
     ###################################################################
     def Remove(self):
         anyblend.object.RemoveCollection(self.sName)
+        self.xIndex = None
+        self.lIndexCol = None
+        self.dicProgressive = None
 
     # enddef
 
@@ -333,6 +1830,10 @@ class CPointCloud:
     ###################################################################
     def GetParticleSystem(self):
 
+        if self.sBackend != "PARTICLES":
+            raise CAnyExcept("Point cloud '{0}' does not use a particle system".format(self.sName))
+        # endif
+
         objPcl = self.GetObject()
 
         psPcl = objPcl.particle_systems.get(self.sName)
@@ -349,10 +1850,49 @@ class CPointCloud:
     # enddef
 
     ###################################################################
+    def _GetInstancerNodeGroup(self):
+
+        modA = self.GetObject().modifiers.get(self.sName)
+        if modA is None or modA.type != "NODES" or modA.node_group is None:
+            raise CAnyExcept("Point cloud '{0}' does not have an instancing modifier".format(self.sName))
+        # endif
+
+        return modA.node_group
+
+    # enddef
+
+    ###################################################################
+    # The prototype object currently instanced on the points
+    def GetInstanceObject(self):
+
+        if self.sBackend == "GEONODES":
+            return geonodes.GetInstanceObject(self._GetInstancerNodeGroup())
+        # endif
+
+        return self.GetParticleSystem().settings.instance_object
+
+    # enddef
+
+    ###################################################################
+    def _SetInstanceObject(self, _objInstance):
+
+        if self.sBackend == "GEONODES":
+            geonodes.SetInstanceObject(self._GetInstancerNodeGroup(), _objInstance)
+        else:
+            self.GetParticleSystem().settings.instance_object = _objInstance
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Particle objects of the point cloud take precedence over the shared objects of the prototype library
     def GetParticleObject(self, sType):
 
         sPartName = "{0}.Particle.{1}".format(self.sName, sType)
         objPart = bpy.data.objects.get(sPartName)
+        if objPart is None:
+            objPart = bpy.data.objects.get("{0}.{1}".format(prototypes.GetLibraryName(self.sPrototypeStyle), sType))
+        # endif
         if objPart is None:
             raise Exception(
                 "Particle object with name '{0}' not found".format(sPartName)
@@ -380,15 +1920,26 @@ class CPointCloud:
     # enddef
 
     ###################################################################
-    def _GetElementNamesOfType(self, *, sType, xContainer):
+    # Return the names of the elements of the point cloud and of its prototype library.
+    # sLibType: element type in the prototype library. If None, only elements of the point cloud are returned.
+    def _GetElementNamesOfType(self, *, sType, xContainer, sLibType=None):
 
-        sPat = "{0}.{1}.".format(self.sName, sType)
-        lEl = [x for x in xContainer if x.name.startswith(sPat)]
+        lPats = ["{0}.{1}.".format(self.sName, sType)]
+        if sLibType is not None:
+            lPats.append("{0}.{1}".format(prototypes.GetLibraryName(self.sPrototypeStyle), sLibType))
+        # endif
 
-        iStartIdx = len(sPat)
         lElNames = []
-        for xEl in lEl:
-            lElNames.append(xEl.name[iStartIdx:])
+        for sPat in lPats:
+            lEl = [x for x in xContainer if x.name.startswith(sPat)]
+
+            iStartIdx = len(sPat)
+            for xEl in lEl:
+                sElName = xEl.name[iStartIdx:]
+                if sElName not in lElNames:
+                    lElNames.append(sElName)
+                # endif
+            # endfor
         # endfor
 
         return lElNames
@@ -400,7 +1951,7 @@ class CPointCloud:
 
         self.AssertIsValid()
         return self._GetElementNamesOfType(
-            sType="Particle", xContainer=bpy.data.objects
+            sType="Particle", xContainer=bpy.data.objects, sLibType=""
         )
 
     # enddef
@@ -410,16 +1961,22 @@ class CPointCloud:
 
         self.AssertIsValid()
         return self._GetElementNamesOfType(
-            sType="Particle.Mat", xContainer=bpy.data.materials
+            sType="Particle.Mat", xContainer=bpy.data.materials, sLibType="Mat."
         )
 
     # enddef
 
     ###################################################################
+    # Materials of the point cloud take precedence over the shared materials of the prototype library
     def GetParticleMaterial(self, _sType):
 
         sMatName = "{0}.Particle.Mat.{1}".format(self.sName, _sType)
         matPart = bpy.data.materials.get(sMatName)
+        if matPart is None:
+            matPart = bpy.data.materials.get(
+                "{0}.Mat.{1}".format(prototypes.GetLibraryName(self.sPrototypeStyle), _sType)
+            )
+        # endif
         if matPart is None:
             raise Exception(
                 "Particle material with name '{0}' not found".format(sMatName)
@@ -433,10 +1990,65 @@ class CPointCloud:
     ###################################################################
     def SetParticleType(self, _sType):
 
-        psPcl = self.GetParticleSystem()
         objPart = self.GetParticleObject(_sType)
+        self._SetInstanceObject(objPart)
+
+    # enddef
+
+    ###################################################################
+    # Particle object of the point cloud for changes of a single point cloud.
+    # If the point cloud uses the shared object of the prototype library, an object of the point cloud
+    # is created, which uses the library mesh with its own material slot.
+    def _GetOwnParticleObject(self, _sType):
+
+        objPart = self.GetParticleObject(_sType)
+        if not prototypes.IsLibraryElement(objPart):
+            return objPart
+        # endif
+
+        objPcl = self.GetObject()
+        objOwn = prototypes.CreateInstanceOfPrototype(
+            clnTarget=objPcl.users_collection[0],
+            sName="{0}.Particle.{1}".format(self.sName, _sType),
+            objLibrary=objPart,
+            matA=objPart.material_slots[0].material,
+        )
+        if self.GetInstanceObject() == objPart:
+            self._SetInstanceObject(objOwn)
+        # endif
+
+        return objOwn
+
+    # enddef
+
+    ###################################################################
+    # Particle material of the point cloud for changes of a single point cloud.
+    # If the point cloud uses the shared material of the prototype library, it is copied first.
+    def _GetOwnParticleMaterial(self, _sType):
+
+        matPart = self.GetParticleMaterial(_sType)
+        if not prototypes.IsLibraryElement(matPart):
+            return matPart
+        # endif
 
-        psPcl.settings.instance_object = objPart
+        matOwn = matPart.copy()
+        matOwn.name = "{0}.Particle.Mat.{1}".format(self.sName, _sType)
+        matOwn.use_fake_user = True
+        return matOwn
+
+    # enddef
+
+    ###################################################################
+    # Particle type of a particle object of the point cloud or of its prototype library
+    def _GetParticleTypeOfObject(self, _objPart):
+
+        for sPrefix in ["{0}.Particle.".format(self.sName), prototypes.GetLibraryName(self.sPrototypeStyle) + "."]:
+            if _objPart.name.startswith(sPrefix):
+                return _objPart.name[len(sPrefix) :]
+            # endif
+        # endfor
+
+        raise CAnyExcept("Object '{0}' is not a particle object of point cloud '{1}'".format(_objPart.name, self.sName))
 
     # enddef
 
@@ -444,17 +2056,15 @@ class CPointCloud:
     # Expects material dictionary of type "point-cloud/material:1"
     def SetActiveParticleMaterial(self, _dicMaterial):
 
-        psPcl = self.GetParticleSystem()
-        self._SetObjectMaterial(
-            xObject=psPcl.settings.instance_object, dicMaterial=_dicMaterial
-        )
+        sType = self._GetParticleTypeOfObject(self.GetInstanceObject())
+        self._SetObjectMaterial(xObject=self._GetOwnParticleObject(sType), dicMaterial=_dicMaterial)
 
     # enddef
 
     ###################################################################
     def SetParticleMaterial(self, *, sParticleType, dicMaterial):
 
-        objPart = self.GetParticleObject(sParticleType)
+        objPart = self._GetOwnParticleObject(sParticleType)
         self._SetObjectMaterial(xObject=objPart, dicMaterial=dicMaterial)
 
     # enddef
@@ -486,7 +2096,8 @@ class CPointCloud:
             )
         # endif
 
-        matPart = self.GetParticleMaterial(sType)
+        # Never change the shared materials of the prototype library
+        matPart = self._GetOwnParticleMaterial(sType)
 
         nodesP = matPart.node_tree.nodes
         nodeBSDF = nodesP.get("Principled BSDF")
@@ -501,7 +2112,9 @@ class CPointCloud:
             nodeBSDF.inputs["Roughness"].default_value = float(fRoughness)
         # endif
 
-        xObject.active_material = matPart
+        # Particle objects share the library mesh, so the material is set in an object linked slot
+        xObject.material_slots[0].link = "OBJECT"
+        xObject.material_slots[0].material = matPart
 
     # enddef
 
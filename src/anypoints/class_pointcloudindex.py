@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \class_pointcloudindex.py
+# Created Date: Monday, October 19th 2026, 9:03:26 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+
+from anybase.cls_anyexcept import CAnyExcept
+from .class_voxelgrid import CVoxelGrid
+
+
+# Spatial index over point positions for box, radius and k-nearest neighbor queries.
+# The points are sorted into a uniform grid. Queries only visit the grid cells that overlap
+# the query region, and test the points of these cells exactly.
+# All queries return point indices into the position array the index was built from.
+class CPointCloudIndex:
+
+    # Maximal number of cells a box query enumerates. Larger boxes test all points directly.
+    iMaxQueryCellCount = 1 << 20
+
+    ###################################################################
+    def __init__(self):
+        self.aPos = None
+        self.xGrid = None
+        self.aKeyMin = None
+        self.aKeyMax = None
+        self.aPosMin = None
+        self.aPosMax = None
+
+    # enddef
+
+    ###################################################################
+    def IsValid(self):
+        return self.xGrid is not None
+
+    # enddef
+
+    ###################################################################
+    def AssertIsValid(self):
+        if not self.IsValid():
+            raise CAnyExcept("Point cloud spatial index has not been built")
+        # endif
+
+    # enddef
+
+    ###################################################################
+    def GetPointCount(self):
+        return 0 if self.aPos is None else len(self.aPos)
+
+    # enddef
+
+    ###################################################################
+    # Build the index. If no cell size is given, it is chosen such that an occupied cell
+    # contains about iPointsPerCell points for a point cloud that samples surfaces.
+    def Build(self, *, aPos, fCellSize=None, iPointsPerCell=8):
+
+        self.aPos = aPos
+        if fCellSize is None:
+            fCellSize = self._EstimateCellSize(aPos, iPointsPerCell)
+        # endif
+
+        self.xGrid = CVoxelGrid()
+        self.xGrid.Build(aPos=aPos, fCellSize=fCellSize)
+
+        # Cell key range of the points, to clip the cells visited by queries
+        if len(aPos) > 0:
+            aKeys = np.floor(aPos / fCellSize).astype(np.int64)
+            self.aKeyMin = aKeys.min(axis=0)
+            self.aKeyMax = aKeys.max(axis=0)
+            self.aPosMin = aPos.min(axis=0).astype(np.float64)
+            self.aPosMax = aPos.max(axis=0).astype(np.float64)
+        # endif
+
+    # enddef
+
+    ###################################################################
+    def _EstimateCellSize(self, _aPos, _iPointsPerCell):
+
+        if len(_aPos) == 0:
+            return 1.0
+        # endif
+
+        aExtent = _aPos.max(axis=0) - _aPos.min(axis=0)
+        # Assume the points lie on a surface of about the size of the two largest extents
+        aExtent = np.sort(aExtent)[1:]
+        fArea = max(float(aExtent[0] * aExtent[1]), float(aExtent[1]) ** 2 * 1e-6, 1e-12)
+        return max(np.sqrt(fArea * _iPointsPerCell / len(_aPos)), 1e-6)
+
+    # enddef
+
+    ###################################################################
+    # Return the indices of all points in the axis aligned box [aMin, aMax]
+    def QueryBox(self, _aMin, _aMax):
+
+        self.AssertIsValid()
+        aMin = np.asarray(_aMin, dtype=np.float64)
+        aMax = np.asarray(_aMax, dtype=np.float64)
+        fCellSize = self.xGrid.fCellSize
+        if self.GetPointCount() == 0:
+            return np.zeros(0, dtype=np.int64)
+        # endif
+
+        aKeyMin = np.maximum(np.floor(aMin / fCellSize), self.aKeyMin).astype(np.int64)
+        aKeyMax = np.minimum(np.floor(aMax / fCellSize), self.aKeyMax).astype(np.int64)
+        if np.any(aKeyMax < aKeyMin):
+            return np.zeros(0, dtype=np.int64)
+        # endif
+
+        aCellRange = aKeyMax - aKeyMin + 1
+        if np.prod(aCellRange.astype(np.float64)) > min(self.iMaxQueryCellCount, self.xGrid.GetCellCount()):
+            aCand = np.arange(len(self.aPos))
+        else:
+            lAxes = [np.arange(aKeyMin[i], aKeyMax[i] + 1) for i in range(3)]
+            aKeys = np.stack(np.meshgrid(*lAxes, indexing="ij"), axis=-1).reshape(-1, 3)
+            aCellPos = (aKeys + 0.5) * fCellSize
+            aCells = self.xGrid.FindCells(self.xGrid.GetPackedKeys(aCellPos))
+            _, aCand = self.xGrid.ExpandCellPoints(aCells[aCells >= 0])
+        # endif
+
+        aCandPos = self.aPos[aCand]
+        aInside = np.all((aCandPos >= aMin) & (aCandPos <= aMax), axis=1)
+        return np.sort(aCand[aInside])
+
+    # enddef
+
+    ###################################################################
+    # Return the indices of all points within distance fRadius of aCenter,
+    # sorted by increasing distance, and their distances.
+    def QueryRadius(self, _aCenter, _fRadius):
+
+        aCenter = np.asarray(_aCenter, dtype=np.float64)
+        aCand = self.QueryBox(aCenter - _fRadius, aCenter + _fRadius)
+        aDist = np.linalg.norm(self.aPos[aCand] - aCenter, axis=1)
+
+        aNear = aDist <= _fRadius
+        aCand = aCand[aNear]
+        aDist = aDist[aNear]
+
+        aSort = np.argsort(aDist, kind="stable")
+        return aCand[aSort], aDist[aSort]
+
+    # enddef
+
+    ###################################################################
+    # Return the indices of the iCount points nearest to aPoint, sorted by increasing distance,
+    # and their distances. The search radius is doubled until enough points are found.
+    def QueryNearest(self, _aPoint, _iCount=1):
+
+        self.AssertIsValid()
+        iCount = min(_iCount, len(self.aPos))
+        if iCount <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        # endif
+
+        aPoint = np.asarray(_aPoint, dtype=np.float64)
+        aPosMin = self.aPosMin
+        aPosMax = self.aPosMax
+        # Distance from the query point to the farthest corner of the bounding box
+        fMaxRadius = float(np.linalg.norm(np.maximum(np.abs(aPoint - aPosMin), np.abs(aPoint - aPosMax))))
+        # Start with the distance to the bounding box plus one cell
+        fRadius = float(np.linalg.norm(aPoint - np.clip(aPoint, aPosMin, aPosMax))) + self.xGrid.fCellSize
+
+        while True:
+            aIdx, aDist = self.QueryRadius(aPoint, fRadius)
+            if len(aIdx) >= iCount or fRadius >= fMaxRadius:
+                return aIdx[0:iCount], aDist[0:iCount]
+            # endif
+            fRadius = min(2.0 * fRadius, fMaxRadius)
+        # endwhile
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \class_pointcloudlod.py
+# Created Date: Monday, October 19th 2026, 9:40:12 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+
+from anybase.cls_anyexcept import CAnyExcept
+from . import voxel
+
+
+# Level-of-detail hierarchy of a point cloud.
+# Level 0 is the voxel grid with the base voxel size. Each following level doubles the voxel size,
+# where every voxel of level i+1 contains exactly the 2x2x2 voxels of level i (octree nesting).
+# Each level stores the indices of its representative points in the source arrays,
+# so that attributes like colors can be selected for any level without copying them up front.
+class CPointCloudLod:
+
+    ###################################################################
+    def __init__(self):
+        self.fVoxelSize = None
+        self.lLevels = []
+
+    # enddef
+
+    ###################################################################
+    def IsValid(self):
+        return len(self.lLevels) > 0
+
+    # enddef
+
+    ###################################################################
+    def GetLevelCount(self):
+        return len(self.lLevels)
+
+    # enddef
+
+    ###################################################################
+    # Build the hierarchy from the given positions.
+    # iLevelCount: maximal number of levels. Building stops early if a level contains a single voxel.
+    def Build(self, *, aPos, fVoxelSize, iLevelCount):
+
+        if fVoxelSize <= 0.0:
+            raise CAnyExcept("Voxel size must be positive for LOD hierarchy")
+        # endif
+
+        if iLevelCount < 1:
+            raise CAnyExcept("LOD hierarchy needs at least one level")
+        # endif
+
+        self.fVoxelSize = fVoxelSize
+        self.lLevels = []
+
+        aKeys0 = voxel.GetVoxelKeys(aPos, fVoxelSize)
+        aKeys, aIdx = voxel.UniqueVoxelKeys(aKeys0)
+
+        # Express all keys relative to the minimal key, so that integer division
+        # gives proper octree cells for negative coordinates as well.
+        aKeyMin = aKeys.min(axis=0) if len(aKeys) > 0 else np.zeros(3, dtype=np.int64)
+        aCell = aKeys - aKeyMin
+
+        for iLevel in range(iLevelCount):
+            iScale = 1 << iLevel
+            fLevelVoxelSize = fVoxelSize * iScale
+
+            # Voxel centers of this level in units of the base voxel size
+            aCenter = aKeyMin + aCell * iScale + 0.5 * (iScale - 1)
+            self.lLevels.append(
+                {
+                    "fVoxelSize": fLevelVoxelSize,
+                    "aIdx": aIdx,
+                    "aPos": (aCenter * fVoxelSize).astype(aPos.dtype),
+                }
+            )
+
+            if len(aIdx) <= 1:
+                break
+            # endif
+
+            aCell, aSubIdx = voxel.UniqueVoxelKeys(aCell // 2)
+            aIdx = aIdx[aSubIdx]
+        # endfor
+
+    # enddef
+
+    ###################################################################
+    def _GetLevel(self, _iLevel):
+        if _iLevel < 0 or _iLevel >= len(self.lLevels):
+            raise CAnyExcept(
+                "LOD level {0} out of range. Available levels are 0 to {1}".format(_iLevel, len(self.lLevels) - 1)
+            )
+        # endif
+        return self.lLevels[_iLevel]
+
+    # enddef
+
+    ###################################################################
+    # Return voxel center positions of level
+    def GetPositions(self, _iLevel):
+        return self._GetLevel(_iLevel).get("aPos")
+
+    # enddef
+
+    ###################################################################
+    # Return the indices of the representative source points of level
+    def GetIndices(self, _iLevel):
+        return self._GetLevel(_iLevel).get("aIdx")
+
+    # enddef
+
+    ###################################################################
+    def GetVoxelSize(self, _iLevel):
+        return self._GetLevel(_iLevel).get("fVoxelSize")
+
+    # enddef
+
+    ###################################################################
+    def GetPointCount(self, _iLevel):
+        return len(self._GetLevel(_iLevel).get("aIdx"))
+
+    # enddef
+
+    ###################################################################
+    # Select the coarsest level whose voxels are not larger than the footprint
+    # of a pixel at the given distance.
+    # fPixelAngle: angle in radians covered by a single pixel.
+    # fPixelScale: number of pixels a voxel may cover.
+    def SelectLevelForDistance(self, *, fDistance, fPixelAngle, fPixelScale=1.0):
+
+        fMaxSize = max(fDistance, 0.0) * fPixelAngle * fPixelScale
+        iSelLevel = 0
+        for iLevel, dicLevel in enumerate(self.lLevels):
+            if dicLevel.get("fVoxelSize") <= fMaxSize:
+                iSelLevel = iLevel
+            else:
+                break
+            # endif
+        # endfor
+
+        return iSelLevel
+
+    # enddef
+
+
+# endclass
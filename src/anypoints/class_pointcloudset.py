@@ -35,6 +35,9 @@ from anybase import config
 from anybase.cls_anyexcept import CAnyExcept
 import anyblend
 from . import pcimport
+from . import budget
+from . import metadata
+from . import frustum
 
 
 class CPointCloudSet:
@@ -85,6 +88,7 @@ class CPointCloudSet:
 
             dicPc = self.dicPcSet[dicCfg.get("sName")] = {}
             dicPc["iId"] = dicCfg.get("iId")
+            dicPc["sFpIndexCache"] = os.path.join(sCfgPath, xPath.stem + ".index.json")
 
             dicFrames = dicPc["dicFrames"] = {}
 
@@ -99,6 +103,7 @@ class CPointCloudSet:
                     "sFpData": os.path.normpath(os.path.join(sPathData, sFile)),
                     "sFrame": sFrame,
                     "xPcl": None,
+                    "dicInfo": None,
                 }
             # endif
 
@@ -151,9 +156,104 @@ class CPointCloudSet:
 
     # enddef
 
+    ####################################################################################
+    # Collect the metadata of all files of the set, without importing them.
+    # The point counts and vertex properties are read from the file headers,
+    # the bounds of the positions optionally from memory mapped files. The files are processed
+    # in a thread pool, and the results are cached in a '.index.json' file next to each set configuration.
+    # See 'metadata.GetPlyInfo()' for the available data.
+    def BuildIndex(self, bBounds=False, bUseCache=True, iThreadCount=None):
+
+        dicFramesByCache = {}
+        for dicPc in self.dicPcSet.values():
+            sFpCache = dicPc.get("sFpIndexCache") if bUseCache else None
+            dicFramesByCache.setdefault(sFpCache, []).extend(dicPc.get("dicFrames").values())
+        # endfor
+
+        for sFpCache, lFrames in dicFramesByCache.items():
+            dicIndex = metadata.BuildIndex(
+                [x.get("sFpData") for x in lFrames], bBounds=bBounds, sFpCache=sFpCache, iThreadCount=iThreadCount
+            )
+            for dicFrame in lFrames:
+                dicFrame["dicInfo"] = dicIndex.get(dicFrame.get("sFpData"))
+            # endfor
+        # endfor
+
+    # enddef
+
+    ####################################################################################
+    # Metadata of a point cloud frame. Requires BuildIndex() to have been called.
+    def GetInfo(self, _sName, _sFrame):
+
+        dicInfo = self.GetFrame(_sName, _sFrame).get("dicInfo")
+        if dicInfo is None:
+            raise CAnyExcept("Point cloud set index has not been built. Call 'BuildIndex()' first.")
+        # endif
+
+        return dicInfo
+
+    # enddef
+
+    ####################################################################################
+    # Number of points of a frame, from the index if available, otherwise from the file header
+    def GetPointCount(self, _sName, _sFrame):
+
+        dicFrame = self.GetFrame(_sName, _sFrame)
+        dicInfo = dicFrame.get("dicInfo")
+        if dicInfo is not None:
+            return dicInfo.get("iPointCount")
+        # endif
+
+        return budget.GetPlyPointCount(dicFrame.get("sFpData"))
+
+    # enddef
+
+    ####################################################################################
+    # Bounds of the positions of a frame as tuple (lMin, lMax).
+    # Requires BuildIndex() to have been called with 'bBounds=True'.
+    def GetBounds(self, _sName, _sFrame):
+
+        dicInfo = self.GetInfo(_sName, _sFrame)
+        if "lBoundsMin" not in dicInfo:
+            raise CAnyExcept("Point cloud set index has been built without bounds")
+        # endif
+
+        return dicInfo.get("lBoundsMin"), dicInfo.get("lBoundsMax")
+
+    # enddef
+
+    ####################################################################################
+    # Return the (name, frame) pairs of the given point clouds and frames, whose bounds
+    # intersect any of the given frustums. Point clouds without points are never visible.
+    # Requires BuildIndex() to have been called with 'bBounds=True'.
+    def GetVisible(self, _lNames, _lFrames, _lFrustumPlanes, fMargin=0.0):
+
+        lPairs = []
+        lBoxMin = []
+        lBoxMax = []
+        for sName in _lNames:
+            for sFrame in _lFrames:
+                lMin, lMax = self.GetBounds(sName, sFrame)
+                if lMin is not None:
+                    lPairs.append((sName, sFrame))
+                    lBoxMin.append(lMin)
+                    lBoxMax.append(lMax)
+                # endif
+            # endfor
+        # endfor
+
+        if len(lPairs) == 0:
+            return []
+        # endif
+
+        aMask = frustum.GetBoxIntersectMaskUnion(lBoxMin, lBoxMax, _lFrustumPlanes, fMargin=fMargin)
+        return [x for x, bVisible in zip(lPairs, aMask) if bVisible]
+
+    # enddef
+
     ####################################################################################
     # Import point cloud with given name and frame id
-    def ImportSingle(self, _sName, _sFrame, bForce=False):
+    def ImportSingle(self, _sName, _sFrame, bForce=False, fImportPercent=100.0):
 
         dicFrame = self.GetFrame(_sName, _sFrame)
 
@@ -168,7 +268,10 @@ class CPointCloudSet:
         sFpData = dicFrame.get("sFpData")
 
         xPcl = pcimport.ImportPointCloud(
-            bpy.context, sFpData, sName="{0}.{1}".format(_sName, _sFrame)
+            bpy.context,
+            sFpData,
+            sName="{0}.{1}".format(_sName, _sFrame),
+            fImportPercent=fImportPercent,
         )
         dicFrame["xPcl"] = xPcl
 
@@ -176,23 +279,60 @@ class CPointCloudSet:
 
     ####################################################################################
     # Import point cloud set
-    def ImportSet(self, _lNames, _lFrames, bForce=False):
+    # iPointBudget: if given, the total number of points imported for all point clouds and frames
+    #               is limited to this number. The budget is split in proportion to the point counts
+    #               after voxel downsampling, see pcimport.LimitPreparedBudget().
+    # dicBudgetWeights: optional additional budget weight per point cloud name, for example its screen coverage.
+    def ImportSet(self, _lNames, _lFrames, bForce=False, iPointBudget=None, dicBudgetWeights=None):
+
+        if iPointBudget is None:
+            for sName in _lNames:
+                for sFrame in _lFrames:
+                    self.ImportSingle(sName, sFrame, bForce=bForce)
+                # endfor
+            # endfor
+            return
+        # endif
 
+        lJobs = []
+        lJobFrames = []
         for sName in _lNames:
             for sFrame in _lFrames:
-                self.ImportSingle(sName, sFrame, bForce=bForce)
+                dicFrame = self.GetFrame(sName, sFrame)
+                if dicFrame.get("xPcl") is not None:
+                    if not bForce:
+                        continue
+                    # endif
+                    anyblend.collection.RemoveCollection(dicFrame.get("xPcl").GetName())
+                    dicFrame["xPcl"] = None
+                # endif
+
+                lJobs.append(
+                    {
+                        "sFpData": dicFrame.get("sFpData"),
+                        "sName": "{0}.{1}".format(sName, sFrame),
+                        "fImportPercent": 100.0,
+                        "fBudgetWeight": 1.0 if dicBudgetWeights is None else dicBudgetWeights.get(sName, 1.0),
+                    }
+                )
+                lJobFrames.append(dicFrame)
             # endfor
         # endfor
 
+        lPcl = pcimport.ImportJobs(xContext=bpy.context, lJobs=lJobs, iPointBudget=iPointBudget)
+        for dicFrame, xPcl in zip(lJobFrames, lPcl):
+            dicFrame["xPcl"] = xPcl
+        # endfor
+
     # enddef
 
     ####################################################################################
-    def Import(self, _xNames, _xFrames, bForce=False):
+    def Import(self, _xNames, _xFrames, bForce=False, iPointBudget=None):
 
         if isinstance(_xNames, str) and isinstance(_xFrames, str):
-            self.ImportSingle(_xNames, _xFrames, bForce=bForce)
+            self.ImportSet([_xNames], [_xFrames], bForce=bForce, iPointBudget=iPointBudget)
         elif hasattr(_xNames, "__iter__") and hasattr(_xFrames, "__iter__"):
-            self.ImportSet(_xNames, _xFrames, bForce=bForce)
+            self.ImportSet(_xNames, _xFrames, bForce=bForce, iPointBudget=iPointBudget)
         else:
             raise Exception(
                 "Arguments either have to be two strings or two iterable objects"
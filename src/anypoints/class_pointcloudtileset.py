@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \class_pointcloudtileset.py
+# Created Date: Monday, October 19th 2026, 11:02:17 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import bpy
+
+from anybase.cls_anyexcept import CAnyExcept
+from . import pcimport
+from . import budget
+from . import camera
+from . import tiling
+from . import viewport
+
+
+# Tiled point cloud, as created by 'tiling.CreateTiles()'.
+# Only the tiles that intersect the camera frustums of the frames being rendered are imported.
+class CPointCloudTileSet:
+
+    ####################################################################################
+    # Constructor
+    def __init__(self):
+
+        self.dicManifest = None
+        self.dicTiles = None
+
+        self.Clear()
+
+    # enddef
+
+    ####################################################################################
+    # Clear tile set
+    def Clear(self):
+        self.dicManifest = None
+        self.dicTiles = {}
+
+    # enddef
+
+    ####################################################################################
+    # Load tile manifest from file
+    def AddFromFile(self, _sFpManifest):
+
+        if self.dicManifest is not None:
+            raise CAnyExcept("Tile set already contains manifest of '{0}'".format(self.GetName()))
+        # endif
+
+        self.dicManifest = tiling.LoadManifest(_sFpManifest)
+        for dicTile in self.dicManifest.get("lTiles"):
+            self.dicTiles[dicTile.get("sName")] = {"dicTile": dicTile, "xPcl": None}
+        # endfor
+
+    # enddef
+
+    ####################################################################################
+    def GetName(self):
+        if self.dicManifest is None:
+            return None
+        # endif
+        return self.dicManifest.get("sName")
+
+    # enddef
+
+    ####################################################################################
+    def GetTileNames(self):
+        return list(self.dicTiles.keys())
+
+    # enddef
+
+    ####################################################################################
+    def GetLoadedTileNames(self):
+        return [x for x, dicTile in self.dicTiles.items() if dicTile.get("xPcl") is not None]
+
+    # enddef
+
+    ####################################################################################
+    def GetPointCloud(self, _sTileName):
+
+        dicTile = self.dicTiles.get(_sTileName)
+        if dicTile is None:
+            raise CAnyExcept("Tile '{0}' not found".format(_sTileName))
+        # endif
+
+        return dicTile.get("xPcl")
+
+    # enddef
+
+    ####################################################################################
+    # Return the names of the tiles that intersect any of the given frustums
+    def GetVisibleTileNames(self, _lFrustumPlanes, fMargin=0.0):
+
+        if self.dicManifest is None:
+            raise CAnyExcept("No tile manifest loaded")
+        # endif
+
+        lTiles = tiling.GetTilesInFrustums(
+            dicManifest=self.dicManifest, lFrustumPlanes=_lFrustumPlanes, fMargin=fMargin
+        )
+        return [x.get("sName") for x in lTiles]
+
+    # enddef
+
+    ####################################################################################
+    # Import the tiles that intersect any of the given frustums.
+    # Within these tiles, only the points inside the frustums are imported.
+    # fMargin: distance in world units by which the frustums are enlarged.
+    # bRemoveHidden: remove tiles that were imported before, but are no longer visible.
+    # iPointBudget: if given, the total number of points read from the visible tiles is limited to this number.
+    #               The budget is split in proportion to the tile point counts.
+    # Returns the names of the visible tiles.
+    def ImportVisible(
+        self,
+        *,
+        lFrustumPlanes,
+        fMargin=0.0,
+        bRemoveHidden=True,
+        bForce=False,
+        fImportPercent=100.0,
+        fVoxelSize=0.02,
+        bUseVoxel=True,
+        iPointBudget=None,
+    ):
+
+        lVisible = self.GetVisibleTileNames(lFrustumPlanes, fMargin=fMargin)
+        print("{0} of {1} tiles are visible".format(len(lVisible), len(self.dicTiles)))
+
+        if bRemoveHidden:
+            setVisible = set(lVisible)
+            for sTileName in self.GetLoadedTileNames():
+                if sTileName not in setVisible:
+                    self.RemoveTile(sTileName)
+                # endif
+            # endfor
+        # endif
+
+        lImportPercent = [fImportPercent] * len(lVisible)
+        if iPointBudget is not None:
+            lCounts = [self.dicTiles[x]["dicTile"].get("iPointCount") for x in lVisible]
+            lImportPercent = [
+                min(fImportPercent, x) for x in budget.GetImportPercents(lCounts=lCounts, iBudget=iPointBudget)
+            ]
+        # endif
+
+        for sTileName, fTileImportPercent in zip(lVisible, lImportPercent):
+            dicTile = self.dicTiles.get(sTileName)
+            if dicTile.get("xPcl") is not None:
+                if not bForce:
+                    continue
+                # endif
+                self.RemoveTile(sTileName)
+            # endif
+
+            dicTile["xPcl"] = pcimport.ImportPly(
+                xContext=bpy.context,
+                sFilePath=dicTile["dicTile"].get("sFpData"),
+                sName="{0}.{1}".format(self.GetName(), sTileName),
+                fImportPercent=fTileImportPercent,
+                fVoxelSize=fVoxelSize,
+                bUseVoxel=bUseVoxel,
+                lFrustumPlanes=lFrustumPlanes,
+                fFrustumMargin=fMargin,
+            )
+        # endfor
+
+        # The shares of the scene viewport budget change with the visible tiles
+        viewport.ApplySceneBudget(bpy.context.scene)
+        return lVisible
+
+    # enddef
+
+    ####################################################################################
+    # Import the tiles visible from a camera for the current frame, or for all frames of a
+    # frame range (start, end[, step]). See 'ImportVisible()' for the remaining parameters.
+    def ImportForCamera(self, _xCamera, *, tFrameRange=None, xScene=None, **kwargs):
+
+        if tFrameRange is None:
+            lFrustumPlanes = [camera.GetFrustumPlanes(_xCamera, xScene=xScene)]
+        else:
+            lFrustumPlanes = camera.GetFrustumPlanesForFrames(
+                _xCamera,
+                iFrameStart=tFrameRange[0],
+                iFrameEnd=tFrameRange[1],
+                iFrameStep=tFrameRange[2] if len(tFrameRange) > 2 else 1,
+                xScene=xScene,
+            )
+        # endif
+
+        return self.ImportVisible(lFrustumPlanes=lFrustumPlanes, **kwargs)
+
+    # enddef
+
+    ####################################################################################
+    # Remove imported tile from Blender scene graph
+    def RemoveTile(self, _sTileName):
+
+        dicTile = self.dicTiles.get(_sTileName)
+        if dicTile is None:
+            raise CAnyExcept("Tile '{0}' not found".format(_sTileName))
+        # endif
+
+        xPcl = dicTile.get("xPcl")
+        if xPcl is not None:
+            xPcl.Remove()
+            dicTile["xPcl"] = None
+        # endif
+
+    # enddef
+
+    ####################################################################################
+    # Remove all imported tiles from Blender scene graph
+    def RemoveAllTiles(self):
+
+        for sTileName in self.GetLoadedTileNames():
+            self.RemoveTile(sTileName)
+        # endfor
+
+    # enddef
+
+
+# endclass
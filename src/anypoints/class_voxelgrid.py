@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \class_voxelgrid.py
+# Created Date: Monday, October 19th 2026, 2:17:33 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import itertools
+import numpy as np
+
+from . import voxel
+
+
+# Uniform grid over a set of points, stored as sorted packed cell keys.
+# The points are sorted by cell, so that the points of cell i are
+# aOrder[aCellStart[i] : aCellStart[i] + aCellCount[i]].
+# Neighbor cells are found by adding packed key offsets and a lookup, which keeps
+# all queries vectorized over cells or points. If the bounding box of the grid is small enough,
+# the lookup uses a dense index volume, otherwise a binary search over the sorted cell keys.
+class CVoxelGrid:
+
+    # Maximal number of cells of the dense index volume, which uses 4 bytes per cell.
+    # Larger grids use the binary search, so that large point clouds do not allocate
+    # hundreds of megabytes for each filter call.
+    iMaxDenseCellCount = 1 << 22
+
+    ###################################################################
+    def __init__(self):
+        self.fCellSize = None
+        self.iBorder = 1
+        self.aKeyOrigin = None
+        self.aOrder = None
+        self.aCellKey = None
+        self.aCellStart = None
+        self.aCellCount = None
+        self.aPointCell = None
+        self.aDenseIdx = None
+        self.aDenseShape = None
+
+    # enddef
+
+    ###################################################################
+    def IsValid(self):
+        return self.aCellKey is not None
+
+    # enddef
+
+    ###################################################################
+    def GetCellCount(self):
+        return len(self.aCellKey)
+
+    # enddef
+
+    ###################################################################
+    def GetPointCount(self):
+        return len(self.aOrder)
+
+    # enddef
+
+    ###################################################################
+    # Build the grid. Cell i covers the positions [i, i+1) * fCellSize along each axis.
+    # iBorder: number of empty cells kept around the points. Neighbor offsets must not exceed this.
+    def Build(self, *, aPos, fCellSize, iBorder=1):
+
+        if fCellSize <= 0.0:
+            raise ValueError("Voxel grid cell size must be positive")
+        # endif
+
+        self.fCellSize = fCellSize
+        aKeys = np.floor(aPos / fCellSize).astype(np.int64)
+
+        # Keep a border of empty cells on all sides, so that adding packed
+        # neighbor offsets never carries over to another key component.
+        self.iBorder = iBorder
+        if len(aKeys) > 0:
+            self.aKeyOrigin = aKeys.min(axis=0) - iBorder
+        else:
+            self.aKeyOrigin = np.zeros(3, dtype=np.int64)
+        # endif
+
+        aPacked = self.GetPackedKeys(aPos)
+        if len(aPacked) > 0 and aPacked.min() < 0:
+            raise ValueError(
+                "Point cloud extent too large for voxel grid with cell size {0}".format(fCellSize)
+            )
+        # endif
+
+        self.aOrder = np.argsort(aPacked, kind="stable")
+        self.aCellKey, self.aCellStart, self.aCellCount = np.unique(
+            aPacked[self.aOrder], return_index=True, return_counts=True
+        )
+
+        self.aPointCell = np.empty(len(aPacked), dtype=np.int64)
+        self.aPointCell[self.aOrder] = np.repeat(np.arange(len(self.aCellKey)), self.aCellCount)
+
+        self.aDenseIdx = None
+        self.aDenseShape = None
+        if len(aKeys) > 0:
+            aShape = aKeys.max(axis=0) - self.aKeyOrigin + iBorder + 1
+            if np.prod(aShape.astype(np.float64)) <= self.iMaxDenseCellCount:
+                self.aDenseShape = aShape
+                self.aDenseIdx = np.full(int(np.prod(aShape)), -1, dtype=np.int32)
+                self.aDenseIdx[self._GetDenseIndex(self.aCellKey)] = np.arange(len(self.aCellKey), dtype=np.int32)
+            # endif
+        # endif
+
+    # enddef
+
+    ###################################################################
+    # Return the packed cell keys of arbitrary positions. Positions outside the
+    # range that can be represented, obtain the key -1.
+    def GetPackedKeys(self, _aPos):
+
+        aKeys = np.floor(_aPos / self.fCellSize).astype(np.int64) - self.aKeyOrigin
+        aValid = np.all((aKeys >= self.iBorder) & (aKeys <= voxel.iPackMax - self.iBorder), axis=1)
+
+        aPacked = (aKeys[:, 0] << (2 * voxel.iPackBits)) | (aKeys[:, 1] << voxel.iPackBits) | aKeys[:, 2]
+        aPacked[~aValid] = -1
+        return aPacked
+
+    # enddef
+
+    ###################################################################
+    @staticmethod
+    def GetPackedOffset(_tOffset):
+        iX, iY, iZ = _tOffset
+        return (iX << (2 * voxel.iPackBits)) + (iY << voxel.iPackBits) + iZ
+
+    # enddef
+
+    ###################################################################
+    # Return the offsets of all cells in a cube of (2 * iRadius + 1)^3 cells
+    @staticmethod
+    def GetNeighborOffsets(_iRadius=1):
+        lRange = range(-_iRadius, _iRadius + 1)
+        return list(itertools.product(lRange, lRange, lRange))
+
+    # enddef
+
+    ###################################################################
+    # Index into the dense index volume of valid packed keys
+    def _GetDenseIndex(self, _aPacked):
+
+        iMask = voxel.iPackMax
+        aX = _aPacked >> (2 * voxel.iPackBits)
+        aY = (_aPacked >> voxel.iPackBits) & iMask
+        aZ = _aPacked & iMask
+        return (aX * self.aDenseShape[1] + aY) * self.aDenseShape[2] + aZ
+
+    # enddef
+
+    ###################################################################
+    # Find the cell indices for the given packed keys. Returns -1 for keys without a cell.
+    def FindCells(self, _aPacked):
+
+        if self.aDenseIdx is not None:
+            # Keys of neighbor cells always lie within the dense volume, as long as the offsets
+            # do not exceed the grid border. Only invalid keys have to be masked.
+            aValid = _aPacked >= 0
+            aIdx = np.full(len(_aPacked), -1, dtype=np.int64)
+            aIdx[aValid] = self.aDenseIdx[self._GetDenseIndex(_aPacked[aValid])]
+            return aIdx
+        # endif
+
+        aIdx = np.searchsorted(self.aCellKey, _aPacked)
+        aIdx = np.minimum(aIdx, len(self.aCellKey) - 1)
+        aFound = (self.aCellKey[aIdx] == _aPacked) & (_aPacked >= 0)
+        return np.where(aFound, aIdx, -1)
+
+    # enddef
+
+    ###################################################################
+    # Return for each of the given cells the index of the neighbor cell at the given offset, or -1.
+    # The offset components must not exceed the border of the grid.
+    def GetNeighborCells(self, _tOffset, aCellIdx=None):
+
+        aKeys = self.aCellKey if aCellIdx is None else self.aCellKey[aCellIdx]
+        return self.FindCells(aKeys + self.GetPackedOffset(_tOffset))
+
+    # enddef
+
+    ###################################################################
+    # Return the neighbor cell indices of the given cells for a list of offsets,
+    # as array of shape (len(lOffsets), len(aCellIdx)). Cells without neighbor are -1.
+    # The offset components must not exceed the border of the grid.
+    def GetNeighborCellTable(self, _lOffsets, _aCellIdx):
+
+        if self.aDenseIdx is not None:
+            # Neighbor offsets are constant offsets in the dense index volume
+            iSy, iSz = int(self.aDenseShape[1]), int(self.aDenseShape[2])
+            aFlatOffsets = np.array([(iX * iSy + iY) * iSz + iZ for iX, iY, iZ in _lOffsets], dtype=np.int64)
+            aBase = self._GetDenseIndex(self.aCellKey[_aCellIdx])
+            return self.aDenseIdx[aFlatOffsets[:, np.newaxis] + aBase]
+        # endif
+
+        aPackedOffsets = np.array([self.GetPackedOffset(x) for x in _lOffsets], dtype=np.int64)
+        aKeys = aPackedOffsets[:, np.newaxis] + self.aCellKey[_aCellIdx]
+        return self.FindCells(aKeys.ravel()).reshape(aKeys.shape)
+
+    # enddef
+
+    ###################################################################
+    # Return the number of points in the 3x3x3 cell neighborhood of each cell, including the cell itself.
+    def GetNeighborhoodCounts(self):
+
+        aCount = np.zeros(len(self.aCellKey), dtype=np.int64)
+        for tOffset in self.GetNeighborOffsets(1):
+            aNb = self.GetNeighborCells(tOffset)
+            aCount += np.where(aNb >= 0, self.aCellCount[np.maximum(aNb, 0)], 0)
+        # endfor
+
+        return aCount
+
+    # enddef
+
+    ###################################################################
+    # Expand the points of the given cells into pairs (query index, point index).
+    # aCellIdx: one cell index per query, or -1 for none.
+    # Returns the index into aCellIdx and the point index of each pair.
+    def ExpandCellPoints(self, _aCellIdx):
+
+        aValid = _aCellIdx >= 0
+        aCnt = np.where(aValid, self.aCellCount[np.maximum(_aCellIdx, 0)], 0)
+        iTotal = int(aCnt.sum())
+
+        aQuery = np.repeat(np.arange(len(_aCellIdx)), aCnt)
+        aOffset = np.arange(iTotal) - np.repeat(np.cumsum(aCnt) - aCnt, aCnt)
+        aPoint = self.aOrder[self.aCellStart[_aCellIdx[aQuery]] + aOffset]
+
+        return aQuery, aPoint
+
+    # enddef
+
+
+# endclass
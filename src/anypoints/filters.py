@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \filters.py
+# Created Date: Monday, October 19th 2026, 3:02:51 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Point filters on numpy point arrays, accelerated by a uniform voxel grid.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import numpy as np
+
+from .class_voxelgrid import CVoxelGrid
+
+# Maximal number of point pairs evaluated at once
+iMaxPairsPerBatch = 1 << 24
+
+
+################################################################################
+# Radius outlier removal. Returns a boolean mask of the points that have at least
+# iMinNeighbors other points within distance fRadius.
+#
+# The points are sorted into a grid with cell size fRadius. All neighbors of a point
+# then lie in the 3x3x3 cells around it, so that points with fewer than iMinNeighbors
+# points in these cells are removed without any distance computation.
+# Points in the same cell of a finer grid with cell size fRadius / sqrt(3) are all within fRadius
+# of each other. Points with at least iMinNeighbors other points in such a cell are kept without
+# any distance computation either.
+# The neighbors of the remaining points are counted exactly, cell by cell starting with the cell
+# of the point itself, until iMinNeighbors neighbors are found.
+# iExactLimit: optional shortcut that keeps points with at least iExactLimit points in their cell neighborhood
+#              without exact counting. This is an approximation, which keeps isolated points next to
+#              dense regions. By default, all points are counted exactly.
+def GetRadiusInlierMask(*, aPos, fRadius, iMinNeighbors, iExactLimit=None):
+
+    iPntCnt = len(aPos)
+    if iPntCnt == 0 or iMinNeighbors <= 0:
+        return np.ones(iPntCnt, dtype=bool)
+    # endif
+
+    xGrid = CVoxelGrid()
+    xGrid.Build(aPos=aPos, fCellSize=fRadius)
+
+    # Upper bound of neighbor count per point
+    aNbCount = xGrid.GetNeighborhoodCounts()[xGrid.aPointCell] - 1
+
+    aMask = aNbCount >= iMinNeighbors
+    if iExactLimit is None:
+        aRefine = np.flatnonzero(aMask)
+    else:
+        aRefine = np.flatnonzero(aMask & (aNbCount < iExactLimit))
+    # endif
+
+    if len(aRefine) == 0:
+        return aMask
+    # endif
+
+    # Lower bound of neighbor count per point
+    xInner = CVoxelGrid()
+    xInner.Build(aPos=aPos[aRefine], fCellSize=fRadius / np.sqrt(3.0))
+    aRefine = aRefine[xInner.aCellCount[xInner.aPointCell] - 1 < iMinNeighbors]
+
+    if len(aRefine) == 0:
+        return aMask
+    # endif
+
+    # Exact neighbor count, batched so that the number of point pairs stays bounded.
+    # The closest cells are tested first, as they are most likely to contain neighbors.
+    lOffsets = sorted(CVoxelGrid.GetNeighborOffsets(1), key=lambda x: sum(map(abs, x)))
+    fRadius2 = fRadius * fRadius
+    aExactCount = np.zeros(len(aRefine), dtype=np.int64)
+    aRefineCells = xGrid.aPointCell[aRefine]
+    aPairCum = np.cumsum(aNbCount[aRefine] + 1)
+
+    iStart = 0
+    while iStart < len(aRefine):
+        iPairStart = aPairCum[iStart - 1] if iStart > 0 else 0
+        iEnd = int(np.searchsorted(aPairCum, iPairStart + iMaxPairsPerBatch, side="right"))
+        iEnd = max(iEnd, iStart + 1)
+
+        # Points of the batch, that have not reached iMinNeighbors neighbors yet.
+        # Each point counts itself in its own cell.
+        aOpen = np.arange(iStart, iEnd)
+        for tOffset in lOffsets:
+            aNb = xGrid.GetNeighborCells(tOffset, aRefineCells[aOpen])
+            aQuery, aPoint = xGrid.ExpandCellPoints(aNb)
+            aDiff = aPos[aPoint] - aPos[aRefine[aOpen]][aQuery]
+            aNear = np.einsum("ij,ij->i", aDiff, aDiff) <= fRadius2
+            aExactCount[aOpen] += np.bincount(aQuery[aNear], minlength=len(aOpen))
+
+            aOpen = aOpen[aExactCount[aOpen] <= iMinNeighbors]
+            if len(aOpen) == 0:
+                break
+            # endif
+        # endfor
+
+        iStart = iEnd
+    # endwhile
+
+    aMask[aRefine] = aExactCount - 1 >= iMinNeighbors
+
+    return aMask
+
+
+# enddef
+
+
+################################################################################
+# Poisson disk (blue noise) subsampling. Returns the sorted indices of a subset of the points,
+# in which no two points are closer than fMinDist.
+#
+# The points are sorted into a grid with cell size fMinDist / sqrt(3), so that each cell can hold
+# at most one sample. In each round, every cell without a sample proposes its next point, in random order.
+# The proposals are accepted in 27 phases of cells that are at least three cells apart,
+# so that proposals of the same phase cannot conflict and are tested against the accepted samples
+# of the surrounding cells all at once.
+# iRounds: maximal number of proposals per cell. More rounds give a denser sampling.
+def GetPoissonDiskIndices(*, aPos, fMinDist, iRounds=3, iSeed=0):
+
+    iPntCnt = len(aPos)
+    if iPntCnt == 0:
+        return np.zeros(0, dtype=np.int64)
+    # endif
+
+    xRng = np.random.default_rng(iSeed)
+    aPerm = xRng.permutation(iPntCnt)
+    aPermPos = aPos[aPerm]
+
+    fCellSize = fMinDist / np.sqrt(3.0)
+    xGrid = CVoxelGrid()
+    xGrid.Build(aPos=aPermPos, fCellSize=fCellSize, iBorder=2)
+    iCellCnt = xGrid.GetCellCount()
+
+    # Neighbor cells that may contain points closer than fMinDist.
+    # Cells at offset (2, 2, 2) are at least fMinDist apart.
+    lOffsets = [x for x in CVoxelGrid.GetNeighborOffsets(2) if x != (0, 0, 0) and sorted(map(abs, x)) != [2, 2, 2]]
+    iBatchSize = max(1, iMaxPairsPerBatch // len(lOffsets))
+
+    # Phase of each cell
+    aCellKeys = np.floor(aPermPos[xGrid.aOrder[xGrid.aCellStart]] / fCellSize).astype(np.int64)
+    aCellPhase = (aCellKeys[:, 0] % 3) * 9 + (aCellKeys[:, 1] % 3) * 3 + (aCellKeys[:, 2] % 3)
+
+    aSample = np.full(iCellCnt, -1, dtype=np.int64)
+    fMinDist2 = fMinDist * fMinDist
+
+    for iRound in range(iRounds):
+        aOpen = (aSample < 0) & (xGrid.aCellCount > iRound)
+        if not np.any(aOpen):
+            break
+        # endif
+
+        for iPhase in range(27):
+            aCells = np.flatnonzero(aOpen & (aCellPhase == iPhase))
+            if len(aCells) == 0:
+                continue
+            # endif
+
+            # Test the candidates against all neighbor offsets at once, in batches of bounded size
+            for iStart in range(0, len(aCells), iBatchSize):
+                aBatchCells = aCells[iStart : iStart + iBatchSize]
+                aCand = xGrid.aOrder[xGrid.aCellStart[aBatchCells] + iRound]
+
+                aNb = xGrid.GetNeighborCellTable(lOffsets, aBatchCells).ravel()
+                aNbSample = aSample[aNb]
+                aTest = np.flatnonzero((aNb >= 0) & (aNbSample >= 0))
+
+                aQuery = aTest % len(aBatchCells)
+                aDiff = aPermPos[aNbSample[aTest]] - aPermPos[aCand[aQuery]]
+                aConflict = aQuery[np.einsum("ij,ij->i", aDiff, aDiff) < fMinDist2]
+
+                aAccept = np.ones(len(aBatchCells), dtype=bool)
+                aAccept[aConflict] = False
+                aSample[aBatchCells[aAccept]] = aCand[aAccept]
+            # endfor batch
+        # endfor phase
+    # endfor round
+
+    return np.sort(aPerm[aSample[aSample >= 0]])
+
+
+# enddef
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \frustum.py
+# Created Date: Monday, October 19th 2026, 11:05:47 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Camera frustum tests on numpy point arrays.
+# A frustum is represented by an array of shape (6, 4) of planes (nx, ny, nz, d) in world coordinates,
+# with normalized normals pointing to the inside. A point p is inside a plane if n.p + d >= 0.
+# The camera convention is the Blender one: the camera looks along its local -Z axis, with +Y up.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import numpy as np
+
+
+################################################################################
+def _TransformPlanes(_aPlanes, _aCamToWorld):
+
+    aM = np.asarray(_aCamToWorld, dtype=np.float64)
+    if aM.shape != (4, 4):
+        raise ValueError("Camera matrix must be a 4x4 matrix")
+    # endif
+
+    # Remove any scale from the rotation part
+    aR = aM[0:3, 0:3]
+    aR = aR / np.linalg.norm(aR, axis=0)
+    aT = aM[0:3, 3]
+
+    aN = _aPlanes[:, 0:3]
+    aN = aN / np.linalg.norm(aN, axis=1)[:, np.newaxis]
+    aD = _aPlanes[:, 3] / np.linalg.norm(_aPlanes[:, 0:3], axis=1)
+
+    aNw = aN @ aR.T
+    aDw = aD - aNw @ aT
+
+    return np.c_[aNw, aDw]
+
+
+# enddef
+
+
+################################################################################
+# Create the frustum planes of a camera.
+# aCamToWorld: 4x4 camera to world matrix.
+# sType: "PERSP" or "ORTHO".
+# tExtent: (left, right, bottom, top) of the image plane.
+#          For "PERSP" these are the tangents of the view angles, i.e. x/-z of the frustum borders,
+#          for "ORTHO" these are the half extents in camera space units.
+# fClipStart, fClipEnd: near and far clipping distances.
+def GetFrustumPlanes(*, aCamToWorld, sType, tExtent, fClipStart, fClipEnd):
+
+    fLeft, fRight, fBottom, fTop = tExtent
+
+    if sType == "PERSP":
+        lPlanes = [
+            [1.0, 0.0, fLeft, 0.0],
+            [-1.0, 0.0, -fRight, 0.0],
+            [0.0, 1.0, fBottom, 0.0],
+            [0.0, -1.0, -fTop, 0.0],
+        ]
+    elif sType == "ORTHO":
+        lPlanes = [
+            [1.0, 0.0, 0.0, -fLeft],
+            [-1.0, 0.0, 0.0, fRight],
+            [0.0, 1.0, 0.0, -fBottom],
+            [0.0, -1.0, 0.0, fTop],
+        ]
+    else:
+        raise ValueError("Unsupported camera type '{0}' for frustum culling".format(sType))
+    # endif
+
+    lPlanes.append([0.0, 0.0, -1.0, -fClipStart])
+    lPlanes.append([0.0, 0.0, 1.0, fClipEnd])
+
+    return _TransformPlanes(np.array(lPlanes, dtype=np.float64), aCamToWorld)
+
+
+# enddef
+
+
+################################################################################
+# Create the frustum planes of a pinhole camera from its intrinsic matrix.
+# aK: 3x3 intrinsic matrix with focal lengths and principal point in pixels.
+#     The image x-axis points right and the y-axis points down, as usual in computer vision.
+# tImageSize: (width, height) in pixels.
+# aCamToWorld: 4x4 camera to world matrix in the Blender camera convention.
+def GetFrustumPlanesFromIntrinsics(*, aK, tImageSize, aCamToWorld, fClipStart, fClipEnd):
+
+    aK = np.asarray(aK, dtype=np.float64)
+    fFx, fFy = aK[0, 0], aK[1, 1]
+    fCx, fCy = aK[0, 2], aK[1, 2]
+    iW, iH = tImageSize
+
+    tExtent = (-fCx / fFx, (iW - fCx) / fFx, -(iH - fCy) / fFy, fCy / fFy)
+
+    return GetFrustumPlanes(
+        aCamToWorld=aCamToWorld, sType="PERSP", tExtent=tExtent, fClipStart=fClipStart, fClipEnd=fClipEnd
+    )
+
+
+# enddef
+
+
+################################################################################
+# Return a boolean mask of the points inside the frustum.
+# fMargin: distance in world units by which the frustum is enlarged on all sides.
+def GetInsideMask(_aPos, _aPlanes, fMargin=0.0):
+
+    aPlanes = np.asarray(_aPlanes, dtype=_aPos.dtype)
+    aMask = np.ones(len(_aPos), dtype=bool)
+
+    # Test plane by plane, to avoid an (N, 6) temporary for large point clouds
+    for aPlane in aPlanes:
+        aMask &= _aPos @ aPlane[0:3] + (aPlane[3] + fMargin) >= 0.0
+    # endfor
+
+    return aMask
+
+
+# enddef
+
+
+################################################################################
+# Return a boolean mask of the points inside any of the given frustums.
+def GetInsideMaskUnion(_aPos, _lPlanes, fMargin=0.0):
+
+    aMask = np.zeros(len(_aPos), dtype=bool)
+    for aPlanes in _lPlanes:
+        aOutIdx = np.flatnonzero(~aMask)
+        if len(aOutIdx) == 0:
+            break
+        # endif
+        aMask[aOutIdx] = GetInsideMask(_aPos[aOutIdx], aPlanes, fMargin=fMargin)
+    # endfor
+
+    return aMask
+
+
+# enddef
+
+
+################################################################################
+# Return a boolean mask of the axis aligned boxes that may intersect the frustum.
+# A box is only rejected if it lies completely outside of one of the planes.
+# This test is conservative: a few boxes near the frustum corners are kept although they lie outside.
+# aBoxMin, aBoxMax: arrays of shape (N, 3) with the box corners.
+def GetBoxIntersectMask(_aBoxMin, _aBoxMax, _aPlanes, fMargin=0.0):
+
+    aBoxMin = np.asarray(_aBoxMin, dtype=np.float64)
+    aBoxMax = np.asarray(_aBoxMax, dtype=np.float64)
+    aMask = np.ones(len(aBoxMin), dtype=bool)
+
+    for aPlane in np.asarray(_aPlanes, dtype=np.float64):
+        # Box corner that lies farthest along the plane normal
+        aCorner = np.where(aPlane[0:3] >= 0.0, aBoxMax, aBoxMin)
+        aMask &= aCorner @ aPlane[0:3] + (aPlane[3] + fMargin) >= 0.0
+    # endfor
+
+    return aMask
+
+
+# enddef
+
+
+################################################################################
+# Return a boolean mask of the axis aligned boxes that may intersect any of the given frustums.
+def GetBoxIntersectMaskUnion(_aBoxMin, _aBoxMax, _lPlanes, fMargin=0.0):
+
+    aMask = np.zeros(len(_aBoxMin), dtype=bool)
+    for aPlanes in _lPlanes:
+        aMask |= GetBoxIntersectMask(_aBoxMin, _aBoxMax, aPlanes, fMargin=fMargin)
+    # endfor
+
+    return aMask
+
+
+# enddef
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \geonodes.py
+# Created Date: Monday, October 19th 2026, 6:21:44 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Geometry Nodes setup to render point meshes with instanced prototype objects
+
+import bpy
+
+# Name of the node that references the instanced object
+sInstanceNodeName = "Instance Object"
+
+# Name of the node that selects the points hidden in the viewport
+sViewportNodeName = "Viewport Display"
+
+
+################################################################################
+# Add a geometry socket to the interface of a node group.
+# The node group interface API changed with Blender 4.0.
+def _AddGeometrySocket(_ngA, _sName, _sInOut):
+
+    if hasattr(_ngA, "interface"):
+        _ngA.interface.new_socket(_sName, in_out=_sInOut, socket_type="NodeSocketGeometry")
+    elif _sInOut == "INPUT":
+        _ngA.inputs.new("NodeSocketGeometry", _sName)
+    else:
+        _ngA.outputs.new("NodeSocketGeometry", _sName)
+    # endif
+
+
+# enddef
+
+
+################################################################################
+# Create a geometry node group that places an instance of objInstance on every point of the input geometry.
+# All point attributes, for example colors, are passed on to the instances, where materials can read them
+# with an attribute node of type 'Instancer'.
+# In the viewport, a random subset of the points can be hidden with SetViewportRatio(). Renders always use all points.
+# fScale: uniform instance scale.
+# sSizeAttribute: optional name of a float point attribute with the instance scale per point. Overrides fScale.
+def CreateInstanceOnPointsGroup(*, sName, objInstance, fScale, sSizeAttribute=None):
+
+    ngA = bpy.data.node_groups.new(sName, "GeometryNodeTree")
+    _AddGeometrySocket(ngA, "Geometry", "INPUT")
+    _AddGeometrySocket(ngA, "Geometry", "OUTPUT")
+
+    nodesG = ngA.nodes
+    linksG = ngA.links
+
+    nodeIn = nodesG.new("NodeGroupInput")
+    nodeIn.location = (-400, 0)
+    nodeOut = nodesG.new("NodeGroupOutput")
+    nodeOut.location = (400, 0)
+
+    nodeObj = nodesG.new("GeometryNodeObjectInfo")
+    nodeObj.name = sInstanceNodeName
+    nodeObj.location = (-200, -200)
+    nodeObj.inputs["Object"].default_value = objInstance
+
+    nodeInst = nodesG.new("GeometryNodeInstanceOnPoints")
+    nodeInst.location = (100, 0)
+
+    # Delete a random subset of the points, only in the viewport
+    nodeView = nodesG.new("GeometryNodeIsViewport")
+    nodeView.location = (-600, -300)
+
+    nodeRand = nodesG.new("FunctionNodeRandomValue")
+    nodeRand.name = sViewportNodeName
+    nodeRand.location = (-600, -450)
+    nodeRand.data_type = "BOOLEAN"
+    nodeRand.inputs["Probability"].default_value = 0.0
+
+    nodeAnd = nodesG.new("FunctionNodeBooleanMath")
+    nodeAnd.location = (-400, -300)
+    nodeAnd.operation = "AND"
+    linksG.new(nodeAnd.inputs[0], nodeView.outputs["Is Viewport"])
+    linksG.new(nodeAnd.inputs[1], [x for x in nodeRand.outputs if x.type == "BOOLEAN"][0])
+
+    nodeDel = nodesG.new("GeometryNodeDeleteGeometry")
+    nodeDel.location = (-200, 0)
+    nodeDel.domain = "POINT"
+    linksG.new(nodeDel.inputs["Geometry"], nodeIn.outputs["Geometry"])
+    linksG.new(nodeDel.inputs["Selection"], nodeAnd.outputs["Boolean"])
+
+    linksG.new(nodeInst.inputs["Points"], nodeDel.outputs["Geometry"])
+    linksG.new(nodeInst.inputs["Instance"], nodeObj.outputs["Geometry"])
+    linksG.new(nodeOut.inputs["Geometry"], nodeInst.outputs["Instances"])
+
+    if sSizeAttribute is not None:
+        nodeSize = nodesG.new("GeometryNodeInputNamedAttribute")
+        nodeSize.location = (-200, -400)
+        nodeSize.data_type = "FLOAT"
+        nodeSize.inputs["Name"].default_value = sSizeAttribute
+        linksG.new(nodeInst.inputs["Scale"], nodeSize.outputs["Attribute"])
+    else:
+        nodeInst.inputs["Scale"].default_value = (fScale, fScale, fScale)
+    # endif
+
+    return ngA
+
+
+# enddef
+
+
+################################################################################
+def GetInstanceObject(_ngA):
+    return _ngA.nodes[sInstanceNodeName].inputs["Object"].default_value
+
+
+# enddef
+
+
+################################################################################
+def SetInstanceObject(_ngA, _objInstance):
+    _ngA.nodes[sInstanceNodeName].inputs["Object"].default_value = _objInstance
+
+
+# enddef
+
+
+################################################################################
+# Set the uniform instance scale of a group without size attribute
+def SetInstanceScale(_ngA, _fScale):
+
+    for nodeA in _ngA.nodes:
+        if nodeA.bl_idname == "GeometryNodeInstanceOnPoints" and not nodeA.inputs["Scale"].is_linked:
+            nodeA.inputs["Scale"].default_value = (_fScale, _fScale, _fScale)
+        # endif
+    # endfor
+
+
+# enddef
+
+
+################################################################################
+# Set the fraction of the points that are shown in the viewport
+def SetViewportRatio(_ngA, _fRatio):
+
+    inProb = _ngA.nodes[sViewportNodeName].inputs["Probability"]
+    fProb = 1.0 - min(max(_fRatio, 0.0), 1.0)
+    if abs(inProb.default_value - fProb) > 1e-6:
+        inProb.default_value = fProb
+    # endif
+
+
+# enddef
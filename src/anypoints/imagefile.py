@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \imagefile.py
+# Created Date: Monday, October 19th 2026, 8:47:19 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Uncompressed image files written directly from numpy pixel buffers, without any image encoding.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import os
+import numpy as np
+
+
+################################################################################
+# Convert float pixel values in the range [0, 1] to 8 bit values
+def ToUint8(_aPixels):
+
+    if _aPixels.dtype == np.uint8:
+        return _aPixels
+    # endif
+
+    aResult = np.empty(_aPixels.shape, dtype=np.uint8)
+    np.clip(np.rint(np.multiply(_aPixels, 255.0, dtype=np.float32)), 0.0, 255.0, out=aResult, casting="unsafe")
+    return aResult
+
+
+# enddef
+
+
+################################################################################
+# Write an uncompressed 32 bit RGBA TGA file.
+# aPixels: array of shape (height, width, 4) with uint8 values, or float values in the range [0, 1].
+#          The first row is the bottom row of the image, as for Blender images.
+def WriteTga(_sFilePath, _aPixels):
+
+    if _aPixels.ndim != 3 or _aPixels.shape[2] != 4:
+        raise ValueError("Expect pixels of shape (height, width, 4), found {0}".format(_aPixels.shape))
+    # endif
+
+    iImgH, iImgW = _aPixels.shape[0:2]
+    if iImgW > 0xFFFF or iImgH > 0xFFFF:
+        raise ValueError("Image size {0}x{1} exceeds the TGA limit of 65535".format(iImgW, iImgH))
+    # endif
+
+    # Header: no image id, no color map, uncompressed true color,
+    # 32 bits per pixel with 8 alpha bits and the origin at the bottom left.
+    aHeader = np.zeros(18, dtype=np.uint8)
+    aHeader[2] = 2
+    aHeader[12:14] = [iImgW & 0xFF, iImgW >> 8]
+    aHeader[14:16] = [iImgH & 0xFF, iImgH >> 8]
+    aHeader[16] = 32
+    aHeader[17] = 8
+
+    # TGA stores the channels in the order BGRA
+    aBgra = ToUint8(_aPixels)[:, :, [2, 1, 0, 3]]
+
+    _MakeFolder(_sFilePath)
+    with open(_sFilePath, "wb") as xFile:
+        xFile.write(aHeader.tobytes())
+        xFile.write(np.ascontiguousarray(aBgra).tobytes())
+    # endwith
+
+
+# enddef
+
+
+################################################################################
+def _MakeFolder(_sFilePath):
+
+    sPath = os.path.dirname(_sFilePath)
+    if len(sPath) > 0:
+        os.makedirs(sPath, exist_ok=True)
+    # endif
+
+
+# enddef
+
+
+################################################################################
+# Header attribute of an OpenEXR file: name, type, size and value
+def _GetExrAttribute(_sName, _sType, _xValue):
+
+    xValue = _xValue.tobytes() if isinstance(_xValue, np.ndarray) else _xValue
+    return _sName.encode() + b"\0" + _sType.encode() + b"\0" + np.int32(len(xValue)).tobytes() + xValue
+
+
+# enddef
+
+
+################################################################################
+# Write an uncompressed OpenEXR file with 32 bit float RGB or RGBA channels.
+# aPixels: array of shape (height, width, 3) or (height, width, 4) with float values.
+#          The first row is the bottom row of the image, as for Blender images.
+#          The values are stored as they are, without any quantization or color transform.
+def WriteExr(_sFilePath, _aPixels):
+
+    if _aPixels.ndim != 3 or _aPixels.shape[2] not in (3, 4):
+        raise ValueError("Expect pixels of shape (height, width, 3|4), found {0}".format(_aPixels.shape))
+    # endif
+
+    iImgH, iImgW, iChannelCnt = _aPixels.shape
+
+    # The channels are stored in alphabetical order of their names
+    lNames = ["A", "B", "G", "R"] if iChannelCnt == 4 else ["B", "G", "R"]
+    lChannels = [3, 2, 1, 0] if iChannelCnt == 4 else [2, 1, 0]
+
+    # Channel list with pixel type FLOAT (2), not linear, and no subsampling
+    xChannels = b"".join(x.encode() + b"\0" + np.array([2, 0, 1, 1], dtype="<i4").tobytes() for x in lNames) + b"\0"
+    aWindow = np.array([0, 0, iImgW - 1, iImgH - 1], dtype="<i4")
+    xHeader = b"".join(
+        [
+            np.array([20000630, 2], dtype="<i4").tobytes(),
+            _GetExrAttribute("channels", "chlist", xChannels),
+            _GetExrAttribute("compression", "compression", b"\0"),
+            _GetExrAttribute("dataWindow", "box2i", aWindow),
+            _GetExrAttribute("displayWindow", "box2i", aWindow),
+            _GetExrAttribute("lineOrder", "lineOrder", b"\0"),
+            _GetExrAttribute("pixelAspectRatio", "float", np.float32(1.0).tobytes()),
+            _GetExrAttribute("screenWindowCenter", "v2f", np.zeros(2, dtype="<f4")),
+            _GetExrAttribute("screenWindowWidth", "float", np.float32(1.0).tobytes()),
+            b"\0",
+        ]
+    )
+
+    # One block per scan line, from the top row down, with the channels one after another
+    iLineSize = iImgW * iChannelCnt * 4
+    aLines = np.empty(iImgH, dtype=[("y", "<i4"), ("size", "<i4"), ("data", "<f4", (iChannelCnt, iImgW))])
+    aLines["y"] = np.arange(iImgH)
+    aLines["size"] = iLineSize
+    aLines["data"] = _aPixels[::-1, :, lChannels].transpose(0, 2, 1)
+
+    iFirst = len(xHeader) + 8 * iImgH
+    aOffsets = iFirst + np.arange(iImgH, dtype="<u8") * (iLineSize + 8)
+
+    _MakeFolder(_sFilePath)
+    with open(_sFilePath, "wb") as xFile:
+        xFile.write(xHeader)
+        xFile.write(aOffsets.tobytes())
+        xFile.write(aLines.tobytes())
+    # endwith
+
+
+# enddef
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \importoptions.py
+# Created Date: Monday, October 19th 2026, 11:52:18 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Options of the point cloud import, which are passed as a single dictionary from the import
+# functions in 'pcimport' to CPointCloud. See CPointCloud.Import() for their meaning.
+# The import percentage and the time budget are not part of the options, as they are set per file.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+# All import options and their default values
+dicDefaults = {
+    "fVoxelSize": 0.02,
+    "bUseVoxel": True,
+    "iLodLevelCount": 1,
+    "iLodLevel": 0,
+    "lFrustumPlanes": None,
+    "fFrustumMargin": 0.0,
+    "aAdaptiveCenter": None,
+    "fAdaptiveSizePerDistance": 0.0,
+    "iAdaptiveMaxLevel": 8,
+    "fOutlierRadius": 0.0,
+    "iOutlierMinNeighbors": 4,
+    "fPoissonMinDist": 0.0,
+    "iTargetPointCount": None,
+    "sPointOrder": None,
+    "bSpatialIndex": False,
+    "iProgressiveSteps": 1,
+    "fProgressiveCoarsePercent": 1.0,
+    "bProgressiveTimer": True,
+    "sBackend": "PARTICLES",
+    "sColorStorage": None,
+    "sPrototypeStyle": "Default",
+    "sImageStorage": "PACKED",
+    "sImageCachePath": None,
+    "iViewportBudget": None,
+}
+
+
+################################################################################
+# Return a complete dictionary of import options. Options missing from dicOptions take their
+# default values, and options given as keyword arguments replace those in dicOptions.
+# Unknown options raise an exception, so that misspelled options are not silently ignored.
+def GetImportOptions(_dicOptions=None, **kwargs):
+
+    dicResult = dict(dicDefaults)
+    for dicSource in [_dicOptions, kwargs]:
+        if dicSource is None:
+            continue
+        # endif
+
+        lUnknown = [x for x in dicSource if x not in dicDefaults]
+        if len(lUnknown) > 0:
+            raise ValueError("Unknown point cloud import option(s): {0}".format(", ".join(lUnknown)))
+        # endif
+        dicResult.update(dicSource)
+    # endfor
+
+    return dicResult
+
+
+# enddef
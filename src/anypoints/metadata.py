@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \metadata.py
+# Created Date: Monday, October 19th 2026, 11:41:52 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Metadata of point cloud files, such as point counts, vertex properties and bounds,
+# collected without importing the files and cached in a JSON manifest.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import os
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from .plyio.PlyException import CPlyException
+from .plyio import CPlyReader
+
+sIndexDti = "/catharsys/point-cloud/index:1.0"
+
+# Number of vertices evaluated at once when computing bounds
+iBoundsChunkSize = 1 << 22
+
+
+################################################################################
+# Compute the bounds of the vertex positions. Binary files are memory mapped and processed in chunks,
+# so that only the position columns are touched. Non-finite positions are ignored.
+def _GetPlyBounds(_sFilePath, _xPly):
+
+    xVexList = _xPly.GetElement("vertex")
+    if xVexList.bCanMemMap:
+        aData = _xPly.MemMapElement(_sFilePath, "vertex")
+    else:
+        xPly = CPlyReader()
+        xPly.Read(_sFilePath)
+        xVexList = xPly.GetElement("vertex")
+        aData = {x: xVexList.GetPropertyValues(x) for x in ["x", "y", "z"]}
+    # endif
+
+    aMin = np.full(3, np.inf)
+    aMax = np.full(3, -np.inf)
+    iCount = xVexList.GetValueCount()
+    for iStart in range(0, iCount, iBoundsChunkSize):
+        for iAxis, sAxis in enumerate(["x", "y", "z"]):
+            aValues = np.asarray(aData[sAxis][iStart : iStart + iBoundsChunkSize], dtype=np.float64)
+            aValues = aValues[np.isfinite(aValues)]
+            if len(aValues) > 0:
+                aMin[iAxis] = min(aMin[iAxis], aValues.min())
+                aMax[iAxis] = max(aMax[iAxis], aValues.max())
+            # endif
+        # endfor
+    # endfor
+
+    if np.any(aMin > aMax):
+        return None, None
+    # endif
+
+    return aMin.tolist(), aMax.tolist()
+
+
+# enddef
+
+
+################################################################################
+# Collect the metadata of a PLY file from its header.
+# bBounds: also compute the bounds of the vertex positions.
+# Returns a dictionary with the elements:
+#   "iPointCount": number of vertices,
+#   "lProperties": list of [name, numpy type string] of the scalar vertex properties,
+#   "sFormat": PLY data format,
+#   "iFileSize", "fFileTime": size and modification time of the file, to validate cached entries,
+#   "lBoundsMin", "lBoundsMax": bounds of the vertex positions, if bBounds is True.
+def GetPlyInfo(_sFilePath, bBounds=False):
+
+    xPly = CPlyReader()
+    xPly.Read(_sFilePath, bHeaderOnly=True)
+    xVexList = xPly.GetElement("vertex")
+    if xVexList is None:
+        raise CPlyException("PLY file '{0}' has no vertex element".format(_sFilePath))
+    # endif
+
+    xStat = os.stat(_sFilePath)
+    lProps = []
+    for sProp in xVexList.GetPropNames():
+        xProp = xVexList.GetProperty(sProp)
+        if xProp.IsScalar():
+            lProps.append([sProp, xProp.GetElType().str])
+        # endif
+    # endfor
+
+    dicInfo = {
+        "iPointCount": xVexList.GetValueCount(),
+        "lProperties": lProps,
+        "sFormat": xPly.sFormat,
+        "iFileSize": xStat.st_size,
+        "fFileTime": xStat.st_mtime,
+    }
+
+    if bBounds:
+        dicInfo["lBoundsMin"], dicInfo["lBoundsMax"] = _GetPlyBounds(_sFilePath, xPly)
+    # endif
+
+    return dicInfo
+
+
+# enddef
+
+
+################################################################################
+# A cached entry is valid, if the file has not changed and it contains all requested data
+def _IsInfoValid(_dicInfo, _sFilePath, _bBounds):
+
+    if _dicInfo is None:
+        return False
+    # endif
+
+    try:
+        xStat = os.stat(_sFilePath)
+    except OSError:
+        return False
+    # endtry
+
+    if _dicInfo.get("iFileSize") != xStat.st_size or _dicInfo.get("fFileTime") != xStat.st_mtime:
+        return False
+    # endif
+
+    return not _bBounds or "lBoundsMin" in _dicInfo
+
+
+# enddef
+
+
+################################################################################
+# Collect the metadata of a list of PLY files in a thread pool. See GetPlyInfo() for the contents.
+# Reading headers and memory mapped columns mostly waits for IO, so threads run in parallel here.
+# sFpCache: optional JSON file to cache the metadata. Entries of unchanged files are taken from it,
+#           and the file is updated if any entry had to be collected.
+# iThreadCount: number of threads. Defaults to the Python thread pool default.
+# Returns a dictionary that maps the normalized file paths to their metadata.
+def BuildIndex(_lFilePaths, *, bBounds=False, sFpCache=None, iThreadCount=None):
+
+    lFilePaths = [os.path.normpath(x) for x in _lFilePaths]
+
+    dicCache = {}
+    if sFpCache is not None and os.path.exists(sFpCache):
+        try:
+            with open(sFpCache, "r") as xFile:
+                dicData = json.load(xFile)
+            # endwith
+            if dicData.get("sDTI") == sIndexDti:
+                dicCache = dicData.get("dicFiles", {})
+            # endif
+        except Exception as xEx:
+            print("Ignoring invalid point cloud index cache '{0}': {1}".format(sFpCache, str(xEx)))
+        # endtry
+    # endif
+
+    dicIndex = {}
+    lMissing = []
+    for sFilePath in lFilePaths:
+        dicInfo = dicCache.get(sFilePath)
+        if _IsInfoValid(dicInfo, sFilePath, bBounds):
+            dicIndex[sFilePath] = dicInfo
+        else:
+            lMissing.append(sFilePath)
+        # endif
+    # endfor
+
+    if len(lMissing) > 0:
+        print("Indexing {0} point cloud files ({1} cached)...".format(len(lMissing), len(dicIndex)))
+        with ThreadPoolExecutor(max_workers=iThreadCount) as xPool:
+            lInfos = list(xPool.map(lambda x: GetPlyInfo(x, bBounds=bBounds), lMissing))
+        # endwith
+        dicIndex.update(zip(lMissing, lInfos))
+
+        if sFpCache is not None:
+            dicCache.update(dicIndex)
+            with open(sFpCache, "w") as xFile:
+                json.dump({"sDTI": sIndexDti, "dicFiles": dicCache}, xFile, indent=4)
+            # endwith
+        # endif
+    # endif
+
+    return dicIndex
+
+
+# enddef
@@ -28,25 +28,31 @@
 
 import re
 import os
+import time
 
 import bpy
 from pathlib import Path
 
 import anyblend
 from .class_pointcloud import CPointCloud
+from . import camera
+from . import budget
+from . import metadata
+from . import viewport
+from . import importoptions
 from anybase import config
 
 
 ##########################################################################################
-def ImportPly(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVoxel):
+def ImportPly(*, xContext, sFilePath, sName, fImportPercent, fTimeBudget=None, dicOptions=None, **kwargs):
 
     xPcl = CPointCloud(sName)
     xPcl.Import(
         xContext=xContext,
         sFilePath=sFilePath,
         fImportPercent=fImportPercent,
-        fVoxelSize=fVoxelSize,
-        bUseVoxel=bUseVoxel,
+        fTimeBudget=fTimeBudget,
+        dicOptions=importoptions.GetImportOptions(dicOptions, **kwargs),
     )
 
     return xPcl
@@ -55,8 +61,31 @@ def ImportPly(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVox
 # enddef
 
 
+##########################################################################################
+# Import a point cloud from numpy arrays. See CPointCloud.ImportArrays() for the parameters.
+def ImportArrays(*, xContext, aPos, sName, aCol=None, **kwargs):
+
+    xPcl = CPointCloud(sName)
+    xPcl.ImportArrays(xContext=xContext, aPos=aPos, aCol=aCol, **kwargs)
+    viewport.ApplySceneBudget(xContext.scene)
+
+    return xPcl
+
+
+# enddef
+
+
 #####################################################################################
-def ImportSet(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVoxel):
+# Collect the files of a point cloud set as import jobs. Each job is a dictionary with the elements:
+#   "sFpData": path of the point cloud file,
+#   "sPcId", "iFrame": point cloud id and frame of the file,
+#   "lCollections": names of the frame and point cloud collections the point cloud is created in,
+#   "sName": name of the point cloud, which is the name of its collection,
+#   "fImportPercent": import percentage,
+#   "fBudgetWeight": weight of the point cloud in a point budget, see LimitPreparedBudget(),
+#   "iPointCount": number of points in the file, if bPointCounts is True.
+# dicBudgetWeights: optional budget weight per point cloud id, for example its screen coverage. Default is 1.
+def GetSetJobs(*, sFilePath, sName, fImportPercent, bPointCounts=False, dicBudgetWeights=None):
 
     xPath = Path(sFilePath)
     sPath = xPath.parent
@@ -64,9 +93,8 @@ def ImportSet(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVox
     dicSet = config.Load(xPath, sDTI="/catharsys/point-cloud/set:1.0")
 
     reFrame = re.compile(r"(\d*)\.")
-    xActLayCol = anyblend.collection.GetActiveLayerCollection(xContext)
 
-    lPcl = []
+    lJobs = []
     lPC = dicSet.get("lPointClouds")
     for xPC in lPC:
         sPathData = xPC.get("sPath")
@@ -81,37 +109,142 @@ def ImportSet(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVox
             xMatch = reFrame.search(sFile)
             iFrame = int(xMatch.group(1))
             sFrameColName = "{0}.Frame.{1:04d}".format(sName, iFrame)
-            if sFrameColName in bpy.data.collections:
-                anyblend.collection.SetActiveCollection(xContext, sFrameColName)
-            else:
-                anyblend.collection.CreateCollection(xContext, sFrameColName)
-            # endif
-
             sPcColName = "{0}.{1}".format(sFrameColName, sPcId)
-            if sPcColName in bpy.data.collections:
-                anyblend.collection.SetActiveCollection(xContext, sPcColName)
-            else:
-                anyblend.collection.CreateCollection(xContext, sPcColName)
-            # endif
-
-            sFpData = os.path.join(sPathData, sFile)
-
-            xPcl = ImportPly(
-                xContext=xContext,
-                sFilePath=sFpData,
-                sName=sPcColName,
-                fImportPercent=fImportPercent,
-                fVoxelSize=fVoxelSize,
-                bUseVoxel=bUseVoxel,
+            lJobs.append(
+                {
+                    "sFpData": os.path.join(sPathData, sFile),
+                    "sPcId": sPcId,
+                    "iFrame": iFrame,
+                    "lCollections": [sFrameColName, sPcColName],
+                    "sName": sPcColName,
+                    "fImportPercent": fImportPercent,
+                    "fBudgetWeight": 1.0 if dicBudgetWeights is None else dicBudgetWeights.get(sPcId, 1.0),
+                }
             )
-            lPcl.append(xPcl)
+        # endfor
+    # endfor
 
-            anyblend.collection.SetActiveLayerCollection(xContext, xActLayCol)
+    # The point counts from the file headers are used to split a time budget
+    if bPointCounts:
+        dicIndex = metadata.BuildIndex([x.get("sFpData") for x in lJobs])
+        for dicJob in lJobs:
+            dicJob["iPointCount"] = dicIndex.get(os.path.normpath(dicJob.get("sFpData"))).get("iPointCount")
         # endfor
+    # endif
+
+    return lJobs
 
+
+# enddef
+
+
+#####################################################################################
+# Split the remaining time over the remaining jobs in proportion to their point counts
+def GetJobTimeBudget(*, lJobs, iJobIdx, fTimeRemain):
+
+    iCntRemain = sum(x.get("iPointCount") for x in lJobs[iJobIdx:])
+    return fTimeRemain * (lJobs[iJobIdx].get("iPointCount") / iCntRemain if iCntRemain > 0 else 1.0)
+
+
+# enddef
+
+
+#####################################################################################
+# Split a total point budget over point clouds processed with CPointCloud.PrepareImport(), and reduce their
+# points to their shares. The budget is split over the point counts after culling, filtering and voxel
+# downsampling, so that the imported point clouds have exactly iPointBudget points in total,
+# if they have enough points.
+# lPrepared: list of tuples (dicJob, xPcl, dicPrepared). The share of each point cloud is weighted
+#            with the job element "fBudgetWeight", if present.
+# Does not access Blender data, so that it can run in a worker thread.
+def LimitPreparedBudget(*, lPrepared, iPointBudget):
+
+    lCounts = [xPcl.GetPreparedPointCount(dicPrepared) for dicJob, xPcl, dicPrepared in lPrepared]
+    lWeights = [dicJob.get("fBudgetWeight", 1.0) for dicJob, xPcl, dicPrepared in lPrepared]
+    print(
+        "Distributing point budget of {0} over {1} point clouds with {2} points".format(
+            iPointBudget, len(lPrepared), sum(lCounts)
+        )
+    )
+
+    lAlloc = budget.DistributeBudget(lCounts=lCounts, iBudget=iPointBudget, lWeights=lWeights)
+    for (dicJob, xPcl, dicPrepared), iAlloc in zip(lPrepared, lAlloc):
+        xPcl.LimitPreparedPoints(dicPrepared=dicPrepared, iPointCount=iAlloc)
     # endfor
 
-    anyblend.collection.SetActiveLayerCollection(xContext, xActLayCol)
+
+# enddef
+
+
+#####################################################################################
+# Create the collections of an import job, if they do not exist, and make the last one active
+def ActivateJobCollections(xContext, dicJob):
+
+    for sColName in dicJob.get("lCollections", []):
+        if sColName in bpy.data.collections:
+            anyblend.collection.SetActiveCollection(xContext, sColName)
+        else:
+            anyblend.collection.CreateCollection(xContext, sColName)
+        # endif
+    # endfor
+
+
+# enddef
+
+
+#####################################################################################
+# Import the point cloud files of a list of jobs, see GetSetJobs().
+# Only the job elements "sFpData", "sName" and "fImportPercent" are required.
+# iPointBudget: if given, the total number of imported points is limited to this number.
+#               All files are processed before any Blender data is created, so that the budget
+#               can be split over the point counts after culling and voxel downsampling, see LimitPreparedBudget().
+# fTimeBudget: if given, the import is expected to finish within this number of seconds.
+#              Requires the job element "iPointCount".
+# Returns the list of imported point clouds.
+def ImportJobs(*, xContext, lJobs, iPointBudget=None, fTimeBudget=None, dicOptions=None, **kwargs):
+
+    dicOptions = importoptions.GetImportOptions(dicOptions, **kwargs)
+
+    fTimeStart = time.perf_counter()
+    xActLayCol = anyblend.collection.GetActiveLayerCollection(xContext)
+
+    lPcl = []
+    lPrepared = []
+    for iJobIdx, dicJob in enumerate(lJobs):
+        fJobTimeBudget = None
+        if fTimeBudget is not None:
+            fJobTimeBudget = GetJobTimeBudget(
+                lJobs=lJobs, iJobIdx=iJobIdx, fTimeRemain=fTimeBudget - (time.perf_counter() - fTimeStart)
+            )
+        # endif
+
+        xPcl = CPointCloud(dicJob.get("sName"))
+        dicPrepared = xPcl.PrepareImport(
+            sFilePath=dicJob.get("sFpData"),
+            fImportPercent=dicJob.get("fImportPercent"),
+            fTimeBudget=fJobTimeBudget,
+            dicOptions=dicOptions,
+        )
+        lPcl.append(xPcl)
+        lPrepared.append((dicJob, xPcl, dicPrepared))
+
+        if iPointBudget is None:
+            # Without a point budget, the data of each point cloud is created right away
+            _FinishJob(xContext, *lPrepared.pop())
+            anyblend.collection.SetActiveLayerCollection(xContext, xActLayCol)
+        # endif
+    # endfor
+
+    if iPointBudget is not None:
+        LimitPreparedBudget(lPrepared=lPrepared, iPointBudget=iPointBudget)
+        for tPrepared in lPrepared:
+            _FinishJob(xContext, *tPrepared)
+            anyblend.collection.SetActiveLayerCollection(xContext, xActLayCol)
+        # endfor
+    # endif
+
+    # The share of the scene viewport budget is updated once for all point clouds
+    viewport.ApplySceneBudget(xContext.scene)
     return lPcl
 
 
@@ -119,16 +252,172 @@ def ImportSet(*, xContext, sFilePath, sName, fImportPercent, fVoxelSize, bUseVox
 
 
 #####################################################################################
+def _FinishJob(_xContext, _dicJob, _xPcl, _dicPrepared):
+
+    ActivateJobCollections(_xContext, _dicJob)
+    _xPcl.FinishImport(xContext=_xContext, dicPrepared=_dicPrepared)
+
+
+# enddef
+
+
+#####################################################################################
+def ImportSet(
+    *,
+    xContext,
+    sFilePath,
+    sName,
+    fImportPercent,
+    iPointBudget=None,
+    fTimeBudget=None,
+    dicBudgetWeights=None,
+    dicOptions=None,
+    **kwargs,
+):
+
+    lJobs = GetSetJobs(
+        sFilePath=sFilePath,
+        sName=sName,
+        fImportPercent=fImportPercent,
+        bPointCounts=fTimeBudget is not None,
+        dicBudgetWeights=dicBudgetWeights,
+    )
+
+    return ImportJobs(
+        xContext=xContext,
+        lJobs=lJobs,
+        iPointBudget=iPointBudget,
+        fTimeBudget=fTimeBudget,
+        dicOptions=dicOptions,
+        **kwargs,
+    )
+
+
+# enddef
+
+
+#####################################################################################
+# Return the complete import options of ImportPointCloud(), with the camera parameters evaluated:
+# the frustum planes for culling, and the center and size per distance of the distance adaptive voxel size.
+def _GetCameraOptions(
+    _xContext,
+    *,
+    dicOptions,
+    bUseVoxel,
+    fVoxelSize,
+    xCullCamera,
+    fCullMargin,
+    tCullFrameRange,
+    xAdaptiveCamera,
+    fAdaptivePixelFootprint,
+    **kwargs,
+):
+
+    dicOptions = importoptions.GetImportOptions(dicOptions, **kwargs)
+    if bUseVoxel is not None:
+        dicOptions["bUseVoxel"] = bUseVoxel
+    # endif
+    if fVoxelSize is not None:
+        dicOptions["fVoxelSize"] = fVoxelSize
+    # endif
+
+    # Optional camera frustum culling. If a frame range (start, end[, step]) is given,
+    # all points visible in any frame of the range are kept.
+    if xCullCamera is not None:
+        if tCullFrameRange is None:
+            lFrustumPlanes = [camera.GetFrustumPlanes(xCullCamera, xScene=_xContext.scene)]
+        else:
+            lFrustumPlanes = camera.GetFrustumPlanesForFrames(
+                xCullCamera,
+                iFrameStart=tCullFrameRange[0],
+                iFrameEnd=tCullFrameRange[1],
+                iFrameStep=tCullFrameRange[2] if len(tCullFrameRange) > 2 else 1,
+                xScene=_xContext.scene,
+            )
+        # endif
+        dicOptions["lFrustumPlanes"] = lFrustumPlanes
+        dicOptions["fFrustumMargin"] = fCullMargin
+    # endif
+
+    # Optional distance adaptive voxel size. The voxel size follows the given
+    # footprint in pixels of the camera, but is never smaller than fVoxelSize.
+    if xAdaptiveCamera is not None:
+        dicOptions["aAdaptiveCenter"] = camera.GetPosition(xAdaptiveCamera)
+        dicOptions["fAdaptiveSizePerDistance"] = (
+            camera.GetPixelAngle(xAdaptiveCamera, xScene=_xContext.scene) * fAdaptivePixelFootprint
+        )
+    # endif
+
+    return dicOptions
+
+
+# enddef
+
+
+#####################################################################################
+# Import job of a single PLY file, see GetSetJobs()
+def _GetPlyJob(_sFilePath, *, sName, fImportPercent, fTimeBudget):
+
+    dicJob = {"sFpData": _sFilePath, "sName": sName, "fImportPercent": fImportPercent}
+    if fTimeBudget is not None:
+        dicJob["iPointCount"] = budget.GetPlyPointCount(_sFilePath)
+    # endif
+
+    return dicJob
+
+
+# enddef
+
+
+#####################################################################################
+# Import a single PLY file or a point cloud set given by a JSON file.
+# xCullCamera: if given, only points inside the view frustum of this camera are imported,
+#              for all frames of tCullFrameRange (start, end[, step]) if given.
+# fCullMargin: distance in world units by which the camera frustum is enlarged.
+# xAdaptiveCamera: if given, the voxel size grows with the distance from this camera,
+#                  such that a voxel covers about fAdaptivePixelFootprint pixels.
+# bUseVoxel, fVoxelSize: voxel options. If given, they replace the values in dicOptions.
+# iPointBudget: if given, the total number of imported points is limited to this number.
+#               The budget applies to the points after culling and voxel downsampling.
+# fTimeBudget: if given, the import is expected to finish within this number of seconds.
+# dicBudgetWeights: optional weight per point cloud id of a set in the split of the point budget,
+#                   for example its screen coverage. See GetSetJobs().
+# dicOptions: import options, see the 'importoptions' module. The options can also be given as keyword arguments.
 def ImportPointCloud(
     _xContext,
     _sFilePath,
     sName="PointCloud",
     fImportPercent=100.0,
-    bUseVoxel=True,
-    fVoxelSize=0.02,
+    bUseVoxel=None,
+    fVoxelSize=None,
+    *,
+    xCullCamera=None,
+    fCullMargin=0.0,
+    tCullFrameRange=None,
+    xAdaptiveCamera=None,
+    fAdaptivePixelFootprint=1.0,
+    iPointBudget=None,
+    fTimeBudget=None,
+    dicBudgetWeights=None,
+    dicOptions=None,
+    **kwargs,
 ):
 
     xActLayCol = anyblend.collection.GetActiveLayerCollection(_xContext)
+
+    dicOptions = _GetCameraOptions(
+        _xContext,
+        dicOptions=dicOptions,
+        bUseVoxel=bUseVoxel,
+        fVoxelSize=fVoxelSize,
+        xCullCamera=xCullCamera,
+        fCullMargin=fCullMargin,
+        tCullFrameRange=tCullFrameRange,
+        xAdaptiveCamera=xAdaptiveCamera,
+        fAdaptivePixelFootprint=fAdaptivePixelFootprint,
+        **kwargs,
+    )
+
     # xCollection = anyblend.collection.CreateCollection(_xContext, sName)
 
     xP = Path(_sFilePath)
@@ -138,19 +427,20 @@ def ImportPointCloud(
             sFilePath=_sFilePath,
             sName=sName,
             fImportPercent=fImportPercent,
-            fVoxelSize=fVoxelSize,
-            bUseVoxel=bUseVoxel,
+            iPointBudget=iPointBudget,
+            fTimeBudget=fTimeBudget,
+            dicBudgetWeights=dicBudgetWeights,
+            dicOptions=dicOptions,
         )
 
     elif xP.suffix == ".ply":
-        xResult = ImportPly(
+        xResult = ImportJobs(
             xContext=_xContext,
-            sFilePath=_sFilePath,
-            sName=sName,
-            fImportPercent=fImportPercent,
-            fVoxelSize=fVoxelSize,
-            bUseVoxel=bUseVoxel,
-        )
+            lJobs=[_GetPlyJob(_sFilePath, sName=sName, fImportPercent=fImportPercent, fTimeBudget=fTimeBudget)],
+            iPointBudget=iPointBudget,
+            fTimeBudget=fTimeBudget,
+            dicOptions=dicOptions,
+        )[0]
     else:
         raise Exception("Invalid file type '{0}'".format(xP.suffix))
     # endif
@@ -158,8 +448,91 @@ def ImportPointCloud(
     anyblend.collection.SetActiveLayerCollection(_xContext, xActLayCol)
 
     #############################################################
+    if fTimeBudget is not None:
+        # Report the parameters chosen for the time budget
+        lPcl = xResult if isinstance(xResult, list) else [xResult]
+        for xPcl in lPcl:
+            print("{0}: {1}".format(xPcl.GetName(), xPcl.GetImportInfo()))
+        # endfor
+    # endif
+
     print("Finished...")
     return xResult
 
 
 # enddef
+
+
+#####################################################################################
+# Plan the import of ImportPointCloud() as a list of jobs, one per point cloud file, without importing anything.
+# The jobs can be run one by one, for example with CImportTask, which reads and processes the files
+# in a worker thread. The parameters are the same as for ImportPointCloud().
+# Returns a dictionary with the elements:
+#   "lJobs": import jobs, see GetSetJobs(),
+#   "dicOptions": import options that are the same for all jobs,
+#   "iPointBudget": total point budget, to be split over the jobs with LimitPreparedBudget(),
+#   "fTimeBudget": total time budget, to be split over the jobs with GetJobTimeBudget().
+def GetImportJobs(
+    _xContext,
+    _sFilePath,
+    sName="PointCloud",
+    fImportPercent=100.0,
+    bUseVoxel=None,
+    fVoxelSize=None,
+    *,
+    xCullCamera=None,
+    fCullMargin=0.0,
+    tCullFrameRange=None,
+    xAdaptiveCamera=None,
+    fAdaptivePixelFootprint=1.0,
+    iPointBudget=None,
+    fTimeBudget=None,
+    dicBudgetWeights=None,
+    dicOptions=None,
+    **kwargs,
+):
+
+    dicOptions = _GetCameraOptions(
+        _xContext,
+        dicOptions=dicOptions,
+        bUseVoxel=bUseVoxel,
+        fVoxelSize=fVoxelSize,
+        xCullCamera=xCullCamera,
+        fCullMargin=fCullMargin,
+        tCullFrameRange=tCullFrameRange,
+        xAdaptiveCamera=xAdaptiveCamera,
+        fAdaptivePixelFootprint=fAdaptivePixelFootprint,
+        **kwargs,
+    )
+
+    xP = Path(_sFilePath)
+    if xP.suffix == ".json":
+        lJobs = GetSetJobs(
+            sFilePath=_sFilePath,
+            sName=sName,
+            fImportPercent=fImportPercent,
+            bPointCounts=fTimeBudget is not None,
+            dicBudgetWeights=dicBudgetWeights,
+        )
+
+    elif xP.suffix == ".ply":
+        lJobs = [_GetPlyJob(_sFilePath, sName=sName, fImportPercent=fImportPercent, fTimeBudget=fTimeBudget)]
+    else:
+        raise Exception("Invalid file type '{0}'".format(xP.suffix))
+    # endif
+
+    return {"lJobs": lJobs, "dicOptions": dicOptions, "iPointBudget": iPointBudget, "fTimeBudget": fTimeBudget}
+
+
+# enddef
+
+
+##########################################################################################
+# Set the maximal number of points shown in the viewport over all point clouds of the scene.
+# The budget is split in proportion to the point counts. None removes the scene budget.
+# Point clouds whose share is below one percent of their points may be hidden, see viewport.ApplySceneBudget().
+def SetSceneViewportBudget(*, xContext, iBudget):
+    viewport.SetSceneBudget(xContext.scene, iBudget)
+
+
+# enddef
@@ -143,6 +143,21 @@ class CPlyElement:
 
     # enddef
 
+    ##################################################
+    # Structured numpy type of one data set of a binary element with scalar properties
+    def GetDType(self):
+        if not self.bCanMemMap:
+            raise CPlyException("Element '{0}' has no fixed size binary layout".format(self.sName))
+        # endif
+
+        lTypes = []
+        for xProp in self.lProps:
+            lTypes.extend(xProp.GetNamedElType().descr)
+        # endfor
+        return np.dtype(lTypes)
+
+    # enddef
+
     ##################################################
     def ParseHeader(self, _lKey, _xStream):
         try:
@@ -304,12 +319,7 @@ class CPlyElement:
         else:
             self.aValues = None
             self.dicValues = None
-            lTypes = []
-            for xProp in self.lProps:
-                lTypes.extend(xProp.GetNamedElType().descr)
-            # endfor
-            xDType = np.dtype(lTypes)
-            self.aValues = _xStream.ReadBinaryArray(xDType=xDType, iCount=iRowCnt)
+            self.aValues = _xStream.ReadBinaryArray(xDType=self.GetDType(), iCount=iRowCnt)
         # endif
 
     # enddef
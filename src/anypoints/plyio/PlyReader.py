@@ -26,6 +26,8 @@
 # </LICENSE>
 ###
 
+import numpy as np
+
 from .PlyException import CPlyException
 from .PlyStream import CPlyStream
 from .PlyElement import CPlyElement
@@ -42,6 +44,7 @@ class CPlyReader:
         self.lSupportedFormats = ["ascii", "binary_little_endian", "binary_big_endian"]
 
         self.lElement = []
+        self.iDataOffset = None
 
     # enddef
 
@@ -153,6 +156,7 @@ class CPlyReader:
         try:
             self.xStream = CPlyStream(_xStream, bRead=True, bRewind=True)
             self._ParseHeader()
+            self.iDataOffset = self.xStream.xStream.tell()
 
             if not bHeaderOnly:
                 for xEl in self.lElement:
@@ -172,6 +176,34 @@ class CPlyReader:
 
     # enddef
 
+    #####################################################################
+    # Map the data of an element of a binary PLY file into memory, without reading it.
+    # The header must have been read before. All elements up to the given one must have
+    # a fixed size binary layout, that is, they must not contain lists.
+    def MemMapElement(self, _sFilePath, _xId):
+
+        xElement = self.GetElement(_xId)
+        if xElement is None:
+            raise CPlyException("Element '{0}' not found".format(_xId))
+        # endif
+
+        iOffset = self.iDataOffset
+        for xEl in self.lElement:
+            if not xEl.bCanMemMap:
+                raise CPlyException("Element '{0}' cannot be memory mapped".format(xEl.GetName()))
+            # endif
+            if xEl is xElement:
+                break
+            # endif
+            iOffset += xEl.GetValueCount() * xEl.GetDType().itemsize
+        # endfor
+
+        return np.memmap(
+            _sFilePath, dtype=xElement.GetDType(), mode="r", offset=iOffset, shape=(xElement.GetValueCount(),)
+        )
+
+    # enddef
+
     #####################################################################
     def PrintHeaderInfo(self):
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \PlyWriter.py
+# Created Date: Monday, October 19th 2026, 10:12:40 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+
+from .PlyException import CPlyException
+from .PlyType import dicNpToPly
+
+
+# Writes elements with scalar properties to binary little endian PLY files.
+# Each element is given as numpy structured array, whose field names are the property names.
+class CPlyWriter:
+
+    #####################################################################
+    def __init__(self):
+        self.lElement = []
+
+    # enddef
+
+    #####################################################################
+    def AddElement(self, _sName, _aData):
+
+        if _aData.dtype.names is None:
+            raise CPlyException("Data of element '{0}' is not a structured array".format(_sName))
+        # endif
+
+        self.lElement.append((_sName, _aData))
+
+    # enddef
+
+    #####################################################################
+    def _GetHeader(self):
+
+        lLines = ["ply", "format binary_little_endian 1.0"]
+        for sName, aData in self.lElement:
+            lLines.append("element {0} {1}".format(sName, len(aData)))
+            for sProp in aData.dtype.names:
+                xType = aData.dtype.fields[sProp][0]
+                sPlyType = dicNpToPly.get("{0}{1}".format(xType.kind, xType.itemsize))
+                if sPlyType is None or xType.shape != ():
+                    raise CPlyException(
+                        "Type '{0}' of property '{1}' cannot be written to PLY".format(xType, sProp)
+                    )
+                # endif
+                lLines.append("property {0} {1}".format(sPlyType, sProp))
+            # endfor
+        # endfor
+        lLines.append("end_header")
+
+        return ("\n".join(lLines) + "\n").encode("ascii")
+
+    # enddef
+
+    #####################################################################
+    def Write(self, _sFilePath):
+
+        try:
+            with open(_sFilePath, "wb") as xFile:
+                xFile.write(self._GetHeader())
+                for _, aData in self.lElement:
+                    # Store packed, with all values in little endian byte order
+                    xType = np.dtype([(x, aData.dtype.fields[x][0].newbyteorder("<")) for x in aData.dtype.names])
+                    xFile.write(aData.astype(xType).tobytes())
+                # endfor
+            # endwith
+        except CPlyException:
+            raise
+        except Exception as xEx:
+            raise CPlyException("Error writing file '{0}'".format(_sFilePath), xEx)
+        # endtry
+
+    # enddef
+
+
+# endclass
@@ -28,3 +28,4 @@
 
 # PLY IO Library
 from .PlyReader import CPlyReader
+from .PlyWriter import CPlyWriter
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \prototypes.py
+# Created Date: Monday, October 19th 2026, 8:12:37 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Library of particle prototype objects and materials that is shared by all point clouds of the same style.
+# The library of a style is created with the first point cloud that uses it, and is reused by all later imports.
+# The library objects and materials read the point color from the instancer attribute 'Col'.
+# Point clouds that store their colors in an image only add a material that samples their image,
+# and prototype objects that use the library meshes with this material.
+
+import bpy
+
+from anybase.cls_anyexcept import CAnyExcept
+from . import solids
+
+sLibraryPrefix = "AnyPoints.Library"
+
+# Prototype object types and the functions that create them
+dicPrototypeTypes = {"Cube": solids.CreateCube, "Tetra": solids.CreateTetraeder}
+
+# Name of the image node in materials that sample a color image
+sColorImageNodeName = "Color Image"
+
+# Name prefix of the nodes that select between several color images
+sColorSelectNodeName = "Color Select"
+
+# Point color sources of the particle materials:
+#   "ATTRIBUTE": color attribute 'Col' of the instancer
+#   "IMAGE_UV": color image at the UV coordinates of the instancing particle
+#   "IMAGE_ATTRIBUTE": color image at the texture coordinates in the instancer attribute 'UVMap'
+lColorSources = ["ATTRIBUTE", "IMAGE_UV", "IMAGE_ATTRIBUTE"]
+
+
+################################################################################
+def GetLibraryName(_sStyle):
+    return "{0}.{1}".format(sLibraryPrefix, _sStyle)
+
+
+# enddef
+
+
+################################################################################
+# Create a material that emits the point color of the given source
+def _CreateColorMaterial(_sName, _sColorSource):
+
+    matA = bpy.data.materials.new(name=_sName)
+    matA.use_nodes = True
+    matA.use_fake_user = True
+    nodesP = matA.node_tree.nodes
+    linksP = matA.node_tree.links
+
+    nodeBSDF = nodesP.get("Principled BSDF")
+    inBC = nodeBSDF.inputs["Base Color"]
+    inBC.default_value = (0, 0, 0, 1)
+
+    if _sColorSource == "ATTRIBUTE":
+        nodeAttr = nodesP.new("ShaderNodeAttribute")
+        nodeAttr.location = (-300, 300)
+        nodeAttr.attribute_type = "INSTANCER"
+        nodeAttr.attribute_name = "Col"
+
+        linksP.new(nodeBSDF.inputs["Emission"], nodeAttr.outputs["Color"])
+    else:
+        nodeTex = nodesP.new("ShaderNodeTexImage")
+        nodeTex.name = sColorImageNodeName
+        nodeTex.location = (-300, 300)
+
+        if _sColorSource == "IMAGE_ATTRIBUTE":
+            nodeTC = nodesP.new("ShaderNodeAttribute")
+            nodeTC.location = (-500, 300)
+            nodeTC.attribute_type = "INSTANCER"
+            nodeTC.attribute_name = "UVMap"
+            linksP.new(nodeTex.inputs["Vector"], nodeTC.outputs["Vector"])
+        else:
+            nodeTC = nodesP.new("ShaderNodeTexCoord")
+            nodeTC.location = (-500, 300)
+            nodeTC.from_instancer = True
+            linksP.new(nodeTex.inputs["Vector"], nodeTC.outputs["UV"])
+        # endif
+
+        linksP.new(nodeBSDF.inputs["Emission"], nodeTex.outputs["Color"])
+    # endif
+
+    return matA
+
+
+# enddef
+
+
+################################################################################
+# Return the collection of the library objects. It is excluded from viewport and render,
+# and linked to the scene of the context if necessary.
+def _GetLibraryCollection(_xContext):
+
+    clnLib = bpy.data.collections.get(sLibraryPrefix)
+    if clnLib is None:
+        clnLib = bpy.data.collections.new(sLibraryPrefix)
+        clnLib.hide_viewport = True
+        clnLib.hide_render = True
+    # endif
+
+    clnScene = _xContext.scene.collection
+    if clnScene.children.get(clnLib.name) is None:
+        clnScene.children.link(clnLib)
+    # endif
+
+    return clnLib
+
+
+# enddef
+
+
+################################################################################
+# Return the library of a style and create it, if it does not exist yet.
+# Returns a dictionary with the elements:
+#   "dicObjects": prototype objects by type,
+#   "dicMaterials": materials by type, "Tex" with the instancer color attribute and "Color" with a single color.
+def GetLibrary(_xContext, _sStyle):
+
+    sLibName = GetLibraryName(_sStyle)
+    clnLib = _GetLibraryCollection(_xContext)
+
+    dicMaterials = {}
+    sMatName = sLibName + ".Mat.Tex"
+    matTex = bpy.data.materials.get(sMatName)
+    if matTex is None:
+        print("Creating particle prototype library '{0}'...".format(_sStyle))
+        matTex = _CreateColorMaterial(sMatName, "ATTRIBUTE")
+    # endif
+    dicMaterials["Tex"] = matTex
+
+    sMatName = sLibName + ".Mat.Color"
+    matCol = bpy.data.materials.get(sMatName)
+    if matCol is None:
+        matCol = bpy.data.materials.new(name=sMatName)
+        matCol.use_nodes = True
+        matCol.use_fake_user = True
+
+        nodeBSDF = matCol.node_tree.nodes.get("Principled BSDF")
+        inBC = nodeBSDF.inputs["Base Color"]
+        inBC.default_value = (0.85, 0.01, 0.015, 1)
+        nodeBSDF.inputs["Roughness"].default_value = 0.1
+    # endif
+    dicMaterials["Color"] = matCol
+
+    dicObjects = {}
+    for sType, funcCreate in dicPrototypeTypes.items():
+        sObjName = "{0}.{1}".format(sLibName, sType)
+        objPart = bpy.data.objects.get(sObjName)
+        if objPart is None:
+            objPart = funcCreate(_xContext, sObjName, 1.0)
+            for clnA in list(objPart.users_collection):
+                clnA.objects.unlink(objPart)
+            # endfor
+            clnLib.objects.link(objPart)
+            objPart.data.materials.append(matTex)
+        # endif
+        dicObjects[sType] = objPart
+    # endfor
+
+    return {"dicObjects": dicObjects, "dicMaterials": dicMaterials}
+
+
+# enddef
+
+
+################################################################################
+def _NewSelectNode(_nodesP, _sType, _sName, _tLocation):
+
+    nodeA = _nodesP.new(_sType)
+    nodeA.name = "{0}.{1}".format(sColorSelectNodeName, _sName)
+    nodeA.location = _tLocation
+    return nodeA
+
+
+# enddef
+
+
+################################################################################
+# Set the color images of a material created with CreateImageMaterial().
+# Several images are stacked along the V texture coordinate: the integer part of V selects the image,
+# and the fractional part is the V coordinate within the image.
+def SetMaterialImages(_matA, _lImages):
+
+    nodesP = _matA.node_tree.nodes
+    linksP = _matA.node_tree.links
+    nodeTex = nodesP[sColorImageNodeName]
+    nodeBSDF = nodesP.get("Principled BSDF")
+
+    # Remove the image selection of previous images
+    nodeSplit = nodesP.get(sColorSelectNodeName + ".UV")
+    if nodeSplit is not None:
+        xUvSocket = nodeSplit.inputs["Vector"].links[0].from_socket
+    else:
+        xUvSocket = nodeTex.inputs["Vector"].links[0].from_socket
+    # endif
+    for nodeA in [x for x in nodesP if x.name.startswith(sColorSelectNodeName)]:
+        nodesP.remove(nodeA)
+    # endfor
+
+    nodeTex.image = _lImages[0]
+    if len(_lImages) == 1:
+        linksP.new(nodeTex.inputs["Vector"], xUvSocket)
+        linksP.new(nodeBSDF.inputs["Emission"], nodeTex.outputs["Color"])
+        return
+    # endif
+
+    nodeSplit = _NewSelectNode(nodesP, "ShaderNodeSeparateXYZ", "UV", (-900, 300))
+    linksP.new(nodeSplit.inputs["Vector"], xUvSocket)
+
+    nodeIdx = _NewSelectNode(nodesP, "ShaderNodeMath", "Index", (-700, 100))
+    nodeIdx.operation = "FLOOR"
+    linksP.new(nodeIdx.inputs[0], nodeSplit.outputs["Y"])
+
+    nodeFrac = _NewSelectNode(nodesP, "ShaderNodeMath", "Fraction", (-700, 300))
+    nodeFrac.operation = "FRACT"
+    linksP.new(nodeFrac.inputs[0], nodeSplit.outputs["Y"])
+
+    nodeUv = _NewSelectNode(nodesP, "ShaderNodeCombineXYZ", "Vector", (-500, 300))
+    linksP.new(nodeUv.inputs["X"], nodeSplit.outputs["X"])
+    linksP.new(nodeUv.inputs["Y"], nodeFrac.outputs["Value"])
+
+    linksP.new(nodeTex.inputs["Vector"], nodeUv.outputs["Vector"])
+    xColor = nodeTex.outputs["Color"]
+
+    for iImgIdx, imgA in enumerate(_lImages[1:], start=1):
+        iX, iY = -300, 300 - 300 * iImgIdx
+        nodeImg = _NewSelectNode(nodesP, "ShaderNodeTexImage", "Image.{0}".format(iImgIdx), (iX, iY))
+        nodeImg.image = imgA
+        nodeImg.interpolation = nodeTex.interpolation
+        linksP.new(nodeImg.inputs["Vector"], nodeUv.outputs["Vector"])
+
+        nodeSel = _NewSelectNode(nodesP, "ShaderNodeMath", "Select.{0}".format(iImgIdx), (iX + 200, iY - 100))
+        nodeSel.operation = "GREATER_THAN"
+        linksP.new(nodeSel.inputs[0], nodeIdx.outputs["Value"])
+        nodeSel.inputs[1].default_value = iImgIdx - 0.5
+
+        nodeMix = _NewSelectNode(nodesP, "ShaderNodeMixRGB", "Mix.{0}".format(iImgIdx), (iX + 400, iY))
+        linksP.new(nodeMix.inputs["Fac"], nodeSel.outputs["Value"])
+        linksP.new(nodeMix.inputs["Color1"], xColor)
+        linksP.new(nodeMix.inputs["Color2"], nodeImg.outputs["Color"])
+        xColor = nodeMix.outputs["Color"]
+    # endfor
+
+    linksP.new(nodeBSDF.inputs["Emission"], xColor)
+
+
+# enddef
+
+
+################################################################################
+# Create a material of a point cloud that samples its color images. The material is copied
+# from a template of the style, so that the node tree is only built once per style and color source.
+# See SetMaterialImages() for the use of several images.
+def CreateImageMaterial(*, sName, sStyle, sColorSource, lImages):
+
+    if sColorSource not in lColorSources or sColorSource == "ATTRIBUTE":
+        raise CAnyExcept("Invalid image color source '{0}'".format(sColorSource))
+    # endif
+
+    sTplName = "{0}.Template.{1}".format(GetLibraryName(sStyle), sColorSource)
+    matTpl = bpy.data.materials.get(sTplName)
+    if matTpl is None:
+        matTpl = _CreateColorMaterial(sTplName, sColorSource)
+    # endif
+
+    matA = matTpl.copy()
+    matA.name = sName
+    matA.use_fake_user = True
+    SetMaterialImages(matA, lImages)
+
+    return matA
+
+
+# enddef
+
+
+################################################################################
+# Create a prototype object of a point cloud, that uses the mesh of a library object,
+# but has its own material. The object is linked to the collection clnTarget.
+def CreateInstanceOfPrototype(*, clnTarget, sName, objLibrary, matA):
+
+    objPart = bpy.data.objects.new(sName, objLibrary.data)
+    clnTarget.objects.link(objPart)
+
+    # Object material slots override the library material without changing the shared mesh
+    objPart.material_slots[0].link = "OBJECT"
+    objPart.material_slots[0].material = matA
+    objPart.hide_set(True)
+
+    return objPart
+
+
+# enddef
+
+
+################################################################################
+# Test whether a data block belongs to a prototype library. Library data blocks are shared
+# by all point clouds of a style and must not be changed for a single point cloud.
+def IsLibraryElement(_xId):
+    return _xId.name.startswith(sLibraryPrefix + ".")
+
+
+# enddef
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \test_budget.py
+# Created Date: Monday, October 19th 2026, 11:29:45 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import pytest
+
+from anypoints import budget
+
+
+################################################################################
+def test_DistributeBudget_SmallClouds():
+
+    # Small clouds keep at least one point, even if their share of the budget is below one point
+    lAlloc = budget.DistributeBudget(lCounts=[10, 1000, 100000], iBudget=5000)
+    assert sum(lAlloc) == 5000
+    assert all(x >= 1 for x in lAlloc)
+    assert all(x <= y for x, y in zip(lAlloc, [10, 1000, 100000]))
+
+
+# enddef
+
+
+################################################################################
+@pytest.mark.parametrize("iBudget", [0, 1, 2, 3, 7])
+def test_DistributeBudget_TinyBudget(iBudget):
+
+    lAlloc = budget.DistributeBudget(lCounts=[5, 5, 5], iBudget=iBudget)
+    assert sum(lAlloc) == iBudget
+    assert max(lAlloc) - min(lAlloc) <= 1
+
+
+# enddef
+
+
+################################################################################
+def test_DistributeBudget_Empty():
+
+    assert len(budget.DistributeBudget(lCounts=[], iBudget=100)) == 0
+    assert list(budget.DistributeBudget(lCounts=[0, 0], iBudget=100)) == [0, 0]
+
+
+# enddef
+
+
+################################################################################
+def test_DistributeBudget_AboveTotal():
+
+    assert list(budget.DistributeBudget(lCounts=[10, 20], iBudget=1000)) == [10, 20]
+
+
+# enddef
+
+
+################################################################################
+def test_GetImportPercents_SmallFractions():
+
+    lCounts = [10, 1000, 100000]
+    lPercents = budget.GetImportPercents(lCounts=lCounts, iBudget=5000)
+    assert all(0.0 < x <= 100.0 for x in lPercents)
+    assert sum(round(x * y / 100.0) for x, y in zip(lPercents, lCounts)) == 5000
+
+
+# enddef
+
+
+################################################################################
+def test_DistributeBudget_Weights():
+
+    # Shares follow weight * count, and budget a saturated cloud cannot use goes to the others
+    lAlloc = budget.DistributeBudget(lCounts=[1000, 1000], iBudget=400, lWeights=[1.0, 3.0])
+    assert sum(lAlloc) == 400
+    assert abs(lAlloc[0] - 100) <= 1
+    assert list(budget.DistributeBudget(lCounts=[1000, 100], iBudget=400, lWeights=[1.0, 10.0])) == [300, 100]
+
+
+# enddef
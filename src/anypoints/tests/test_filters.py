@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \test_filters.py
+# Created Date: Monday, October 19th 2026, 11:21:07 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+from anypoints import filters
+
+
+################################################################################
+def _GetWallWithOutlier():
+    # Dense grid of points in the XY plane, and one point just above the wall
+    aX, aY = np.meshgrid(np.arange(20) * 0.05, np.arange(20) * 0.05)
+    aWall = np.c_[aX.ravel(), aY.ravel(), np.zeros(aX.size)]
+    return np.concatenate([aWall, [[0.5, 0.5, 0.15]]])
+
+
+# enddef
+
+
+################################################################################
+def test_GetRadiusInlierMask_Empty():
+
+    aMask = filters.GetRadiusInlierMask(aPos=np.zeros((0, 3)), fRadius=0.1, iMinNeighbors=4)
+    assert aMask.dtype == bool and len(aMask) == 0
+
+
+# enddef
+
+
+################################################################################
+def test_GetRadiusInlierMask_Duplicates():
+
+    # Duplicates count as neighbors of each other
+    aPos = np.array([[0.0, 0.0, 0.0]] * 5 + [[1.0, 1.0, 1.0]] * 2)
+    aMask = filters.GetRadiusInlierMask(aPos=aPos, fRadius=0.1, iMinNeighbors=4)
+    assert aMask.tolist() == [True] * 5 + [False] * 2
+
+
+# enddef
+
+
+################################################################################
+def test_GetRadiusInlierMask_OutlierNextToWall():
+
+    aPos = _GetWallWithOutlier()
+    aMask = filters.GetRadiusInlierMask(aPos=aPos, fRadius=0.1, iMinNeighbors=4)
+    assert np.all(aMask[:-1])
+    assert not aMask[-1]
+
+
+# enddef
+
+
+################################################################################
+# The grid shortcuts and the early stop of the counting give the same result as counting all neighbors
+@pytest.mark.parametrize("fRadius, iMinNeighbors", [(0.02, 1), (0.05, 4), (0.1, 30), (0.2, 200)])
+def test_GetRadiusInlierMask_Exact(fRadius, iMinNeighbors):
+
+    xRnd = np.random.default_rng(1)
+    aPos = np.concatenate([xRnd.random((1500, 3)) * [1.0, 1.0, 0.2], xRnd.random((50, 3)) * 3.0])
+    aPos = np.concatenate([aPos, aPos[0:100]])
+
+    aDist = np.linalg.norm(aPos[:, np.newaxis, :] - aPos[np.newaxis, :, :], axis=2)
+    aExpected = (aDist <= fRadius).sum(axis=1) - 1 >= iMinNeighbors
+
+    aMask = filters.GetRadiusInlierMask(aPos=aPos, fRadius=fRadius, iMinNeighbors=iMinNeighbors)
+    assert np.array_equal(aMask, aExpected)
+
+
+# enddef
+
+
+################################################################################
+def test_GetPoissonDiskIndices_Empty():
+
+    assert len(filters.GetPoissonDiskIndices(aPos=np.zeros((0, 3)), fMinDist=0.1)) == 0
+
+
+# enddef
+
+
+################################################################################
+def test_GetPoissonDiskIndices_Duplicates():
+
+    aPos = np.array([[0.0, 0.0, 0.0]] * 5 + [[1.0, 1.0, 1.0]] * 2)
+    aIdx = filters.GetPoissonDiskIndices(aPos=aPos, fMinDist=0.1)
+    assert len(aIdx) == 2
+    assert np.array_equal(np.unique(aPos[aIdx], axis=0), np.unique(aPos, axis=0))
+
+
+# enddef
+
+
+################################################################################
+def test_GetPoissonDiskIndices_MinDist():
+
+    aPos = np.random.default_rng(1).random((2000, 3))
+    aIdx = filters.GetPoissonDiskIndices(aPos=aPos, fMinDist=0.1)
+    assert np.array_equal(aIdx, np.unique(aIdx))
+
+    aSel = aPos[aIdx]
+    aDist = np.linalg.norm(aSel[:, np.newaxis, :] - aSel[np.newaxis, :, :], axis=2)
+    np.fill_diagonal(aDist, np.inf)
+    assert aDist.min() >= 0.1
+
+
+# enddef
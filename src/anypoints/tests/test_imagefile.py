@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \test_imagefile.py
+# Created Date: Monday, October 19th 2026, 2:09:51 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+
+from anypoints import imagefile
+
+
+################################################################################
+def test_WriteTga(tmp_path):
+
+    aPixels = np.random.default_rng(0).integers(0, 256, (3, 5, 4)).astype(np.uint8)
+    sFp = str(tmp_path / "a.tga")
+    imagefile.WriteTga(sFp, aPixels)
+
+    aData = np.fromfile(sFp, dtype=np.uint8)
+    assert aData[2] == 2 and aData[16] == 32
+    assert np.array_equal(aData[18:].reshape(3, 5, 4), aPixels[:, :, [2, 1, 0, 3]])
+
+
+# enddef
+
+
+################################################################################
+def test_WriteExr(tmp_path):
+
+    aPixels = np.random.default_rng(0).random((3, 5, 4)).astype(np.float32)
+    sFp = str(tmp_path / "a.exr")
+    imagefile.WriteExr(sFp, aPixels)
+
+    xData = open(sFp, "rb").read()
+    assert xData[0:4] == b"\x76\x2f\x31\x01"
+
+    # The header is followed by the offset table and 3 scan lines of 4 channels with 5 pixels.
+    # The scan lines go from the top row down, each with the channels in the order A, B, G, R.
+    iHeaderSize = len(xData) - 3 * 8 - 3 * (8 + 80)
+    assert xData[iHeaderSize - 1] == 0
+    aOffsets = np.frombuffer(xData, dtype="<u8", count=3, offset=iHeaderSize)
+    assert aOffsets[0] == iHeaderSize + 3 * 8
+    for iLine, iOffset in enumerate(aOffsets):
+        iY, iSize = np.frombuffer(xData, dtype="<i4", count=2, offset=int(iOffset))
+        aLine = np.frombuffer(xData, dtype="<f4", count=20, offset=int(iOffset) + 8).reshape(4, 5)
+        assert iY == iLine and iSize == 80
+        assert np.array_equal(aLine, aPixels[2 - iLine, :, [3, 2, 1, 0]])
+    # endfor
+
+
+# enddef
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \test_tiling.py
+# Created Date: Monday, October 19th 2026, 11:42:30 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import json
+
+import numpy as np
+
+from anypoints import tiling
+from anypoints.plyio import CPlyWriter
+
+
+################################################################################
+def _WritePly(_sFilePath, _aPos):
+    aData = np.empty(len(_aPos), dtype=[("x", "<f4"), ("y", "<f4"), ("z", "<f4")])
+    for iIdx, sProp in enumerate(["x", "y", "z"]):
+        aData[sProp] = _aPos[:, iIdx]
+    # endfor
+
+    xWriter = CPlyWriter()
+    xWriter.AddElement("vertex", aData)
+    xWriter.Write(str(_sFilePath))
+
+
+# enddef
+
+
+################################################################################
+def test_CreateTiles_Duplicates(tmp_path):
+
+    aPos = np.array([[0.5, 0.5, 0.0]] * 3 + [[1.5, 0.5, 1.0]] * 2)
+    sFilePath = tmp_path / "dup.ply"
+    _WritePly(sFilePath, aPos)
+
+    sFpManifest = tiling.CreateTiles(sFilePath=str(sFilePath), sPathOut=str(tmp_path / "tiles"), fTileSize=1.0)
+    with open(sFpManifest, "r") as xFile:
+        dicManifest = json.load(xFile)
+    # endwith
+
+    assert dicManifest["iPointCount"] == 5
+    assert sorted((x["lIndex"], x["iPointCount"]) for x in dicManifest["lTiles"]) == [([0, 0], 3), ([1, 0], 2)]
+
+
+# enddef
+
+
+################################################################################
+def test_CreateTiles_Empty(tmp_path):
+
+    sFilePath = tmp_path / "empty.ply"
+    _WritePly(sFilePath, np.zeros((0, 3)))
+
+    sFpManifest = tiling.CreateTiles(sFilePath=str(sFilePath), sPathOut=str(tmp_path / "tiles"), fTileSize=1.0)
+    with open(sFpManifest, "r") as xFile:
+        dicManifest = json.load(xFile)
+    # endwith
+
+    assert dicManifest["iPointCount"] == 0
+    assert dicManifest["lTiles"] == []
+
+
+# enddef
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \test_voxel.py
+# Created Date: Monday, October 19th 2026, 11:04:26 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+import numpy as np
+import pytest
+
+from anypoints import voxel
+
+
+################################################################################
+def _GetDuplicatedPoints():
+    xRnd = np.random.default_rng(1)
+    aPos = xRnd.random((1000, 3), dtype=np.float32)
+    return np.concatenate([aPos, aPos[:10]])
+
+
+# enddef
+
+
+################################################################################
+@pytest.mark.parametrize("iTargetCount", [1005, 2000])
+def test_FindVoxelSizeForCount_Duplicates(iTargetCount):
+
+    fVoxelSize, iCount = voxel.FindVoxelSizeForCount(aPos=_GetDuplicatedPoints(), iTargetCount=iTargetCount)
+    assert fVoxelSize > 0.0
+    assert iCount == 1000
+
+
+# enddef
+
+
+################################################################################
+def test_FindVoxelSizeForCount_Target():
+
+    aPos = _GetDuplicatedPoints()
+    fVoxelSize, iCount = voxel.FindVoxelSizeForCount(aPos=aPos, iTargetCount=500, fTolerance=0.05)
+    assert abs(iCount - 500) <= 25
+    assert voxel.CountOccupied(aPos=aPos, fVoxelSize=fVoxelSize) == iCount
+
+
+# enddef
+
+
+################################################################################
+def test_FindVoxelSizeForCount_Empty():
+
+    assert voxel.FindVoxelSizeForCount(aPos=np.zeros((0, 3)), iTargetCount=10)[1] == 0
+
+
+# enddef
+
+
+################################################################################
+def test_Downsample_Duplicates():
+
+    aPos = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 1.0, 1.0]], dtype=np.float32)
+    aVoxPos, aIdx = voxel.Downsample(aPos=aPos, fVoxelSize=0.1)
+    assert len(aVoxPos) == 2
+    assert voxel.CountOccupied(aPos=aPos, fVoxelSize=0.1) == 2
+    assert np.array_equal(aPos[aIdx], aVoxPos)
+
+
+# enddef
+
+
+################################################################################
+def test_Downsample_Empty():
+
+    aEmpty = np.zeros((0, 3), dtype=np.float32)
+    aVoxPos, aIdx = voxel.Downsample(aPos=aEmpty, fVoxelSize=0.1)
+    assert len(aVoxPos) == 0 and len(aIdx) == 0
+    assert voxel.CountOccupied(aPos=aEmpty, fVoxelSize=0.1) == 0
+
+
+# enddef
+
+
+################################################################################
+@pytest.mark.parametrize("funcOrder", [voxel.GetMortonOrder, voxel.GetProgressiveOrder])
+def test_Order_IsPermutation(funcOrder):
+
+    aPos = _GetDuplicatedPoints()
+    assert np.array_equal(np.sort(funcOrder(aPos)), np.arange(len(aPos)))
+    assert len(funcOrder(np.zeros((0, 3)))) == 0
+    assert np.array_equal(np.sort(funcOrder(np.zeros((5, 3)))), np.arange(5))
+
+
+# enddef
+
+
+################################################################################
+# Prefixes of the progressive order, also those ending within a level, have about the same
+# number of points in every cell of a coarse grid over uniformly distributed points.
+@pytest.mark.parametrize("iPrefix", [800, 2000, 5000])
+def test_GetProgressiveOrder_UniformPrefix(iPrefix):
+
+    aPos = np.random.default_rng(1).random((200000, 3))
+    aPrefix = aPos[voxel.GetProgressiveOrder(aPos)[0:iPrefix]]
+
+    aHalf = np.bincount((aPrefix[:, 0] >= 0.5).astype(np.int64), minlength=2)
+    assert abs(aHalf[0] - aHalf[1]) <= 0.05 * iPrefix
+
+    aBins = np.floor(aPrefix * 4.0).astype(np.int64)
+    aCounts = np.bincount(aBins[:, 0] * 16 + aBins[:, 1] * 4 + aBins[:, 2], minlength=64)
+    fMean = iPrefix / 64.0
+    assert aCounts.min() >= 0.8 * fMean
+    assert aCounts.max() <= 1.2 * fMean
+
+
+# enddef
+
+
+################################################################################
+def test_GetProgressiveCounts():
+
+    assert voxel.GetProgressiveCounts(100000, 3, 1.0) == [1000, 10000, 100000]
+    assert voxel.GetProgressiveCounts(10, 4, 1.0) == [1, 2, 10]
+    assert voxel.GetProgressiveCounts(10, 1, 1.0) == [10]
+
+
+# enddef
+
+
+################################################################################
+# Every step of a progressive import, starting with the coarsest one, covers the whole cloud evenly
+def test_GetProgressiveCounts_StepsCoverBounds():
+
+    aPos = np.random.default_rng(1).random((200000, 3)) * [4.0, 2.0, 0.5]
+    aOrder = voxel.GetProgressiveOrder(aPos)
+    aMin = aPos.min(axis=0)
+    aExtent = aPos.max(axis=0) - aMin
+
+    for iCount in voxel.GetProgressiveCounts(len(aPos), 4, 0.5)[:-1]:
+        aStep = (aPos[aOrder[0:iCount]] - aMin) / aExtent
+        assert np.all(aStep.min(axis=0) < 0.05)
+        assert np.all(aStep.max(axis=0) > 0.95)
+
+        # The cloud is flat, so only the larger axes are split into a grid of equal cells
+        aBins = np.minimum(np.floor(aStep[:, 0:2] * [8.0, 4.0]).astype(np.int64), [7, 3])
+        aCounts = np.bincount(aBins[:, 0] * 4 + aBins[:, 1], minlength=32)
+        assert aCounts.min() >= 0.8 * iCount / 32
+        assert aCounts.max() <= 1.2 * iCount / 32
+    # endfor
+
+
+# enddef
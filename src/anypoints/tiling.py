@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \tiling.py
+# Created Date: Monday, October 19th 2026, 10:34:05 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Conversion of large point clouds into a grid of tiles on disk.
+# The tiles are stored as PLY files next to a JSON manifest, which holds the bounds
+# and point count of each tile, so that tiles can be selected without reading them.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import os
+import json
+import numpy as np
+from pathlib import Path
+
+from .plyio.PlyException import CPlyException
+from .plyio import CPlyReader, CPlyWriter
+from . import frustum
+
+sManifestDti = "/catharsys/point-cloud/tiles:1.0"
+
+
+################################################################################
+# Split a PLY point cloud into tiles on a regular grid in the XY plane.
+# All scalar vertex properties are copied to the tiles.
+# sPathOut: folder the tiles and the manifest are written to.
+# fTileSize: edge length of the tiles in the XY plane. Tiles extend over the full height of their points.
+# sName: base name of the tile files and the manifest. Defaults to the name of the source file.
+# Returns the path of the manifest file.
+def CreateTiles(*, sFilePath, sPathOut, fTileSize, sName=None):
+
+    if fTileSize <= 0.0:
+        raise ValueError("Tile size must be positive")
+    # endif
+
+    if sName is None:
+        sName = Path(sFilePath).stem
+    # endif
+
+    print("Reading data from '{0}'...".format(sFilePath))
+    xPly = CPlyReader()
+    xPly.Read(sFilePath)
+    xVexList = xPly.GetElement("vertex")
+    if xVexList is None:
+        raise CPlyException("PLY file '{0}' has no vertex element".format(sFilePath))
+    # endif
+
+    lProps = [x for x in xVexList.GetPropNames() if xVexList.GetProperty(x).IsScalar()]
+    dicValues = {x: xVexList.GetPropertyValues(x) for x in lProps}
+    aPos = np.c_[dicValues["x"], dicValues["y"], dicValues["z"]].astype(np.float64)
+
+    aValid = np.all(np.isfinite(aPos), axis=1)
+    aKeys = np.floor(aPos[:, 0:2] / fTileSize).astype(np.int64)
+    aKeys[~aValid] = 0
+
+    # Sort the points by tile
+    aTileKeys, aPointTile = np.unique(aKeys[aValid], axis=0, return_inverse=True)
+    aValidIdx = np.flatnonzero(aValid)
+    aOrder = aValidIdx[np.argsort(aPointTile.ravel(), kind="stable")]
+    aTileCount = np.bincount(aPointTile.ravel(), minlength=len(aTileKeys))
+    aTileStart = np.cumsum(aTileCount) - aTileCount
+
+    xType = np.dtype([(x, dicValues[x].dtype) for x in lProps])
+    os.makedirs(sPathOut, exist_ok=True)
+    print("Writing {0} tiles...".format(len(aTileKeys)))
+
+    lTiles = []
+    for iTile, aTileKey in enumerate(aTileKeys):
+        aIdx = aOrder[aTileStart[iTile] : aTileStart[iTile] + aTileCount[iTile]]
+        aData = np.empty(len(aIdx), dtype=xType)
+        for sProp in lProps:
+            aData[sProp] = dicValues[sProp][aIdx]
+        # endfor
+
+        sTileName = "{0}_{1}_{2}".format(sName, aTileKey[0], aTileKey[1])
+        sTileFile = sTileName + ".ply"
+        xWriter = CPlyWriter()
+        xWriter.AddElement("vertex", aData)
+        xWriter.Write(os.path.join(sPathOut, sTileFile))
+
+        aTilePos = aPos[aIdx]
+        lTiles.append(
+            {
+                "sName": sTileName,
+                "sFile": sTileFile,
+                "lIndex": [int(x) for x in aTileKey],
+                "iPointCount": len(aIdx),
+                "lBoundsMin": aTilePos.min(axis=0).tolist(),
+                "lBoundsMax": aTilePos.max(axis=0).tolist(),
+            }
+        )
+    # endfor
+
+    dicManifest = {
+        "sDTI": sManifestDti,
+        "sName": sName,
+        "fTileSize": fTileSize,
+        "iPointCount": int(aValid.sum()),
+        "lBoundsMin": aPos[aValid].min(axis=0).tolist() if len(lTiles) > 0 else [0.0, 0.0, 0.0],
+        "lBoundsMax": aPos[aValid].max(axis=0).tolist() if len(lTiles) > 0 else [0.0, 0.0, 0.0],
+        "lTiles": lTiles,
+    }
+
+    sFpManifest = os.path.join(sPathOut, sName + ".json")
+    with open(sFpManifest, "w") as xFile:
+        json.dump(dicManifest, xFile, indent=4)
+    # endwith
+
+    return sFpManifest
+
+
+# enddef
+
+
+################################################################################
+# Load a tile manifest. The tile file names are extended to absolute paths as "sFpData".
+def LoadManifest(_sFpManifest):
+
+    xPath = Path(_sFpManifest)
+    with open(xPath, "r") as xFile:
+        dicManifest = json.load(xFile)
+    # endwith
+    if dicManifest.get("sDTI") != sManifestDti:
+        raise ValueError("File '{0}' is not a point cloud tile manifest".format(xPath.as_posix()))
+    # endif
+
+    sPath = xPath.parent.as_posix()
+    for dicTile in dicManifest.get("lTiles"):
+        dicTile["sFpData"] = os.path.normpath(os.path.join(sPath, dicTile.get("sFile")))
+    # endfor
+
+    return dicManifest
+
+
+# enddef
+
+
+################################################################################
+# Return the tiles of a manifest whose bounds intersect any of the given frustums.
+# fMargin: distance in world units by which the frustums are enlarged.
+def GetTilesInFrustums(*, dicManifest, lFrustumPlanes, fMargin=0.0):
+
+    lTiles = dicManifest.get("lTiles")
+    if len(lTiles) == 0:
+        return []
+    # endif
+
+    aBoxMin = np.array([x.get("lBoundsMin") for x in lTiles])
+    aBoxMax = np.array([x.get("lBoundsMax") for x in lTiles])
+    aMask = frustum.GetBoxIntersectMaskUnion(aBoxMin, aBoxMax, lFrustumPlanes, fMargin=fMargin)
+
+    return [x for x, bInside in zip(lTiles, aMask) if bInside]
+
+
+# enddef
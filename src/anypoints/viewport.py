@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \viewport.py
+# Created Date: Monday, October 19th 2026, 9:26:52 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Viewport display budgets of point cloud objects.
+# Each point cloud object can have its own budget, stored as custom property of the object,
+# and a scene can have a budget that is split over all point clouds in the scene.
+# Only the viewport display is thinned out. Renders always use all points.
+
+from . import budget
+from . import geonodes
+
+# Custom property with the maximal number of points shown in the viewport,
+# on point cloud objects for a single point cloud and on scenes for all point clouds of the scene.
+sBudgetProperty = "iViewportBudget"
+
+# Up to this number of particles is displayed with the prototype objects in the viewport, more as dots
+iObjectDisplayLimit = 10000
+
+
+################################################################################
+# Return the particle system of a point cloud object, or None, if it uses Geometry Nodes
+def _GetParticleSystem(_objPcl):
+    return _objPcl.particle_systems.get(_objPcl.name)
+
+
+# enddef
+
+
+################################################################################
+# Return the instancing node group of a point cloud object, or None, if it uses a particle system
+def _GetInstancerNodeGroup(_objPcl):
+
+    modA = _objPcl.modifiers.get(_objPcl.name)
+    if modA is None or modA.type != "NODES" or modA.node_group is None:
+        return None
+    # endif
+    if modA.node_group.nodes.get(geonodes.sViewportNodeName) is None:
+        return None
+    # endif
+
+    return modA.node_group
+
+
+# enddef
+
+
+################################################################################
+def IsPointCloudObject(_objA):
+    return _GetParticleSystem(_objA) is not None or _GetInstancerNodeGroup(_objA) is not None
+
+
+# enddef
+
+
+################################################################################
+def GetPointCount(_objPcl):
+
+    psA = _GetParticleSystem(_objPcl)
+    if psA is not None:
+        return psA.settings.count
+    # endif
+
+    return len(_objPcl.data.vertices)
+
+
+# enddef
+
+
+################################################################################
+# Return the budget of a point cloud object or a scene, or None, if it has no budget
+def GetBudget(_xId):
+
+    iBudget = _xId.get(sBudgetProperty)
+    if iBudget is None or iBudget < 0:
+        return None
+    # endif
+
+    return int(iBudget)
+
+
+# enddef
+
+
+################################################################################
+# Set the budget of a point cloud object or a scene. None removes the budget.
+def SetBudget(_xId, _iBudget):
+
+    if _iBudget is None:
+        if sBudgetProperty in _xId:
+            del _xId[sBudgetProperty]
+        # endif
+    elif _xId.get(sBudgetProperty) != int(_iBudget):
+        _xId[sBudgetProperty] = int(_iBudget)
+    # endif
+
+
+# enddef
+
+
+################################################################################
+# Return the largest display percentage of a particle system with iPntCnt particles,
+# which shows at most iCount particles. Blender shows iPntCnt * percentage // 100 particles.
+def _GetDisplayPercent(_iPntCnt, _iCount):
+
+    if _iPntCnt == 0:
+        return 100
+    # endif
+
+    return min(100, (100 * (_iCount + 1) - 1) // _iPntCnt)
+
+
+# enddef
+
+
+################################################################################
+# Show at most iCount points of a point cloud object in the viewport.
+# Particles can only be thinned out in steps of one percent. A particle system whose share is below
+# one percent of its particles is hidden in the viewport, so that the budget is never exceeded.
+# Particles are displayed as objects up to iObjectDisplayLimit shown particles, and as dots above.
+# Values are only written if they change, as every change of the particle settings resets the particle system.
+def SetDisplayCount(_objPcl, _iCount):
+
+    iPntCnt = GetPointCount(_objPcl)
+    iCount = max(0, min(_iCount, iPntCnt))
+
+    psA = _GetParticleSystem(_objPcl)
+    if psA is not None:
+        xSettings = psA.settings
+        iPercent = _GetDisplayPercent(iPntCnt, iCount)
+        if xSettings.display_percentage != iPercent:
+            xSettings.display_percentage = iPercent
+        # endif
+        iShown = iPntCnt * iPercent // 100
+        if iShown == 0 and iPntCnt > 0:
+            sMethod = "NONE"
+        elif iShown <= iObjectDisplayLimit:
+            sMethod = "RENDER"
+        else:
+            sMethod = "DOT"
+        # endif
+        if xSettings.display_method != sMethod:
+            xSettings.display_method = sMethod
+        # endif
+    else:
+        geonodes.SetViewportRatio(_GetInstancerNodeGroup(_objPcl), 1.0 if iPntCnt == 0 else iCount / iPntCnt)
+    # endif
+
+
+# enddef
+
+
+################################################################################
+# Round the shares of a scene budget to counts that particle systems can show, which are whole percents
+# of their particles. The shares are rounded down first, and the remaining budget is given to the point
+# clouds with the largest remainders, one percent at a time. This way, clouds with shares below
+# one percent are shown in turns, instead of all of them exceeding the budget or being hidden.
+# lMaxCounts: counts the point clouds must not exceed, for example due to their own budgets.
+def _RoundDisplayCounts(_lObjects, _lCounts, _lMaxCounts, _iBudget):
+
+    lShown = list(_lCounts)
+    lPntCnt = [GetPointCount(x) for x in _lObjects]
+    lRound = []
+    for iIdx, objPcl in enumerate(_lObjects):
+        if _GetParticleSystem(objPcl) is not None and lPntCnt[iIdx] > 0:
+            iPntCnt = lPntCnt[iIdx]
+            lShown[iIdx] = iPntCnt * _GetDisplayPercent(iPntCnt, _lCounts[iIdx]) // 100
+            lRound.append(iIdx)
+        # endif
+    # endfor
+
+    iRemain = _iBudget - sum(lShown)
+    for iIdx in sorted(lRound, key=lambda x: lShown[x] - _lCounts[x]):
+        iPntCnt = lPntCnt[iIdx]
+        iNext = iPntCnt * (_GetDisplayPercent(iPntCnt, lShown[iIdx]) + 1) // 100
+        if iNext <= _lMaxCounts[iIdx] and iNext - lShown[iIdx] <= iRemain:
+            iRemain -= iNext - lShown[iIdx]
+            lShown[iIdx] = iNext
+        # endif
+    # endfor
+
+    return lShown
+
+
+# enddef
+
+
+################################################################################
+# Apply the budget of a scene to all of its point clouds.
+# The budget is split in proportion to the point counts, where each point cloud is also limited
+# by its own budget. Without scene budget, each point cloud only uses its own budget.
+# As particle systems are thinned out in steps of one percent, particle point clouds whose
+# share is below one percent of their points may be hidden, see _RoundDisplayCounts().
+def ApplySceneBudget(_xScene):
+
+    lObjects = [x for x in _xScene.objects if IsPointCloudObject(x)]
+    lCounts = []
+    for objPcl in lObjects:
+        iCount = GetPointCount(objPcl)
+        iBudget = GetBudget(objPcl)
+        lCounts.append(iCount if iBudget is None else min(iCount, iBudget))
+    # endfor
+
+    iSceneBudget = GetBudget(_xScene)
+    if iSceneBudget is not None:
+        lShares = budget.DistributeBudget(lCounts=lCounts, iBudget=iSceneBudget)
+        lCounts = _RoundDisplayCounts(lObjects, lShares, lCounts, iSceneBudget)
+    # endif
+
+    for objPcl, iCount in zip(lObjects, lCounts):
+        SetDisplayCount(objPcl, iCount)
+    # endfor
+
+
+# enddef
+
+
+################################################################################
+# Set the budget of a scene and apply it to all of its point clouds. None removes the budget.
+def SetSceneBudget(_xScene, _iBudget):
+
+    SetBudget(_xScene, _iBudget)
+    ApplySceneBudget(_xScene)
+
+
+# enddef
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \voxel.py
+# Created Date: Monday, October 19th 2026, 9:12:05 am
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Voxel grid helper functions working on numpy point arrays.
+# This module must not depend on Blender, so that it can be used outside of Blender.
+
+import numpy as np
+
+# Number of bits per axis used when packing 3D integer voxel keys into a single int64
+iPackBits = 21
+iPackMax = (1 << iPackBits) - 1
+
+
+################################################################################
+# Map positions to integer voxel keys. Voxel centers lie at integer multiples of the voxel size.
+def GetVoxelKeys(_aPos, _fVoxelSize):
+    return np.round(_aPos / _fVoxelSize).astype(np.int64)
+
+
+# enddef
+
+
+################################################################################
+# Pack Nx3 integer voxel keys into a single int64 per key. The packed keys sort
+# in the same lexicographic order as the key rows. Returns None if the key range
+# is too large to be packed.
+def PackVoxelKeys(_aKeys):
+
+    if len(_aKeys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # endif
+
+    aMin = _aKeys.min(axis=0)
+    aRange = _aKeys.max(axis=0) - aMin
+    if np.any(aRange > iPackMax):
+        return None
+    # endif
+
+    aK = (_aKeys - aMin).astype(np.int64)
+    return (aK[:, 0] << (2 * iPackBits)) | (aK[:, 1] << iPackBits) | aK[:, 2]
+
+
+# enddef
+
+
+################################################################################
+# Find the unique voxel keys. Returns the unique keys and the index of the first
+# point in each voxel, as 'np.unique(..., return_index=True, axis=0)' would.
+def UniqueVoxelKeys(_aKeys):
+
+    aPacked = PackVoxelKeys(_aKeys)
+    if aPacked is None:
+        return np.unique(_aKeys, return_index=True, axis=0)
+    # endif
+
+    _, aIdx = np.unique(aPacked, return_index=True)
+    return _aKeys[aIdx], aIdx
+
+
+# enddef
+
+
+################################################################################
+# Keep one point per voxel. Returns the voxel center positions and the indices
+# of the points that represent each voxel.
+def Downsample(*, aPos, fVoxelSize):
+
+    aKeys = GetVoxelKeys(aPos, fVoxelSize)
+    aG, aIdx = UniqueVoxelKeys(aKeys)
+    return (aG * fVoxelSize).astype(aPos.dtype), aIdx
+
+
+# enddef
+
+
+################################################################################
+# Keep one point per voxel, where the voxel size grows with the distance from a center point,
+# typically the camera position. The voxel size at distance d is max(fVoxelSize, d * fSizePerDistance),
+# rounded down to fVoxelSize times a power of two, so that only a few distinct sizes are used.
+# For a pixel footprint target, fSizePerDistance is the angle covered by a pixel times the number
+# of pixels a voxel may cover.
+# Returns the voxel center positions, the indices of the representative points and the voxel size per point.
+def DownsampleAdaptive(*, aPos, fVoxelSize, aCenter, fSizePerDistance, iMaxLevel=8):
+
+    aDist = np.linalg.norm(aPos - np.asarray(aCenter, dtype=aPos.dtype), axis=1)
+    aRatio = np.maximum(aDist * (fSizePerDistance / fVoxelSize), 1.0)
+    aLevel = np.clip(np.floor(np.log2(aRatio)), 0, iMaxLevel).astype(np.int32)
+
+    lPos = []
+    lIdx = []
+    lSize = []
+    for iLevel in np.unique(aLevel):
+        aSelIdx = np.flatnonzero(aLevel == iLevel)
+        fLevelVoxelSize = fVoxelSize * (1 << int(iLevel))
+        aLevelPos, aLevelIdx = Downsample(aPos=aPos[aSelIdx], fVoxelSize=fLevelVoxelSize)
+        lPos.append(aLevelPos)
+        lIdx.append(aSelIdx[aLevelIdx])
+        lSize.append(np.full(len(aLevelIdx), fLevelVoxelSize, dtype=np.float32))
+    # endfor
+
+    if len(lPos) == 0:
+        return aPos[0:0], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    # endif
+
+    return np.concatenate(lPos), np.concatenate(lIdx), np.concatenate(lSize)
+
+
+# enddef
+
+
+################################################################################
+# Count the number of voxels occupied by the points
+def CountOccupied(*, aPos, fVoxelSize):
+
+    aKeys = GetVoxelKeys(aPos, fVoxelSize)
+    aPacked = PackVoxelKeys(aKeys)
+    if aPacked is None:
+        return len(np.unique(aKeys, axis=0))
+    # endif
+
+    aPacked.sort()
+    return int(np.count_nonzero(np.diff(aPacked))) + min(len(aPacked), 1)
+
+
+# enddef
+
+
+################################################################################
+# Find the voxel size for which 'Downsample()' returns approximately iTargetCount points.
+# The occupancy count decreases with the voxel size, so the size is found by
+# bisection on a logarithmic scale.
+# fTolerance: relative deviation from the target count that is accepted.
+# Returns the voxel size and the resulting point count. If the target count cannot be reached,
+# because there are not enough distinct points, the returned count is smaller than the target.
+def FindVoxelSizeForCount(*, aPos, iTargetCount, fTolerance=0.02, iMaxIterations=32):
+
+    iPntCnt = len(aPos)
+    if iPntCnt == 0:
+        return 1.0, 0
+    # endif
+
+    fExtent = float(np.max(aPos.max(axis=0) - aPos.min(axis=0)))
+    fHi = max(fExtent, 1e-6)
+    iCntHi = CountOccupied(aPos=aPos, fVoxelSize=fHi)
+    if iCntHi >= iTargetCount:
+        return fHi, iCntHi
+    # endif
+
+    # Initial guess for a uniform distribution on a surface
+    fLo = fHi / max(np.sqrt(iTargetCount), 1.0)
+    iCntLo = CountOccupied(aPos=aPos, fVoxelSize=fLo)
+    iDistinctCnt = None
+    for iIter in range(iMaxIterations):
+        if iCntLo >= iTargetCount:
+            break
+        # endif
+
+        fHi, iCntHi = fLo, iCntLo
+        fLo *= 0.5
+        iCntLo = CountOccupied(aPos=aPos, fVoxelSize=fLo)
+        if iCntLo == iCntHi:
+            # The count stopped growing. If all distinct positions are separated,
+            # no smaller voxel size adds points. Duplicate points are never separated.
+            if iDistinctCnt is None:
+                iDistinctCnt = len(np.unique(aPos, axis=0))
+            # endif
+            if iCntLo >= iDistinctCnt:
+                return fLo, iCntLo
+            # endif
+        # endif
+    # endfor
+
+    if iCntLo < iTargetCount:
+        # Target not reached within the iteration limit
+        return fLo, iCntLo
+    # endif
+
+    iTol = int(iTargetCount * fTolerance)
+    for iIter in range(iMaxIterations):
+        if iCntLo - iTargetCount <= iTol:
+            break
+        # endif
+
+        fMid = np.sqrt(fLo * fHi)
+        iCntMid = CountOccupied(aPos=aPos, fVoxelSize=fMid)
+        if iCntMid >= iTargetCount:
+            fLo, iCntLo = fMid, iCntMid
+        else:
+            fHi, iCntHi = fMid, iCntMid
+        # endif
+    # endfor
+
+    # Prefer the size that is closer to the target
+    if iTargetCount - iCntHi < iCntLo - iTargetCount:
+        return fHi, iCntHi
+    # endif
+    return fLo, iCntLo
+
+
+# enddef
+
+
+################################################################################
+# Spread the lower 21 bits of each value, so that there are two zero bits between consecutive bits
+def _SpreadBits(_aValue):
+
+    aV = _aValue.astype(np.uint64) & np.uint64(0x1FFFFF)
+    aV = (aV | (aV << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    aV = (aV | (aV << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    aV = (aV | (aV << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    aV = (aV | (aV << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    aV = (aV | (aV << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return aV
+
+
+# enddef
+
+
+################################################################################
+# Reverse the lower _aBitCnt bits of each value. Higher bits are dropped.
+def _ReverseBits(_aValue, _aBitCnt):
+
+    aV = _aValue.astype(np.uint64)
+    for iShift, iMask in [
+        (1, 0x5555555555555555),
+        (2, 0x3333333333333333),
+        (4, 0x0F0F0F0F0F0F0F0F),
+        (8, 0x00FF00FF00FF00FF),
+        (16, 0x0000FFFF0000FFFF),
+        (32, 0x00000000FFFFFFFF),
+    ]:
+        xShift = np.uint64(iShift)
+        xMask = np.uint64(iMask)
+        aV = ((aV >> xShift) & xMask) | ((aV & xMask) << xShift)
+    # endfor
+
+    # A shift by the full 64 bits is undefined, so values without bits are set to zero explicitly
+    aBitCnt = np.asarray(_aBitCnt, dtype=np.int64)
+    aShift = np.clip(64 - aBitCnt, 0, 63).astype(np.uint64)
+    return np.where(aBitCnt > 0, aV >> aShift, np.uint64(0))
+
+
+# enddef
+
+
+################################################################################
+# Calculate 63-bit Morton (Z-order) codes of the positions, quantized to 21 bits per axis
+# over their bounding box.
+def GetMortonCodes(_aPos):
+
+    if len(_aPos) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    # endif
+
+    aMin = _aPos.min(axis=0).astype(np.float64)
+    fExtent = float(np.max(_aPos.max(axis=0) - aMin))
+    fScale = iPackMax / fExtent if fExtent > 0.0 else 0.0
+
+    aQ = np.clip(((_aPos - aMin) * fScale), 0, iPackMax).astype(np.uint64)
+    return (_SpreadBits(aQ[:, 0]) << np.uint64(2)) | (_SpreadBits(aQ[:, 1]) << np.uint64(1)) | _SpreadBits(aQ[:, 2])
+
+
+# enddef
+
+
+################################################################################
+# Return the point order along the Morton curve. Neighboring points in this order
+# are spatially close, which improves the memory locality of all per point data.
+def GetMortonOrder(_aPos):
+    return np.argsort(GetMortonCodes(_aPos), kind="stable")
+
+
+# enddef
+
+
+################################################################################
+# Return a progressive point order, in which every prefix is a spatially uniform subset.
+# In Morton order, the first point of each octree cell is its representative on that level.
+# The level of a point is the coarsest level on which it represents a cell. This is given by
+# the highest bit in which its code differs from the code of the previous point.
+# Sorting the points by level gives one point per octree cell on the coarsest level,
+# followed by the additional points of the next level, and so on.
+# Within a level, the points are sorted by the bit-reversed index of their cell on that level.
+# Consecutive points then alternate between the halves of the bounding box along all axes,
+# so that a prefix that ends within a level is spread over the whole point cloud as well.
+# Note that a prefix of the plain Morton order is not uniform, but covers one region after another.
+def GetProgressiveOrder(_aPos):
+
+    iPntCnt = len(_aPos)
+    if iPntCnt == 0:
+        return np.zeros(0, dtype=np.int64)
+    # endif
+
+    aCodes = GetMortonCodes(_aPos)
+    aMortonOrder = np.argsort(aCodes, kind="stable")
+    aCodes = aCodes[aMortonOrder]
+
+    aDiff = aCodes[1:] ^ aCodes[:-1]
+    aHighBit = np.zeros(iPntCnt - 1, dtype=np.int64)
+    aNonZero = aDiff > 0
+    aHighBit[aNonZero] = np.floor(np.log2(aDiff[aNonZero].astype(np.float64))).astype(np.int64)
+    # Correct rounding of the float conversion for large codes
+    aTooHigh = aNonZero & ((np.uint64(1) << aHighBit.astype(np.uint64)) > aDiff)
+    aHighBit[aTooHigh] -= 1
+
+    # Level 0 is the root cell. Identical codes get a level beyond the finest one.
+    iLevelCnt = iPackBits + 1
+    aLevel = np.zeros(iPntCnt, dtype=np.int64)
+    aLevel[1:] = np.where(aNonZero, iPackBits - aHighBit // 3, iLevelCnt)
+
+    # Cell index of each point on its level. Points with identical codes use their full code.
+    aCellBits = 3 * np.minimum(aLevel, iPackBits)
+    aCell = aCodes >> (3 * iPackBits - aCellBits).astype(np.uint64)
+    aCellKey = _ReverseBits(aCell, aCellBits)
+
+    return aMortonOrder[np.lexsort((aCellKey, aLevel))]
+
+
+# enddef
+
+
+################################################################################
+# Point counts of the steps of a progressive import, growing geometrically
+# from _fCoarsePercent percent of the points to all points.
+# The points of each step are the prefix of this length of the progressive order.
+def GetProgressiveCounts(_iPntCnt, _iSteps, _fCoarsePercent):
+
+    fCoarse = min(max(_fCoarsePercent / 100.0, 0.0), 1.0)
+    lCounts = []
+    for iStep in range(_iSteps):
+        fExp = (_iSteps - 1 - iStep) / (_iSteps - 1) if _iSteps > 1 else 0.0
+        iCnt = _iPntCnt if iStep == _iSteps - 1 else max(1, int(round(_iPntCnt * fCoarse**fExp)))
+        if len(lCounts) == 0 or iCnt > lCounts[-1]:
+            lCounts.append(min(iCnt, _iPntCnt))
+        # endif
+    # endfor
+
+    return lCounts
+
+
+# enddef
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# File: \unit_test\test_pixels_01.py
+# Created Date: Monday, October 19th 2026, 1:10:33 pm
+# <LICENSE id="GPL-3.0">
+#
+#   Image-Render Blender Point-Cloud importer add-on module
+#   Copyright (C) 2022 Robert Bosch GmbH and its subsidiaries
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#
+# </LICENSE>
+###
+
+# Compare the previous color image upload via a Python list with the bulk upload
+# of CPointCloud._SetImagePixels(). Both paths are timed for the same steps:
+# the pixel upload, and packing the image into the Blender file. Run inside Blender.
+
+import time
+import numpy as np
+import bpy
+import anyblend
+from anypoints.class_pointcloud import CPointCloud
+
+iPntCnt = 1000000
+
+xPcl = CPointCloud("PixelTest")
+iImgW, iImgH = xPcl._GetImageSize(iPntCnt)
+lCol = np.random.default_rng(0).integers(0, 256, size=(iPntCnt, 3), dtype=np.uint8)
+
+
+#######################################################
+# Upload the pixels with the given function, then pack the image.
+# Returns the upload and packing times and the uploaded pixels.
+def TimeUpload(_sName, _funcUpload):
+
+    imgA = bpy.data.images.new(_sName, iImgW, iImgH)
+    fTimeStart = time.perf_counter()
+    _funcUpload(imgA)
+    fTimeUpload = time.perf_counter() - fTimeStart
+
+    aPixels = np.empty(iImgW * iImgH * 4, dtype=np.float32)
+    imgA.pixels.foreach_get(aPixels)
+
+    fTimeStart = time.perf_counter()
+    anyblend.ops_image.Pack(imgA)
+    fTimePack = time.perf_counter() - fTimeStart
+
+    bpy.data.images.remove(imgA)
+    return fTimeUpload, fTimePack, aPixels
+
+
+# enddef
+
+
+#######################################################
+# Previous path: float64 RGBA, flattened, padded and converted to a list
+def UploadList(_imgA):
+    lColRgba = np.c_[lCol.astype(np.float32) / 255.0, np.ones(iPntCnt)]
+    _imgA.pixels = list(np.r_[lColRgba.flatten(), np.zeros((iImgW * iImgH - iPntCnt) * 4)])
+
+
+# enddef
+
+
+#######################################################
+# Bulk path, without its own packing, which is timed separately
+def UploadBulk(_imgA):
+    xPcl.sImageStorage = "GENERATED"
+    xPcl._SetImagePixels(imgA=_imgA, lCol=lCol)
+
+
+# enddef
+
+
+fTimeListUpload, fTimeListPack, aPixList = TimeUpload("PixelTest.List", UploadList)
+fTimeBulkUpload, fTimeBulkPack, aPixBulk = TimeUpload("PixelTest.Bulk", UploadBulk)
+
+print("Image of {0}x{1} pixels for {2} points".format(iImgW, iImgH, iPntCnt))
+print(
+    "List upload: {0:.3f}s, packing: {1:.3f}s, total: {2:.3f}s".format(
+        fTimeListUpload, fTimeListPack, fTimeListUpload + fTimeListPack
+    )
+)
+print(
+    "Bulk upload: {0:.3f}s, packing: {1:.3f}s, total: {2:.3f}s".format(
+        fTimeBulkUpload, fTimeBulkPack, fTimeBulkUpload + fTimeBulkPack
+    )
+)
+print("Maximal pixel difference: {0}".format(np.abs(aPixList - aPixBulk).max()))